@@ -0,0 +1,4 @@
+"""Python content pipeline for the GMAT Quant corpus (GMAT_QUANT_BASE.py).
+
+Modules are imported explicitly, e.g. ``from corpus.parse import parse_file``.
+"""
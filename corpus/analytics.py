@@ -0,0 +1,305 @@
+"""Streaming strengths / weaknesses analytics over attempt events.
+
+Every user owns one block of counters, ``(store.slots, len(COLUMNS))``
+``int32``: one slot per corpus topic (plus "unknown") and one per subtopic.
+Subtopic slots grow with the vocabulary (``from_taxonomy`` sizes them for a
+whole corpus up front), so no subtopic is folded into an overflow bucket. An
+attempt adds to its topic slot and, when known, its subtopic slot. Events are
+read in chunks and folded in with ``np.add.at``, so history is never
+re-scanned.
+
+A snapshot is an uncompressed ``.npy`` counter array plus a ``.json`` sidecar
+(users, subtopics, layout). ``load`` memory-maps the array copy-on-write, so
+a dashboard reading one user's summary touches only that user's rows.
+
+Accepted event shapes:
+
+- ``Attempt`` rows / JSONL: ``userId``, ``questionId``, ``isCorrect``, ``timeMs``,
+  ``userAnswer``, optional ``topic`` / ``subtopic``;
+- ``AttemptLogEvent`` (lib/missedAttemptLog.ts): ``questionId``, ``status``,
+  ``phase``. Only ``success`` counts as an attempt; ``error`` is counted as a
+  failed submission.
+- rows of the /api/dashboard/export CSV (``topic``, ``correct``, ``answer``,
+  ``user_answer``; no timing).
+
+Topics missing from an event are looked up by question id in ``taxonomy``
+(e.g. built from ``Question.topic`` / ``subtopic``).
+
+    python -m corpus.analytics snapshot.npy --user U events.jsonl|export.csv
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import json
+import os
+import sys
+from itertools import islice
+from pathlib import Path
+from typing import IO, Iterable, Iterator, Mapping, Optional, Sequence, Union
+
+import numpy as np
+
+from .taxonomy import TaxonomyIndex
+from .topics import MAJOR_TOPICS, canonical_topic
+
+SECTION_MINUTES = 62
+SECTION_QUESTIONS = 31
+BUDGET_MS = SECTION_MINUTES * 60_000 // SECTION_QUESTIONS  # 2 minutes
+RUSHED_MS = BUDGET_MS // 4
+
+COLUMNS = ("attempts", "correct", "timed", "time_ds", "over_budget", "rushed", "skipped", "submit_errors")
+(ATTEMPTS, CORRECT, TIMED, TIME_DS, OVER_BUDGET, RUSHED, SKIPPED, SUBMIT_ERRORS) = range(len(COLUMNS))
+
+TOPIC_SLOTS = len(MAJOR_TOPICS) + 1  # last = unknown topic
+
+_UNKNOWN = len(MAJOR_TOPICS)
+_TOPIC_SLOT = {t: i for i, t in enumerate(MAJOR_TOPICS)}
+
+Taxonomy = Mapping[str, tuple[Optional[str], Optional[str]]]
+
+
+def _flag(value) -> bool:
+    if isinstance(value, str):
+        return value.strip().lower() in ("true", "1", "correct", "yes")
+    return bool(value)
+
+
+def chunks(records: Iterable[Mapping], size: int = 65_536) -> Iterator[list[Mapping]]:
+    it = iter(records)
+    while True:
+        block = list(islice(it, size))
+        if not block:
+            return
+        yield block
+
+
+def read_events(fh: IO[str]) -> Iterator[Mapping]:
+    """JSONL attempt events, or the dashboard export CSV (detected from the first line)."""
+    first = fh.readline()
+    if not first:
+        return
+    if first.lstrip().startswith("{"):
+        yield json.loads(first)
+        for line in fh:
+            if line.strip():
+                yield json.loads(line)
+    else:
+        yield from csv.DictReader(_prepend(first, fh))
+
+
+def _prepend(first: str, fh: IO[str]) -> Iterator[str]:
+    yield first
+    yield from fh
+
+
+class StrengthsStore:
+    """Per-user counter blocks plus the subtopic vocabulary that addresses them."""
+
+    __slots__ = ("counts", "users", "subtopics", "_row", "_sub")
+
+    def __init__(self, counts: Optional[np.ndarray] = None, users: Sequence[str] = (),
+                 subtopics: Sequence[str] = ()) -> None:
+        """``counts`` (e.g. a memory map) is used as is; it must cover ``users`` and ``subtopics``."""
+        self.users = list(users)
+        self.subtopics = [_subtopic_key(s) for s in subtopics]
+        if counts is None:
+            shape = (max(len(self.users), 16), TOPIC_SLOTS + max(len(self.subtopics), 16), len(COLUMNS))
+            counts = np.zeros(shape, dtype=np.int32)
+        self.counts = counts
+        self._row = {u: i for i, u in enumerate(self.users)}
+        self._sub = {s: i for i, s in enumerate(self.subtopics)}
+
+    @classmethod
+    def from_taxonomy(cls, taxonomy: Union[TaxonomyIndex, Taxonomy]) -> "StrengthsStore":
+        """An empty store with one subtopic slot per subtopic in ``taxonomy``, allocated up front."""
+        if isinstance(taxonomy, TaxonomyIndex):
+            subtopics = taxonomy.values("subtopic")
+        else:
+            subtopics = list(dict.fromkeys(_subtopic_key(s) for _, s in taxonomy.values() if s))
+        return cls(subtopics=subtopics)
+
+    @property
+    def slots(self) -> int:
+        return TOPIC_SLOTS + len(self.subtopics)
+
+    def __len__(self) -> int:
+        return len(self.users)
+
+    def _user(self, user: str) -> int:
+        r = self._row.get(user)
+        if r is None:
+            r = self._row[user] = len(self.users)
+            self.users.append(user)
+            if r >= len(self.counts):
+                grown = np.zeros((max(2 * len(self.counts), 16),) + self.counts.shape[1:], dtype=np.int32)
+                grown[: len(self.counts)] = self.counts
+                self.counts = grown
+        return r
+
+    def _subtopic(self, subtopic: Optional[str]) -> int:
+        if not subtopic:
+            return -1
+        key = _subtopic_key(subtopic)
+        s = self._sub.get(key)
+        if s is None:
+            s = self._sub[key] = len(self.subtopics)
+            self.subtopics.append(key)
+            if TOPIC_SLOTS + s >= self.counts.shape[1]:
+                rows, width, cols = self.counts.shape
+                grown = np.zeros((rows, TOPIC_SLOTS + max(2 * (width - TOPIC_SLOTS), 16), cols), dtype=np.int32)
+                grown[:, :width] = self.counts
+                self.counts = grown
+        return TOPIC_SLOTS + s
+
+    def add(self, events: Iterable[Mapping], user: Optional[str] = None,
+            taxonomy: Optional[Taxonomy] = None, chunk: int = 65_536) -> int:
+        """Fold events in; ``user`` applies to events without a ``userId``. Returns events counted."""
+        total = 0
+        for block in chunks(events, chunk):
+            rows, slots, subs, values = [], [], [], []
+            for e in block:
+                uid = e.get("userId", user)
+                if uid is None:
+                    raise ValueError("event has no userId and no default user was given")
+                phase = e.get("phase")
+                if phase == "start":
+                    continue
+                v = [0] * len(COLUMNS)
+                if phase == "error":
+                    v[SUBMIT_ERRORS] = 1
+                else:
+                    correct = _flag(e["isCorrect"] if "isCorrect" in e else
+                                    e["correct"] if "correct" in e else e.get("status") == "correct")
+                    v[ATTEMPTS], v[CORRECT] = 1, int(correct)
+                    answer = e.get("userAnswer", e.get("user_answer"))
+                    v[SKIPPED] = int(answer is not None and not str(answer).strip())
+                    t = e.get("timeMs")
+                    if t not in (None, ""):
+                        t = int(t)
+                        v[TIMED], v[TIME_DS] = 1, t // 100
+                        v[OVER_BUDGET] = int(t > BUDGET_MS)
+                        v[RUSHED] = int(t < RUSHED_MS and not correct)
+                topic, subtopic = e.get("topic"), e.get("subtopic")
+                if taxonomy is not None and not topic and e.get("questionId") in taxonomy:
+                    topic, subtopic = taxonomy[e["questionId"]]
+                rows.append(self._user(str(uid)))
+                slots.append(_TOPIC_SLOT.get(canonical_topic(topic) or "", _UNKNOWN))
+                subs.append(self._subtopic(subtopic))
+                values.append(v)
+            if not values:
+                continue
+            rows_a, subs_a = np.array(rows), np.array(subs)
+            vals = np.array(values, dtype=np.int32)
+            np.add.at(self.counts, (rows_a, np.array(slots)), vals)
+            has_sub = subs_a >= 0
+            np.add.at(self.counts, (rows_a[has_sub], subs_a[has_sub]), vals[has_sub])
+            total += len(values)
+        return total
+
+    def row(self, user: str) -> np.ndarray:
+        """The user's ``(slots, len(COLUMNS))`` counter block (zeros for unknown users)."""
+        r = self._row.get(user)
+        if r is None:
+            return np.zeros((self.slots, len(COLUMNS)), dtype=np.int32)
+        return self.counts[r, : self.slots]
+
+    def summary(self, user: str, min_attempts: int = 5, top: int = 3) -> dict:
+        """Per-topic / per-subtopic accuracy, timing and error patterns, plus strengths and weaknesses.
+
+        Strengths and weaknesses rank topics with at least ``min_attempts`` by
+        Laplace-smoothed accuracy, above / below the user's overall accuracy.
+        """
+        block = self.row(user).astype(np.int64)
+        names = list(MAJOR_TOPICS) + ["Unknown"]
+
+        def stats(c: np.ndarray) -> dict:
+            attempts, timed = int(c[ATTEMPTS]), int(c[TIMED])
+            return {
+                "attempts": attempts,
+                "accuracy": float(c[CORRECT] / attempts) if attempts else None,
+                "avgSeconds": float(c[TIME_DS] / timed / 10) if timed else None,
+                "overBudgetRate": float(c[OVER_BUDGET] / timed) if timed else None,
+                "rushed": int(c[RUSHED]),
+                "skipped": int(c[SKIPPED]),
+                "submitErrors": int(c[SUBMIT_ERRORS]),
+            }
+
+        topics = {names[i]: stats(block[i]) for i in range(TOPIC_SLOTS) if block[i].any()}
+        subtopics = {
+            self.subtopics[i - TOPIC_SLOTS]: stats(block[i])
+            for i in range(TOPIC_SLOTS, self.slots) if block[i].any()
+        }
+        overall = block[:TOPIC_SLOTS].sum(axis=0)
+        attempts = block[:_UNKNOWN, ATTEMPTS]
+        smoothed = (block[:_UNKNOWN, CORRECT] + 1) / (attempts + 2)
+        base = (overall[CORRECT] + 1) / (overall[ATTEMPTS] + 2)
+        ranked = [i for i in np.argsort(-smoothed, kind="stable") if attempts[i] >= min_attempts]
+        return {
+            "user": user,
+            "budgetSeconds": BUDGET_MS / 1000,
+            "overall": stats(overall),
+            "topics": topics,
+            "subtopics": subtopics,
+            "strengths": [names[i] for i in ranked if smoothed[i] > base][:top],
+            "weaknesses": [names[i] for i in reversed(ranked) if smoothed[i] < base][:top],
+        }
+
+    def save(self, path: Union[str, Path]) -> None:
+        """Write ``path`` (uncompressed ``.npy``) and its ``.json`` sidecar, each replaced atomically."""
+        path = Path(path)
+        for target, write in (
+            (path, lambda fh: np.save(fh, np.ascontiguousarray(self.counts[: len(self.users), : self.slots]))),
+            (_meta_path(path), lambda fh: fh.write(json.dumps({
+                "users": self.users, "subtopics": self.subtopics,
+                "columns": COLUMNS, "topicSlots": TOPIC_SLOTS,
+            }).encode("utf-8"))),
+        ):
+            tmp = target.with_name(target.name + ".tmp")
+            with open(tmp, "wb") as fh:
+                write(fh)
+            os.replace(tmp, target)
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "StrengthsStore":
+        """Memory-map a snapshot copy-on-write: rows are read when touched, updates stay in memory."""
+        path = Path(path)
+        meta = json.loads(_meta_path(path).read_text(encoding="utf-8"))
+        if tuple(meta["columns"]) != COLUMNS or meta["topicSlots"] != TOPIC_SLOTS:
+            raise ValueError(f"snapshot layout does not match this version: {path}")
+        counts = np.load(path, mmap_mode="c")
+        if counts.shape != (len(meta["users"]), TOPIC_SLOTS + len(meta["subtopics"]), len(COLUMNS)):
+            raise ValueError(f"snapshot counts do not match its metadata: {path}")
+        return cls(counts, meta["users"], meta["subtopics"])
+
+
+def _meta_path(path: Path) -> Path:
+    return path.with_name(path.name + ".json")
+
+
+def _subtopic_key(subtopic: str) -> str:
+    return " ".join(subtopic.split()).lower()
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Fold attempt events into a strengths/weaknesses snapshot.")
+    ap.add_argument("snapshot")
+    ap.add_argument("events", nargs="*", help="JSONL events or dashboard export CSV (default: stdin)")
+    ap.add_argument("--user", help="user for events without a userId; also the user summarized")
+    args = ap.parse_args(argv)
+    path = Path(args.snapshot)
+    store = StrengthsStore.load(path) if path.exists() else StrengthsStore()
+    for name in args.events or ["-"]:
+        if name == "-":
+            store.add(read_events(sys.stdin), args.user)
+        else:
+            with open(name, encoding="utf-8", newline="") as fh:
+                store.add(read_events(fh), args.user)
+    store.save(path)
+    if args.user:
+        sys.stdout.write(json.dumps(store.summary(args.user)) + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,263 @@
+"""Versioned binary question bank, read through ``mmap``.
+
+Layout (little-endian, every section 8-byte aligned)::
+
+    header    magic "GQBANK\\0\\0", version u32, section count u32,
+              then (offset u64, length u64) per section
+    STR_OFF   u32[n_strings + 1]   offsets into STR_DATA
+    STR_DATA  utf-8 bytes          de-duplicated string table
+    RECORDS   RECORD_DTYPE[n]      fixed-width question rows (string ids + codes)
+    KEYS      i1[n]                answer key per question (-1 = unkeyed)
+    BUCKETS   u32[n_buckets + 1]   CSR starts per (concept, difficulty) bucket
+    ITEMS     u32[n]               question indices grouped by bucket
+    IDS       (u64 hash, u32 idx)  open-addressing table for id -> index
+
+``BankReader`` maps the file once and serves any question in O(1) from
+``memoryview``/``np.frombuffer`` slices; only the requested row is turned
+into a ``Question``.
+
+    python -m corpus.bank build [GMAT_QUANT_BASE.py] bank.bin
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import mmap
+import struct
+from pathlib import Path
+from typing import Iterable, Optional, Union
+
+import numpy as np
+
+from .dedupe import DedupIndex, unique_questions
+from .parse import DEFAULT_CORPUS, Question, iter_questions
+from .topics import GMAT_CONCEPTS
+
+MAGIC = b"GQBANK\0\0"
+VERSION = 1
+
+DIFFICULTIES = ("easy", "medium", "hard")
+KINDS = ("ps", "ds")
+DS_TYPES = (None, "value", "yes_no")
+# Concept slot len(GMAT_CONCEPTS) holds questions with no concept yet.
+N_CONCEPT_SLOTS = len(GMAT_CONCEPTS) + 1
+N_BUCKETS = N_CONCEPT_SLOTS * len(DIFFICULTIES)
+
+NO_STR = 0xFFFFFFFF
+_SECTIONS = ("STR_OFF", "STR_DATA", "RECORDS", "KEYS", "BUCKETS", "ITEMS", "IDS")
+_HEADER = struct.Struct("<8sII")
+_SECTION = struct.Struct("<QQ")
+_STR_FIELDS = ("id", "stem", "explanation", "topic", "subtopic", "source")
+
+RECORD_DTYPE = np.dtype([
+    *((name, "<u4") for name in _STR_FIELDS),
+    ("choices", "<u4", (5,)),
+    ("statements", "<u4", (2,)),
+    ("kind", "u1"),
+    ("difficulty", "u1"),
+    ("concept", "u1"),
+    ("ds_type", "u1"),
+    ("line", "<u4"),
+])
+ID_DTYPE = np.dtype([("hash", "<u8"), ("idx", "<u4"), ("_pad", "<u4")])
+
+
+def id_hash(item_id: str) -> int:
+    h = int.from_bytes(hashlib.blake2b(item_id.encode("utf-8"), digest_size=8).digest(), "little")
+    return h or 1  # 0 marks an empty slot
+
+
+def bucket_of(concept: Optional[str], difficulty: str) -> int:
+    slot = GMAT_CONCEPTS.index(concept) if concept in GMAT_CONCEPTS else len(GMAT_CONCEPTS)
+    return slot * len(DIFFICULTIES) + DIFFICULTIES.index(difficulty)
+
+
+class _Strings:
+    __slots__ = ("ids", "blobs")
+
+    def __init__(self) -> None:
+        self.ids: dict[str, int] = {}
+        self.blobs: list[bytes] = []
+
+    def ref(self, s: Optional[str]) -> int:
+        if s is None:
+            return NO_STR
+        sid = self.ids.get(s)
+        if sid is None:
+            sid = self.ids[s] = len(self.blobs)
+            self.blobs.append(s.encode("utf-8"))
+        return sid
+
+
+def _align(n: int) -> int:
+    return (n + 7) & ~7
+
+
+def write_bank(questions: Iterable[Question], path: Union[str, Path]) -> int:
+    """Write ``questions`` to ``path``; returns the number of questions written."""
+    qs = list(questions)
+    n = len(qs)
+    strings = _Strings()
+    records = np.zeros(n, dtype=RECORD_DTYPE)
+    keys = np.full(n, -1, dtype=np.int8)
+    buckets = np.empty(n, dtype=np.int64)
+
+    for i, q in enumerate(qs):
+        row = records[i]
+        for name in _STR_FIELDS:
+            row[name] = strings.ref(getattr(q, name))
+        row["choices"] = [strings.ref(c) for c in q.choices]
+        row["statements"] = [strings.ref(s) for s in (*q.statements, None, None)[:2]]
+        row["kind"] = KINDS.index(q.kind)
+        row["difficulty"] = DIFFICULTIES.index(q.difficulty)
+        row["concept"] = GMAT_CONCEPTS.index(q.concept) if q.concept in GMAT_CONCEPTS else 0xFF
+        row["ds_type"] = DS_TYPES.index(q.ds_type)
+        row["line"] = q.line
+        if q.correct_index is not None:
+            keys[i] = q.correct_index
+        buckets[i] = bucket_of(q.concept, q.difficulty)
+
+    str_off = np.zeros(len(strings.blobs) + 1, dtype="<u4")
+    np.cumsum([len(b) for b in strings.blobs], out=str_off[1:])
+    items = np.argsort(buckets, kind="stable").astype("<u4")
+    starts = np.searchsorted(buckets[items], np.arange(N_BUCKETS + 1)).astype("<u4")
+
+    size = 1 << max(1, (2 * n - 1).bit_length())
+    table = np.zeros(size, dtype=ID_DTYPE)
+    for i, q in enumerate(qs):
+        h = id_hash(q.id)
+        slot = h & (size - 1)
+        while table[slot]["hash"]:
+            slot = (slot + 1) & (size - 1)
+        table[slot] = (h, i, 0)
+
+    payloads = [str_off.tobytes(), b"".join(strings.blobs), records.tobytes(), keys.tobytes(),
+                starts.tobytes(), items.tobytes(), table.tobytes()]
+    offset = _align(_HEADER.size + _SECTION.size * len(payloads))
+    table_of_contents = []
+    for p in payloads:
+        table_of_contents.append((offset, len(p)))
+        offset = _align(offset + len(p))
+
+    with open(path, "wb") as fh:
+        fh.write(_HEADER.pack(MAGIC, VERSION, len(payloads)))
+        for off, length in table_of_contents:
+            fh.write(_SECTION.pack(off, length))
+        for (off, _), p in zip(table_of_contents, payloads):
+            fh.write(b"\0" * (off - fh.tell()))
+            fh.write(p)
+    return n
+
+
+class BankReader:
+    """Zero-copy view over a bank file; arrays it hands out keep the mapping alive."""
+
+    def __init__(self, path: Union[str, Path]) -> None:
+        with open(path, "rb") as fh:
+            self._mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        self._buf = memoryview(self._mm)
+        magic, version, count = _HEADER.unpack_from(self._buf, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path}: not a question bank")
+        if version != VERSION:
+            raise ValueError(f"{path}: bank version {version}, expected {VERSION}")
+        sections = {
+            name: _SECTION.unpack_from(self._buf, _HEADER.size + i * _SECTION.size)
+            for i, name in enumerate(_SECTIONS[:count])
+        }
+        off, length = sections["STR_DATA"]
+        self._str_data = self._buf[off:off + length]
+        self._str_off = self._view(sections["STR_OFF"], np.dtype("<u4"))
+        self.records = self._view(sections["RECORDS"], RECORD_DTYPE)
+        self.keys = self._view(sections["KEYS"], np.dtype(np.int8))
+        self._starts = self._view(sections["BUCKETS"], np.dtype("<u4"))
+        self._items = self._view(sections["ITEMS"], np.dtype("<u4"))
+        self._ids = self._view(sections["IDS"], ID_DTYPE)
+        self._mask = len(self._ids) - 1
+
+    def _view(self, section: tuple[int, int], dtype: np.dtype) -> np.ndarray:
+        off, length = section
+        return np.frombuffer(self._buf, dtype=dtype, count=length // dtype.itemsize, offset=off)
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def __enter__(self) -> "BankReader":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        for name in ("_str_off", "records", "keys", "_starts", "_items", "_ids"):
+            setattr(self, name, None)
+        try:
+            self._str_data.release()
+            self._buf.release()
+            self._mm.close()
+        except BufferError:
+            # A caller still holds a view; the map is unmapped once the last one is dropped.
+            pass
+
+    def string(self, sid: int) -> Optional[str]:
+        if sid == NO_STR:
+            return None
+        return str(self._str_data[int(self._str_off[sid]):int(self._str_off[sid + 1])], "utf-8")
+
+    def question(self, i: int) -> Question:
+        row = self.records[i]
+        key = int(self.keys[i])
+        concept = int(row["concept"])
+        return Question(
+            **{name: self.string(int(row[name])) for name in _STR_FIELDS},
+            kind=KINDS[row["kind"]],
+            choices=tuple(self.string(int(s)) for s in row["choices"]),
+            correct_index=None if key < 0 else key,
+            concept=None if concept == 0xFF else GMAT_CONCEPTS[concept],
+            difficulty=DIFFICULTIES[row["difficulty"]],
+            statements=tuple(self.string(int(s)) for s in row["statements"] if s != NO_STR),
+            ds_type=DS_TYPES[row["ds_type"]],
+            line=int(row["line"]),
+        )
+
+    def index_of(self, item_id: str) -> Optional[int]:
+        h = id_hash(item_id)
+        slot = h & self._mask
+        while True:
+            entry = self._ids[slot]
+            stored = int(entry["hash"])
+            if stored == 0:
+                return None
+            idx = int(entry["idx"])
+            if stored == h and self.string(int(self.records[idx]["id"])) == item_id:
+                return idx
+            slot = (slot + 1) & self._mask
+
+    def get(self, item_id: str) -> Optional[Question]:
+        idx = self.index_of(item_id)
+        return None if idx is None else self.question(idx)
+
+    def bucket(self, concept: Optional[str], difficulty: str) -> np.ndarray:
+        """Question indices in one (concept, difficulty) bucket, as a view into the file."""
+        b = bucket_of(concept, difficulty)
+        return self._items[self._starts[b]:self._starts[b + 1]]
+
+
+def build(corpus: Union[str, Path], out: Union[str, Path]) -> int:
+    return write_bank(unique_questions(iter_questions(corpus), DedupIndex()), out)
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Build the binary question bank.")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    b = sub.add_parser("build")
+    b.add_argument("corpus", nargs="?", default=str(DEFAULT_CORPUS))
+    b.add_argument("out")
+    args = ap.parse_args(argv)
+    n = build(args.corpus, args.out)
+    print(f"wrote {n} questions to {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,247 @@
+"""Reproducible benchmarks for the corpus pipeline, with GMAT_QUANT_BASE.py as the fixture.
+
+``synthetic_corpus`` writes a corpus ``scale`` times the fixture's size. The
+preamble and topic list appear once. Each question block is repeated
+``scale`` times, and every copy is one of:
+
+- verbatim (an exact duplicate, still keyed to its solution on file),
+- lightly perturbed (one stem number nudged, a near-duplicate), or
+- heavily perturbed (every number shifted: a new id, usually still a
+  near-duplicate of the original text).
+
+The choice is seeded, so a run is deterministic. ``run`` times each stage
+per scale: parse (questions/s, MB/s), dedup (items/s), verification (checked
+items/s on the ones with solutions on file, capped at ``verify_limit``) and
+variant generation (items/s). It also records peak RSS.
+
+``compare`` checks a result against a stored baseline. A rate below
+``baseline * (1 - tolerance)`` or a peak RSS above ``baseline * (1 +
+tolerance)`` is a regression, and the command exits 1.
+
+    python -m corpus.bench --scales 10,100,1000 --out bench.json
+    python -m corpus.bench --baseline corpus/bench_baseline.json
+    python -m corpus.bench --scales 10,100 --out corpus/bench_baseline.json   # refresh the baseline
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import re
+import resource
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Iterator, Mapping, Optional, Sequence, Union
+
+import numpy as np
+
+from .dedupe import DedupIndex, dedup_text
+from .ingest import parse_block, split_blocks, verify_question
+from .parse import DEFAULT_CORPUS, iter_questions, strip_prefix
+from .variants import TEMPLATES, generate
+
+DEFAULT_SCALES = (10, 100, 1000)
+DEFAULT_TOLERANCE = 0.3
+VERIFY_LIMIT = 2000
+GENERATE_COUNT = 2000
+
+# Metric -> +1 when higher is better, -1 when lower is better.
+METRICS = {
+    "parse_questions_per_s": 1,
+    "parse_mb_per_s": 1,
+    "dedup_items_per_s": 1,
+    "verify_items_per_s": 1,
+    "generate_items_per_s": 1,
+    "peak_rss_mb": -1,
+}
+
+_NUMBER = re.compile(r"\d+(?![\d)])")  # leaves DS statement labels ("1)") alone
+
+
+def _perturb_all(line: str, rng: np.random.Generator) -> str:
+    # A non-zero offset, so a perturbed stem never collides with the original's id.
+    return _NUMBER.sub(lambda m: str(int(m.group(0)) + int(rng.integers(1, 10))), line)
+
+
+def _nudge_last(line: str) -> str:
+    found = list(_NUMBER.finditer(line))
+    if not found:
+        return line + " "
+    m = found[-1]
+    return f"{line[:m.start()]}{int(m.group(0)) + 1}{line[m.end():]}"
+
+
+def synthetic_lines(scale: int, path: Union[str, Path] = DEFAULT_CORPUS, seed: int = 0) -> Iterator[str]:
+    """Lines of a corpus ``scale`` times the fixture (see the module docstring)."""
+    with open(path, encoding="utf-8") as fh:
+        blocks = list(split_blocks(fh))
+    rng = np.random.default_rng(seed)
+    for block in blocks:
+        lines = [line.rstrip("\n") + "\n" for line in block.lines]
+        if not parse_block(block):
+            yield from lines
+            continue
+        for copy in range(scale):
+            mode = 0 if copy == 0 else int(rng.integers(0, 3))
+            stem_seen = False
+            for i, line in enumerate(lines):
+                if i == 0 or mode == 0:
+                    yield line
+                elif mode == 2:
+                    yield _perturb_all(line, rng)
+                elif not stem_seen and strip_prefix(line):
+                    stem_seen = True
+                    yield _nudge_last(line.rstrip("\n")) + "\n"
+                else:
+                    yield line
+
+
+def synthetic_corpus(scale: int, out: Union[str, Path], path: Union[str, Path] = DEFAULT_CORPUS,
+                     seed: int = 0) -> int:
+    """Write a synthetic corpus to ``out``; returns its size in bytes."""
+    with open(out, "w", encoding="utf-8") as fh:
+        fh.writelines(synthetic_lines(scale, path, seed))
+    return os.path.getsize(out)
+
+
+def peak_rss_mb() -> float:
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1 << 20) if sys.platform == "darwin" else rss / 1024
+
+
+def _rate(count: int, seconds: float) -> float:
+    return round(count / seconds, 1) if seconds > 0 else float("inf")
+
+
+def bench_scale(scale: int, workdir: Union[str, Path], path: Union[str, Path] = DEFAULT_CORPUS,
+                seed: int = 0, verify_limit: int = VERIFY_LIMIT) -> dict:
+    corpus = Path(workdir) / f"corpus-{scale}x.py"
+    size = synthetic_corpus(scale, corpus, path, seed)
+
+    t = time.perf_counter()
+    questions = list(iter_questions(corpus))
+    parse_s = time.perf_counter() - t
+
+    index = DedupIndex()
+    kinds = {"exact": 0, "near": 0, "new": 0}
+    t = time.perf_counter()
+    for q in questions:
+        kinds[index.add(q.id, dedup_text(q)).status] += 1
+    dedup_s = time.perf_counter() - t
+
+    verified = failed = 0
+    t = time.perf_counter()
+    for q in questions:
+        if verified >= verify_limit:
+            break
+        verdict = verify_question(q)
+        if verdict is not None:
+            verified += 1
+            failed += verdict["reason"] is not None
+    verify_s = time.perf_counter() - t
+
+    return {
+        "bytes": size,
+        "questions": len(questions),
+        "parse_s": round(parse_s, 4),
+        "parse_questions_per_s": _rate(len(questions), parse_s),
+        "parse_mb_per_s": round(size / (1 << 20) / parse_s, 2) if parse_s > 0 else float("inf"),
+        "dedup_s": round(dedup_s, 4),
+        "dedup_items_per_s": _rate(len(questions), dedup_s),
+        "dedup_kinds": kinds,
+        "verified": verified,
+        "verify_failures": failed,
+        "verify_s": round(verify_s, 4),
+        "verify_items_per_s": _rate(verified, verify_s),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+    }
+
+
+def bench_generate(count: int = GENERATE_COUNT, seed: int = 0) -> dict:
+    out = {}
+    for name, template in TEMPLATES.items():
+        t = time.perf_counter()
+        n = len(generate(template, count, seed))
+        seconds = time.perf_counter() - t
+        out[name] = {"items": n, "seconds": round(seconds, 4), "generate_items_per_s": _rate(n, seconds)}
+    return out
+
+
+def run(scales: Sequence[int] = DEFAULT_SCALES, path: Union[str, Path] = DEFAULT_CORPUS, seed: int = 0,
+        verify_limit: int = VERIFY_LIMIT, generate_count: int = GENERATE_COUNT) -> dict:
+    with tempfile.TemporaryDirectory() as workdir:
+        per_scale = {str(s): bench_scale(s, workdir, path, seed, verify_limit) for s in scales}
+    return {
+        "env": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "system": platform.system(),
+        },
+        "seed": seed,
+        "scales": per_scale,
+        "generate": bench_generate(generate_count, seed),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+    }
+
+
+def _flatten(result: Mapping) -> dict[str, float]:
+    """``{"scales.10.parse_mb_per_s": ..., "generate.age.generate_items_per_s": ...}`` for tracked metrics."""
+    out: dict[str, float] = {}
+
+    def walk(prefix: str, node: Mapping) -> None:
+        for k, v in node.items():
+            if isinstance(v, Mapping):
+                walk(f"{prefix}{k}.", v)
+            elif k in METRICS:
+                out[f"{prefix}{k}"] = float(v)
+
+    walk("", {k: result[k] for k in ("scales", "generate", "peak_rss_mb") if k in result})
+    return out
+
+
+def compare(result: Mapping, baseline: Mapping, tolerance: float = DEFAULT_TOLERANCE) -> list[str]:
+    """Regressions of ``result`` against ``baseline``; metrics missing from either side are skipped."""
+    now, then = _flatten(result), _flatten(baseline)
+    problems = []
+    for key in sorted(now.keys() & then.keys()):
+        direction = METRICS[key.rsplit(".", 1)[-1]]
+        new, old = now[key], then[key]
+        if direction > 0 and new < old * (1 - tolerance):
+            problems.append(f"{key}: {new:g} < {old:g} (-{1 - new / old:.0%})")
+        elif direction < 0 and new > old * (1 + tolerance):
+            problems.append(f"{key}: {new:g} > {old:g} (+{new / old - 1:.0%})")
+    return problems
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Benchmark parse, dedup, verify and generate.")
+    ap.add_argument("path", nargs="?", default=str(DEFAULT_CORPUS))
+    ap.add_argument("--scales", default=",".join(map(str, DEFAULT_SCALES)))
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--verify-limit", type=int, default=VERIFY_LIMIT)
+    ap.add_argument("--generate-count", type=int, default=GENERATE_COUNT)
+    ap.add_argument("--out", help="write the result JSON here (default: stdout)")
+    ap.add_argument("--baseline", help="fail when a metric regresses past this stored result")
+    ap.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    args = ap.parse_args(argv)
+    scales = [int(s) for s in args.scales.split(",") if s]
+    result = run(scales, args.path, args.seed, args.verify_limit, args.generate_count)
+    text = json.dumps(result, indent=2) + "\n"
+    if args.out:
+        Path(args.out).write_text(text, encoding="utf-8")
+    else:
+        sys.stdout.write(text)
+    if args.baseline:
+        problems = compare(result, json.loads(Path(args.baseline).read_text(encoding="utf-8")), args.tolerance)
+        for p in problems:
+            sys.stderr.write(f"regression: {p}\n")
+        return 1 if problems else 0
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
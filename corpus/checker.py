@@ -0,0 +1,215 @@
+"""Exact answer checker for Problem Solving items.
+
+Each item carries a small declarative ``PSSolution``: an answer expression plus
+either linear equations (``H = P + 30``, ``H + 10 = 3(P + 10)``) or a
+``Recurrence`` (the airline fleet, fast-forwarded by ``corpus.recurrence``).
+``check`` evaluates it with Fractions, parses the five choices, and confirms
+that exactly one choice matches and that it is the keyed one.
+``check_template`` does the same for many parameterized variants at once over
+integer NumPy arrays.
+
+    python -m corpus.checker [GMAT_QUANT_BASE.py]
+"""
+from __future__ import annotations
+
+import argparse
+import re
+import sys
+from dataclasses import dataclass, field
+from fractions import Fraction
+from pathlib import Path
+from typing import Iterable, Mapping, Optional, Sequence, Union
+
+import numpy as np
+
+from .expr import Expr, Poly, solve_linear
+from .parse import DEFAULT_CORPUS, LETTERS, Question, iter_questions
+from .recurrence import Recurrence, run_recurrence
+from .sufficiency import REASON_KEY_WRONG
+
+REASON_NO_MATCH = "no choice matches"
+REASON_MULTIPLE = "two choices match"
+REASON_UNSOLVED = "solution does not determine the answer"
+
+_CHOICE_JUNK = re.compile(r"[\s$,%]|years?|dollars?")
+_POWER = re.compile(r"(\d+)\s*\^\s*(\d+)")
+
+
+@dataclass(frozen=True, slots=True)
+class PSSolution:
+    answer: str
+    equations: tuple[str, ...] = ()
+    recurrence: Optional[Recurrence] = None
+    variables: Mapping[str, str] = field(default_factory=dict)  # name -> description, for explanations
+
+
+@dataclass(frozen=True, slots=True)
+class PSItem:
+    id: str
+    choices: tuple[str, ...]
+    solution: PSSolution
+    key: Optional[int] = None
+    stem: str = ""
+    explanation: str = ""
+
+    @classmethod
+    def from_question(cls, q: Question, solution: PSSolution) -> "PSItem":
+        return cls(q.id, q.choices, solution, q.correct_index, q.stem, q.explanation)
+
+
+@dataclass(frozen=True, slots=True)
+class PSCheck:
+    id: str
+    value: Optional[Fraction]
+    matches: tuple[int, ...]
+    key: Optional[int]
+    reason: Optional[str] = None
+    warnings: tuple[str, ...] = ()
+
+    @property
+    def ok(self) -> bool:
+        return self.reason is None
+
+    @property
+    def answer(self) -> Optional[str]:
+        return LETTERS[self.matches[0]] if len(self.matches) == 1 else None
+
+
+def parse_choice(text: str) -> Optional[Fraction]:
+    """``"$1,350"`` -> 1350, ``"3/4"`` -> 3/4, ``"25%"`` -> 25; ``None`` when not numeric."""
+    s = _CHOICE_JUNK.sub("", text.replace("−", "-").replace("–", "-").lower())
+    try:
+        return Fraction(s)
+    except (ValueError, ZeroDivisionError):
+        return None
+
+
+def solve_env(solution: PSSolution, params: Optional[Mapping[str, Fraction]] = None) -> Optional[dict]:
+    """Every value the recurrence and equations determine; ``None`` when the equations do not pin them."""
+    env: dict = dict(params or {})
+    if solution.recurrence is not None:
+        env.update(run_recurrence(solution.recurrence))
+    if solution.equations:
+        eqs = [Expr(t) for t in solution.equations]
+        polys = [e.equation() for e in eqs]
+        if any(p is None or p.degree > 1 for p in polys):
+            return None
+        polys = [p.subs({k: Poly.const(v) for k, v in env.items()}) for p in polys]
+        names = sorted(set().union(*(p.names for p in polys)))
+        solved = solve_linear(polys, names)
+        if solved is None or any(not p.is_const for p in solved.values()):
+            return None
+        env.update({k: p.const_value for k, p in solved.items()})
+    return env
+
+
+def solve(solution: PSSolution, params: Optional[Mapping[str, Fraction]] = None) -> Optional[Fraction]:
+    """Exact value of ``solution.answer``; ``None`` when the equations leave it open."""
+    env = solve_env(solution, params)
+    answer = Expr(solution.answer)
+    if env is None or not answer.names <= env.keys():
+        return None
+    value = answer.exact(env)
+    return value if isinstance(value, Fraction) else Fraction(value)
+
+
+def power_mismatches(stem: str, explanation: str) -> tuple[str, ...]:
+    """Powers in the explanation whose base never appears as a base in the stem.
+
+    Catches typos like the corpus's 3^11 solution talking about "4^12".
+    """
+    bases = {m.group(1) for m in _POWER.finditer(stem)}
+    if not bases:
+        return ()
+    return tuple(dict.fromkeys(
+        m.group(0).replace(" ", "") for m in _POWER.finditer(explanation) if m.group(1) not in bases
+    ))
+
+
+def check(item: PSItem) -> PSCheck:
+    warnings = tuple(f"explanation mentions {p}" for p in power_mismatches(item.stem, item.explanation))
+    value = solve(item.solution)
+    if value is None:
+        return PSCheck(item.id, None, (), item.key, REASON_UNSOLVED, warnings)
+    matches = tuple(i for i, c in enumerate(item.choices) if parse_choice(c) == value)
+    if not matches:
+        reason: Optional[str] = REASON_NO_MATCH
+    elif len(matches) > 1:
+        reason = REASON_MULTIPLE
+    elif item.key is not None and item.key != matches[0]:
+        reason = REASON_KEY_WRONG
+    else:
+        reason = None
+    return PSCheck(item.id, value, matches, item.key, reason, warnings)
+
+
+def check_many(items: Iterable[PSItem]) -> list[PSCheck]:
+    return [check(item) for item in items]
+
+
+@dataclass(frozen=True, slots=True)
+class TemplateCheck:
+    values: np.ndarray   # answer per variant
+    matches: np.ndarray  # (n, 5) bool
+    keys: np.ndarray     # keyed index per variant (-1 = none)
+
+    @property
+    def match_count(self) -> np.ndarray:
+        return self.matches.sum(axis=1)
+
+    @property
+    def ok(self) -> np.ndarray:
+        """Exactly one match and it is the keyed choice (or there is no key)."""
+        single = self.match_count == 1
+        found = np.argmax(self.matches, axis=1)
+        return single & ((self.keys < 0) | (found == self.keys))
+
+
+def check_template(answer: str, params: Mapping[str, np.ndarray], choices: np.ndarray,
+                   keys: Optional[np.ndarray] = None) -> TemplateCheck:
+    """Check many variants of one closed-form template at once.
+
+    ``params`` maps names to integer arrays of length n, ``choices`` is an
+    (n, 5) numeric array. Integer arithmetic stays exact in int64; anything
+    with division is compared with a tight tolerance.
+    """
+    values = np.asarray(Expr(answer)(**{k: np.asarray(v) for k, v in params.items()}))
+    choices = np.asarray(choices)
+    values = np.broadcast_to(values, choices.shape[:1])
+    if np.issubdtype(values.dtype, np.integer) and np.issubdtype(choices.dtype, np.integer):
+        matches = choices == values[:, None]
+    else:
+        matches = np.isclose(choices, values[:, None], rtol=1e-12, atol=1e-9)
+    if keys is None:
+        keys = np.full(len(choices), -1, dtype=np.int64)
+    return TemplateCheck(values, matches, np.asarray(keys))
+
+
+def check_corpus(path: Union[str, Path] = DEFAULT_CORPUS) -> list[PSCheck]:
+    """Check every corpus PS item that has a declarative solution on file."""
+    from .solutions import SOLUTIONS
+
+    seen: set[str] = set()
+    out = []
+    for q in iter_questions(path):
+        if q.kind == "ps" and q.id in SOLUTIONS and q.id not in seen:
+            seen.add(q.id)
+            out.append(check(PSItem.from_question(q, SOLUTIONS[q.id])))
+    return out
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Check corpus PS items against their solutions.")
+    ap.add_argument("path", nargs="?", default=str(DEFAULT_CORPUS))
+    args = ap.parse_args(argv)
+    failed = 0
+    for c in check_corpus(args.path):
+        status = "ok" if c.ok else c.reason
+        failed += not c.ok
+        extra = f" ({'; '.join(c.warnings)})" if c.warnings else ""
+        sys.stdout.write(f"{c.id}\t{c.answer or '-'}\t{status}{extra}\n")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,246 @@
+"""Exact counting kernel for Combinations and Permutations, Probability and Overlapping Sets.
+
+Factorials live in one growing table of Python ints, so each ``n!`` is built
+once per process and ``comb`` / ``perm`` of any size are table lookups and
+one division. Pascal rows are cached by ``n``. Array queries with ``n <= TABLE_N``
+(the largest row whose entries all fit in int64) are one gather from a dense
+int64 triangle; bigger arguments fall back to exact ints in object arrays.
+
+Overlapping sets use the inclusion–exclusion identities the GMAT teaches:
+
+    Total = A + B - Both + Neither
+    Total = A + B + C - (AB + AC + BC) + ABC + Neither
+    Total = A + B + C - (exactly two) - 2(all three) + Neither
+
+Every function broadcasts over arrays. Probabilities stay rational: scalar
+helpers return ``Fraction``; batched ones return reduced ``(num, den)`` arrays.
+``comb``, ``perm`` and ``factorial`` are also functions in ``corpus.expr``, so
+templates and solutions can use them directly.
+"""
+from __future__ import annotations
+
+import math
+from fractions import Fraction
+from typing import Union
+
+import numpy as np
+
+TABLE_N = 66   # C(66, 33) < 2**63 <= C(67, 33)
+PERM_N = 20    # 20! < 2**63 <= 21!
+
+_FACT: list[int] = [1]
+_ROWS: dict[int, tuple[int, ...]] = {}
+
+IntArray = Union[int, np.ndarray]
+
+
+def factorial(n: int) -> int:
+    if n < 0:
+        raise ValueError("factorial of a negative number")
+    if n >= len(_FACT):
+        f = _FACT[-1]
+        for k in range(len(_FACT), n + 1):
+            f *= k
+            _FACT.append(f)
+    return _FACT[n]
+
+
+def _comb(n: int, r: int) -> int:
+    if n < 0:
+        raise ValueError("n must be non-negative")
+    if r < 0 or r > n:
+        return 0
+    return factorial(n) // (factorial(r) * factorial(n - r))
+
+
+def _perm(n: int, r: int) -> int:
+    if n < 0:
+        raise ValueError("n must be non-negative")
+    if r < 0 or r > n:
+        return 0
+    return factorial(n) // factorial(n - r)
+
+
+def binomial_row(n: int) -> tuple[int, ...]:
+    """``(C(n, 0), ..., C(n, n))``, cached per row."""
+    row = _ROWS.get(n)
+    if row is None:
+        row = _ROWS[n] = tuple(_comb(n, r) for r in range(n + 1))
+    return row
+
+
+PASCAL = np.array([[_comb(n, r) for r in range(TABLE_N + 1)] for n in range(TABLE_N + 1)], dtype=np.int64)
+PERMS = np.array([[_perm(n, r) for r in range(PERM_N + 1)] for n in range(PERM_N + 1)], dtype=np.int64)
+
+_comb_obj = np.frompyfunc(_comb, 2, 1)
+_perm_obj = np.frompyfunc(_perm, 2, 1)
+
+
+def _ints(x) -> np.ndarray:
+    a = np.asarray(x)
+    if a.dtype == object or np.issubdtype(a.dtype, np.integer):
+        return a
+    if not np.all(np.mod(a, 1) == 0):
+        raise ValueError("counting arguments must be integers")
+    return a.astype(np.int64)
+
+
+def _table(table: np.ndarray, size: int, exact, exact_obj, n, r) -> IntArray:
+    n, r = _ints(n), _ints(r)
+    if n.ndim == 0 and r.ndim == 0:
+        return exact(int(n), int(r))
+    n, r = np.broadcast_arrays(n, r)
+    if n.size and n.dtype != object and (n < 0).any():
+        raise ValueError("n must be non-negative")
+    if n.dtype != object and r.dtype != object and (not n.size or n.max() <= size):
+        inside = (r >= 0) & (r <= n)
+        return np.where(inside, table[n, np.clip(r, 0, size)], 0)
+    return exact_obj(n, r)
+
+
+def comb(n, r) -> IntArray:
+    """``C(n, r)``; 0 when ``r`` is outside ``[0, n]``."""
+    return _table(PASCAL, TABLE_N, _comb, _comb_obj, n, r)
+
+
+def perm(n, r) -> IntArray:
+    """``n! / (n - r)!``, ordered selections of ``r`` from ``n``."""
+    return _table(PERMS, PERM_N, _perm, _perm_obj, n, r)
+
+
+def factorials(n) -> np.ndarray:
+    """Elementwise ``n!`` (int64 up to 20!, exact object ints beyond)."""
+    n = _ints(n)
+    if n.dtype != object and (not n.size or n.max() <= PERM_N):
+        return PERMS[n, n]
+    return np.frompyfunc(factorial, 1, 1)(n)
+
+
+def multinomial(*counts: int) -> int:
+    """Arrangements of a multiset, e.g. ``multinomial(1, 4, 4, 2)`` for MISSISSIPPI."""
+    out = factorial(sum(counts))
+    for c in counts:
+        out //= factorial(c)
+    return out
+
+
+def circular(n: int) -> int:
+    """Seatings of ``n`` people around a round table."""
+    return factorial(n - 1) if n > 0 else 1
+
+
+# Overlapping sets -----------------------------------------------------------------
+
+
+def union2(a, b, both):
+    return np.asarray(a) + b - both
+
+
+def union3(a, b, c, ab, ac, bc, abc):
+    """``|A ∪ B ∪ C|`` from the pairwise intersections (each including ``abc``)."""
+    return np.asarray(a) + b + c - ab - ac - bc + abc
+
+
+def union3_exactly(a, b, c, exactly_two, all_three):
+    """``|A ∪ B ∪ C|`` when the stem gives "exactly two" and "all three" counts."""
+    return np.asarray(a) + b + c - exactly_two - 2 * np.asarray(all_three)
+
+
+_VENN2 = ("total", "a", "b", "both", "neither")
+
+
+def solve_venn2(**known) -> np.ndarray:
+    """The one missing term of ``total = a + b - both + neither`` (arrays broadcast)."""
+    missing = [k for k in _VENN2 if known.get(k) is None]
+    if len(missing) != 1 or set(known) - set(_VENN2):
+        raise ValueError(f"give exactly four of {_VENN2}")
+    v = {k: np.asarray(known[k]) for k in _VENN2 if k not in missing}
+    target = missing[0]
+    if target == "total":
+        return v["a"] + v["b"] - v["both"] + v["neither"]
+    if target == "neither":
+        return v["total"] - v["a"] - v["b"] + v["both"]
+    if target == "both":
+        return v["a"] + v["b"] + v["neither"] - v["total"]
+    other = v["b"] if target == "a" else v["a"]
+    return v["total"] - other + v["both"] - v["neither"]
+
+
+def venn2_valid(total, a, b, both, neither) -> np.ndarray:
+    """All four regions non-negative and the counts consistent."""
+    a, b, both, neither = (np.asarray(x) for x in (a, b, both, neither))
+    regions_ok = (a - both >= 0) & (b - both >= 0) & (both >= 0) & (neither >= 0)
+    return regions_ok & (union2(a, b, both) + neither == total)
+
+
+def venn3_regions(a, b, c, ab, ac, bc, abc) -> dict[str, np.ndarray]:
+    """The seven disjoint regions, from set sizes and pairwise intersections."""
+    a, b, c, ab, ac, bc, abc = (np.asarray(x) for x in (a, b, c, ab, ac, bc, abc))
+    return {
+        "a_only": a - ab - ac + abc,
+        "b_only": b - ab - bc + abc,
+        "c_only": c - ac - bc + abc,
+        "ab_only": ab - abc,
+        "ac_only": ac - abc,
+        "bc_only": bc - abc,
+        "abc": abc,
+    }
+
+
+def venn3_valid(a, b, c, ab, ac, bc, abc) -> np.ndarray:
+    regions = venn3_regions(a, b, c, ab, ac, bc, abc)
+    return np.logical_and.reduce([r >= 0 for r in regions.values()])
+
+
+# Probability ----------------------------------------------------------------------
+
+
+def ratio(num, den) -> tuple[np.ndarray, np.ndarray]:
+    """``num / den`` in lowest terms, elementwise (positive denominators)."""
+    num, den = np.broadcast_arrays(np.asarray(num), np.asarray(den))
+    if (den == 0).any():
+        raise ZeroDivisionError("zero denominator")
+    sign = np.where(den < 0, -1, 1)
+    if num.dtype == object or den.dtype == object:
+        g = np.frompyfunc(math.gcd, 2, 1)(num, den)
+    else:
+        g = np.gcd(num, den)
+    g = np.where(g == 0, 1, g)
+    return sign * num // g, sign * den // g
+
+
+def hypergeom(population: int, successes: int, draws: int, k: int) -> Fraction:
+    """P(exactly ``k`` successes) drawing ``draws`` without replacement."""
+    return Fraction(
+        _comb(successes, k) * _comb(population - successes, draws - k), _comb(population, draws)
+    )
+
+
+def _exact(a) -> np.ndarray:
+    return np.asarray(a).astype(object)
+
+
+def _narrow(a: np.ndarray) -> np.ndarray:
+    """Back to int64 when every entry fits, else left as exact object ints."""
+    if a.dtype == object and all(-(1 << 63) <= int(v) < (1 << 63) for v in a.flat):
+        return a.astype(np.int64)
+    return a
+
+
+def hypergeom_batch(population, successes, draws, k) -> tuple[np.ndarray, np.ndarray]:
+    # Products of int64 binomials overflow long before the factors do, so multiply exact ints.
+    num = _exact(comb(successes, k)) * _exact(comb(np.asarray(population) - successes, np.asarray(draws) - k))
+    num, den = ratio(num, _exact(comb(population, draws)))
+    return _narrow(num), _narrow(den)
+
+
+def at_least_one(population: int, successes: int, draws: int) -> Fraction:
+    """1 - P(none), the complement the GMAT solutions use."""
+    return 1 - hypergeom(population, successes, draws, 0)
+
+
+def binomial_pmf(n: int, k: int, p: Union[Fraction, int, str]) -> Fraction:
+    """P(exactly ``k`` successes in ``n`` independent trials with success chance ``p``)."""
+    p = Fraction(p)
+    return _comb(n, k) * p ** k * (1 - p) ** (n - k)
+
@@ -0,0 +1,79 @@
+"""Batched units-digit / cyclicity answers for number-property items.
+
+The corpus works out the units digit of 3^11 by listing the 3-9-7-1 cycle.
+Every base's units digit repeats with a period dividing 4, so ``UNITS_TABLE``
+answers ``a^b mod 10`` with one gather. Larger moduli (last k digits,
+remainders) use vectorized square-and-multiply; the full power is never built.
+All functions accept scalars or arrays of any shape and broadcast.
+"""
+from __future__ import annotations
+
+import numpy as np
+
+# UNITS_TABLE[d, 0] = d^0 = 1; UNITS_TABLE[d, k] = units digit of d^k for k = 1..4.
+UNITS_TABLE = np.array(
+    [[1] + [pow(d, k, 10) for k in range(1, 5)] for d in range(10)], dtype=np.uint8
+)
+
+# Distinct repeating pattern per units digit, e.g. CYCLES[3] == (3, 9, 7, 1).
+CYCLES: tuple[tuple[int, ...], ...] = tuple(
+    tuple(int(v) for v in UNITS_TABLE[d, 1:len({pow(d, k, 10) for k in range(1, 5)}) + 1])
+    for d in range(10)
+)
+
+# Largest modulus for which (m - 1)^2 still fits in uint64.
+MAX_MODULUS = 1 << 32
+
+
+def _exponents(b) -> np.ndarray:
+    b = np.asarray(b, dtype=np.int64)
+    if (b < 0).any():
+        raise ValueError("exponents must be non-negative")
+    return b
+
+
+def cycle(a: int) -> tuple[int, ...]:
+    """Units-digit cycle of ``a``'s powers (0^0 aside)."""
+    return CYCLES[a % 10]
+
+
+def units_digit(a, b) -> np.ndarray:
+    """Units digit of ``a^b`` elementwise; negative bases use ``|a|`` ((-3)^3 = -27 -> 7)."""
+    d = np.mod(np.abs(np.asarray(a, dtype=np.int64)), 10)
+    b = _exponents(b)
+    col = np.where(b == 0, 0, (b - 1) % 4 + 1)
+    return UNITS_TABLE[d, col]
+
+
+def pow_mod(a, b, m) -> np.ndarray:
+    """``a^b mod m`` elementwise by square-and-multiply (``1 <= m <= 2**32``)."""
+    m_arr = np.asarray(m, dtype=np.int64)
+    if (m_arr < 1).any() or (m_arr > MAX_MODULUS).any():
+        raise ValueError(f"modulus must be in [1, {MAX_MODULUS}]")
+    b = _exponents(b)
+    a, b, m_arr = np.broadcast_arrays(np.asarray(a, dtype=np.int64), b, m_arr)
+    shape = a.shape
+    mod = m_arr.astype(np.uint64).ravel()
+    base = np.mod(a, m_arr).astype(np.uint64).ravel()
+    exp = b.astype(np.uint64).ravel()
+    result = np.ones(base.shape, dtype=np.uint64) % mod
+    tmp = np.empty_like(result)
+    one = np.uint64(1)
+    while exp.any():
+        odd = (exp & one).astype(bool)
+        np.multiply(result, base, out=tmp)
+        np.remainder(tmp, mod, out=tmp)
+        np.copyto(result, tmp, where=odd)
+        np.multiply(base, base, out=base)
+        np.remainder(base, mod, out=base)
+        np.right_shift(exp, one, out=exp)
+    return result.reshape(shape)
+
+
+def last_digits(a, b, k: int) -> np.ndarray:
+    """Last ``k`` digits of ``|a^b|`` as integers (``1 <= k <= 9``)."""
+    if not 1 <= k <= 9:
+        raise ValueError("k must be between 1 and 9")
+    if k == 1:
+        return units_digit(a, b).astype(np.uint64)
+    return pow_mod(np.abs(np.asarray(a, dtype=np.int64)), b, 10 ** k)
@@ -0,0 +1,198 @@
+"""Exact + near-duplicate detection for corpus questions.
+
+Python counterpart of lib/server/dedupe.ts for the ingest path. Stems are
+normalized (unicode, whitespace, dashes, currency, thousands separators) and
+keyed two ways:
+
+- an exact 64-bit digest of the normalized text, and
+- a MinHash signature over character shingles, bucketed with LSH bands so
+  near-duplicates are found without comparing against every stored item.
+
+``DedupIndex.save`` writes digests and signatures to one ``.npz`` file;
+``DedupIndex.load`` rebuilds the LSH buckets from the stored signatures, so a
+later ingest only hashes blocks it has not seen.
+"""
+from __future__ import annotations
+
+import hashlib
+import re
+import unicodedata
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Iterator, Optional, Union
+
+import numpy as np
+
+from .instrument import NULL, Recorder
+from .parse import Question
+
+_MERSENNE = np.uint64((1 << 31) - 1)
+_DASHES = dict.fromkeys(map(ord, "‐‑‒–—―−"), "-")
+_QUOTES = {ord("‘"): "'", ord("’"): "'", ord("“"): '"', ord("”"): '"'}
+_THOUSANDS = re.compile(r"(?<=\d),(?=\d{3}\b)")
+_CURRENCY_WORD = re.compile(r"\b(\d+(?:\.\d+)?)\s*(?:dollars?|usd)\b")
+_CURRENCY_SIGN = re.compile(r"(?:usd|\$)\s*(?=\d)")
+_SPACE = re.compile(r"\s+")
+
+
+def normalize_stem(text: str) -> str:
+    """Canonical text used for both exact and near-duplicate keys."""
+    s = unicodedata.normalize("NFKC", text).translate(_DASHES).translate(_QUOTES).lower()
+    s = _THOUSANDS.sub("", s)
+    s = _CURRENCY_SIGN.sub("$", s)
+    s = _CURRENCY_WORD.sub(r"$\1", s)
+    return _SPACE.sub(" ", s).strip().rstrip(".?!")
+
+
+def dedup_text(q: Question) -> str:
+    """Stem plus DS statements: the same DS question with new statements is a new item."""
+    return " ".join((q.stem, *q.statements))
+
+
+def exact_digest(normalized: str) -> int:
+    return int.from_bytes(hashlib.sha1(normalized.encode("utf-8")).digest()[:8], "little")
+
+
+def shingles(normalized: str, k: int = 5) -> np.ndarray:
+    """CRC32 of every k-character shingle (the whole text when shorter than k)."""
+    data = normalized.encode("utf-8")
+    if len(data) <= k:
+        return np.array([zlib.crc32(data)], dtype=np.uint64)
+    return np.fromiter(
+        (zlib.crc32(data[i:i + k]) for i in range(len(data) - k + 1)),
+        dtype=np.uint64,
+        count=len(data) - k + 1,
+    )
+
+
+@dataclass(frozen=True, slots=True)
+class DedupResult:
+    status: str  # "new" | "exact" | "near"
+    match_id: Optional[str] = None
+    similarity: float = 0.0
+
+    @property
+    def is_duplicate(self) -> bool:
+        return self.status != "new"
+
+
+class DedupIndex:
+    """Exact digest map + MinHash/LSH buckets over everything added so far."""
+
+    def __init__(self, num_perm: int = 64, bands: int = 16, threshold: float = 0.8,
+                 shingle: int = 5, seed: int = 1) -> None:
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        self.shingle = shingle
+        self.seed = seed
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, int(_MERSENNE), size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, int(_MERSENNE), size=num_perm, dtype=np.uint64)
+        self._ids: list[str] = []
+        self._digests: list[int] = []
+        self._sigs: list[np.ndarray] = []
+        self._by_digest: dict[int, int] = {}
+        self._buckets: list[dict[bytes, list[int]]] = [{} for _ in range(bands)]
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def signature(self, normalized: str) -> np.ndarray:
+        x = shingles(normalized, self.shingle) % _MERSENNE
+        # (num_perm, n_shingles) universal hashes; a, x < 2^31 so the product fits in uint64.
+        h = (self._a[:, None] * x[None, :] + self._b[:, None]) % _MERSENNE
+        return h.min(axis=1).astype(np.uint32)
+
+    def _band_keys(self, sig: np.ndarray) -> Iterator[tuple[int, bytes]]:
+        for band in range(self.bands):
+            yield band, sig[band * self.rows:(band + 1) * self.rows].tobytes()
+
+    def _lookup(self, digest: int, sig: np.ndarray) -> DedupResult:
+        hit = self._by_digest.get(digest)
+        if hit is not None:
+            return DedupResult("exact", self._ids[hit], 1.0)
+        candidates: set[int] = set()
+        for band, key in self._band_keys(sig):
+            candidates.update(self._buckets[band].get(key, ()))
+        best, best_sim = -1, 0.0
+        for idx in candidates:
+            sim = float(np.count_nonzero(self._sigs[idx] == sig)) / self.num_perm
+            if sim > best_sim:
+                best, best_sim = idx, sim
+        if best >= 0 and best_sim >= self.threshold:
+            return DedupResult("near", self._ids[best], best_sim)
+        return DedupResult("new")
+
+    def _insert(self, item_id: str, digest: int, sig: np.ndarray) -> None:
+        idx = len(self._ids)
+        self._ids.append(item_id)
+        self._digests.append(digest)
+        self._sigs.append(sig)
+        self._by_digest.setdefault(digest, idx)
+        for band, key in self._band_keys(sig):
+            self._buckets[band].setdefault(key, []).append(idx)
+
+    def check(self, text: str) -> DedupResult:
+        norm = normalize_stem(text)
+        return self._lookup(exact_digest(norm), self.signature(norm))
+
+    def add(self, item_id: str, text: str) -> DedupResult:
+        """Check ``text`` and index it when it is new. Duplicates are not stored."""
+        norm = normalize_stem(text)
+        digest = exact_digest(norm)
+        if digest in self._by_digest:
+            return DedupResult("exact", self._ids[self._by_digest[digest]], 1.0)
+        sig = self.signature(norm)
+        result = self._lookup(digest, sig)
+        if not result.is_duplicate:
+            self._insert(item_id, digest, sig)
+        return result
+
+    def save(self, path: Union[str, Path]) -> None:
+        sigs = np.stack(self._sigs) if self._sigs else np.zeros((0, self.num_perm), np.uint32)
+        with open(path, "wb") as fh:
+            np.savez_compressed(
+                fh,
+                params=np.array([self.num_perm, self.bands, self.shingle, self.seed], np.int64),
+                threshold=np.array(self.threshold),
+                ids=np.array(self._ids, dtype=np.str_),
+                digests=np.array(self._digests, dtype=np.uint64),
+                sigs=sigs,
+            )
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "DedupIndex":
+        with np.load(path) as data:
+            num_perm, bands, shingle, seed = (int(v) for v in data["params"])
+            index = cls(num_perm, bands, float(data["threshold"]), shingle, seed)
+            for item_id, digest, sig in zip(data["ids"].tolist(), data["digests"].tolist(), data["sigs"]):
+                index._insert(item_id, int(digest), sig)
+        return index
+
+    @classmethod
+    def open(cls, path: Union[str, Path], **kwargs) -> "DedupIndex":
+        """Load ``path`` if it exists, otherwise start an empty index."""
+        return cls.load(path) if Path(path).exists() else cls(**kwargs)
+
+
+def unique_questions(questions: Iterable[Question], index: DedupIndex,
+                     recorder: Optional[Recorder] = None) -> Iterator[Question]:
+    """Ingest filter: yield only questions the index has not seen (exactly or nearly).
+
+    ``recorder`` times the whole pass under one "dedup" span and counts
+    rejections as "exact duplicate" / "near duplicate".
+    """
+    rec = recorder or NULL
+    with rec.stage("dedup") as span:
+        for q in questions:
+            result = index.add(q.id, dedup_text(q))
+            span.count()
+            if result.is_duplicate:
+                span.reject(f"{result.status} duplicate")
+            else:
+                yield q
@@ -0,0 +1,401 @@
+"""Deterministic step-by-step explanations rendered from structured solutions.
+
+The text follows the corpus's worked examples: "The major topic tested here
+is …", define the variables, set up the equations, solve, substitute into what
+is asked, "Answer: X". Nothing is generated freely. Every sentence is a fixed
+template filled from exact values:
+
+- PS items: a ``PSSolution`` (equations or a ``Recurrence``, plus variable
+  descriptions) solved with ``checker.solve_env``;
+- DS items: a ``DSItem`` and its ``sufficiency.verify`` verdict, statement by
+  statement;
+- variants: ``Template.walkthrough`` is a ``PSSolution`` with ``{param}``
+  slots, filled per ``Batch`` row. A wrong choice that came from a distractor
+  expression is explained by that expression.
+
+Only items that verify are rendered; anything else raises ``ValueError``. An
+``Explanation`` carries the body plus one note per answer choice, so
+``ExplanationStore.get(id, chosen)`` serves any (item, choice) pair without
+rendering again.
+
+    python -m corpus.explain > explanations.jsonl
+    python -m corpus.explain --template age --count 1000 > age-explanations.jsonl
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import re
+import sys
+from dataclasses import dataclass, replace
+from fractions import Fraction
+from pathlib import Path
+from typing import Iterable, Iterator, Mapping, Optional, Sequence, Union
+
+import numpy as np
+
+from .checker import PSItem, PSSolution, check, solve_env
+from .expr import Expr
+from .parse import DEFAULT_CORPUS, LETTERS, Question, iter_questions
+from .recurrence import AffineRecurrence, Recurrence
+from .sufficiency import DSItem, DSVerdict, verify
+from .variants import TEMPLATES, Batch, generate
+
+TOPIC_LINE = "The major topic tested here is {topic}, and the subtopic is {subtopic}."
+VARIABLES_LINE = "Our first step to solve the problem is to create {count}:"
+EQUATIONS_LINE = "Next, we can create {count} from the information presented in the problem stem:"
+SOLVED_LINE = "Solving, we have {values}."
+STEP_LINE = "Each year, {changes}. We start with {start} and need the first n for which {until}."
+BEFORE_LINE = "After {n} years, {state}, and {until} is not yet true."
+CROSSING_LINE = "After {n} years, {state}, and {until} is true."
+RESULT_LINE = "Thus, {work}."
+NAMED_RESULT_LINE = "So {what} is {value}."
+ANSWER_LINE = "Answer: {letter}"
+PS_NOTE = "Choice {letter} ({choice}) is not {answer}."
+DISTRACTOR_NOTE = "Choice {letter} ({choice}) comes from {slip} rather than {answer}."
+
+DS_OPENING = "Since there is no given information, we can jump right into statement one."
+DS_GIVEN = "We are given that {given}."
+DS_HEADERS = ("Statement One Alone:", "Statement Two Alone:", "Statements One and Two Together:")
+DS_SUBJECTS = ("statement one", "statement two", "statements one and two together")
+DS_FORMAL = "We can write this as:"
+DS_ALWAYS = "We always get an answer of {yes_no} to “Is {question}?”, so {subject} {verb} sufficient."
+DS_BOTH_WAYS = "We can get an answer of YES and an answer of NO, so {subject} {verb} not sufficient."
+DS_VALUE = "This gives {question} = {value}, so {subject} {verb} sufficient."
+DS_VALUES = "The value of {question} could be {values}, so {subject} {verb} not sufficient."
+DS_NOTE = "Choice {letter} does not fit: {facts}."
+
+_COUNTS = ("no", "one", "two", "three", "four", "five", "six")
+_NAME = re.compile(r"(?<![A-Za-z_])[A-Za-z_][A-Za-z_0-9]*")
+_FIELD = re.compile(r"\{(\w+)\}")
+
+
+@dataclass(frozen=True, slots=True)
+class Explanation:
+    id: str
+    answer: str                # keyed letter
+    text: str
+    notes: tuple[str, ...]     # one per choice; "" for the keyed one
+
+    def for_choice(self, chosen: Optional[int] = None) -> str:
+        """The explanation, followed by why ``chosen`` is wrong when it is."""
+        note = self.notes[chosen] if chosen is not None and 0 <= chosen < len(self.notes) else ""
+        return f"{self.text}\n\n{note}" if note else self.text
+
+    def to_dict(self) -> dict:
+        return {"id": self.id, "answer": self.answer, "explanation": self.text, "notes": list(self.notes)}
+
+    @classmethod
+    def from_dict(cls, d: Mapping) -> "Explanation":
+        return cls(d["id"], d["answer"], d["explanation"], tuple(d["notes"]))
+
+
+def fmt(value) -> str:
+    """``Fraction(38)`` -> ``38``, ``Fraction(3, 4)`` -> ``3/4``, floats without noise."""
+    if isinstance(value, bool):
+        return "YES" if value else "NO"
+    if isinstance(value, Fraction):
+        return str(value.numerator) if value.denominator == 1 else f"{value.numerator}/{value.denominator}"
+    if isinstance(value, float):
+        return str(int(value)) if value.is_integer() else f"{value:g}"
+    return str(value)
+
+
+def substitute(text: str, env: Mapping[str, object]) -> str:
+    """Replace names in ``text`` by their values; ``3P`` with P = 5 becomes ``3(5)``."""
+    def value(m: re.Match) -> str:
+        name = m.group(0)
+        if name not in env:
+            return name
+        v = fmt(env[name])
+        glued = m.start() > 0 and (text[m.start() - 1].isdigit() or text[m.start() - 1] == ")")
+        return f"({v})" if glued or v.startswith("-") or "/" in v else v
+
+    return _NAME.sub(value, text)
+
+
+def _join(parts: Sequence[str]) -> str:
+    if len(parts) <= 2:
+        return " and ".join(parts)
+    return ", ".join(parts[:-1]) + ", and " + parts[-1]
+
+
+def _count(n: int, noun: str) -> str:
+    word = _COUNTS[n] if n < len(_COUNTS) else str(n)
+    if n == 1:
+        return f"an {noun}" if noun[0] in "aeiou" else f"a {noun}"
+    return f"{word} {noun}s"
+
+
+def _topic_line(q: Question) -> list[str]:
+    if not q.topic:
+        return []
+    return [TOPIC_LINE.format(topic=q.topic.lower(), subtopic=q.subtopic or q.topic.lower())]
+
+
+def _work(answer: str, env: Mapping[str, object], value: Fraction) -> str:
+    """``H + 3 = 35 + 3 = 38`` with repeated steps dropped."""
+    steps = [answer.strip(), substitute(answer, env).strip(), fmt(value)]
+    return " = ".join(dict.fromkeys(steps))
+
+
+def _recurrence_steps(rec: Recurrence, env: Mapping[str, object],
+                      before: Optional[Mapping[str, object]] = None) -> list[str]:
+    """Setup, the state one step short of the crossing, and the crossing itself."""
+    names = list(rec.step)
+    init = {n: Expr(str(v)).exact({}) for n, v in rec.init.items()}
+    until = Expr(rec.until)
+    lines = [STEP_LINE.format(
+        changes=_join([f"{n} becomes {rec.step[n]}" for n in names]),
+        start=_join([f"{n} = {fmt(init[n])}" for n in names]),
+        until=rec.until,
+    )]
+    n = int(env["n"])
+    if before is None and n > 0:
+        affine = AffineRecurrence.from_steps(rec.step) if set(rec.step) == set(init) else None
+        if affine is not None:
+            before = dict(zip(affine.names, affine.state([init[k] for k in affine.names], n - 1)))
+    if before is not None:
+        if until.exact(before):
+            raise ValueError(f"{rec.until!r} already holds after {n - 1} steps")
+        lines.append(BEFORE_LINE.format(
+            n=n - 1, state=_join([f"{k} = {fmt(before[k])}" for k in names]),
+            until=substitute(rec.until, before),
+        ))
+    if not until.exact(env):
+        raise ValueError(f"{rec.until!r} does not hold after {n} steps")
+    lines.append(CROSSING_LINE.format(
+        n=n, state=_join([f"{k} = {fmt(env[k])}" for k in names]), until=substitute(rec.until, env),
+    ))
+    return lines
+
+
+def _render_ps(q: Question, solution: PSSolution, env: Mapping[str, object], value: Fraction, key: int,
+               distractors: Optional[Mapping[int, str]] = None,
+               before: Optional[Mapping[str, object]] = None) -> Explanation:
+    distractors = distractors or {}
+    letter = LETTERS[key]
+    lines = _topic_line(q)
+    if solution.variables:
+        lines.append(VARIABLES_LINE.format(count=_count(len(solution.variables), "variable")))
+        lines += [f"{name} = {desc}" for name, desc in solution.variables.items()]
+    if solution.recurrence is not None:
+        lines += _recurrence_steps(solution.recurrence, env, before)
+    if solution.equations:
+        lines.append(EQUATIONS_LINE.format(count=_count(len(solution.equations), "equation")))
+        lines += list(solution.equations)
+        unknowns = [n for n in solution.variables if n in env] or sorted(
+            set().union(*(Expr(e).names for e in solution.equations))
+        )
+        lines.append(SOLVED_LINE.format(values=_join([f"{n} = {fmt(env[n])}" for n in unknowns])))
+    answer = solution.answer.strip()
+    work = _work(answer, env, value)
+    if answer in solution.variables:
+        lines.append(NAMED_RESULT_LINE.format(what=solution.variables[answer], value=fmt(value)))
+    else:
+        lines.append(RESULT_LINE.format(work=work))
+    lines.append(ANSWER_LINE.format(letter=letter))
+    notes = []
+    for i, choice in enumerate(q.choices):
+        if i == key:
+            notes.append("")
+        elif i in distractors:
+            notes.append(DISTRACTOR_NOTE.format(letter=LETTERS[i], choice=choice, slip=distractors[i], answer=work))
+        else:
+            notes.append(PS_NOTE.format(letter=LETTERS[i], choice=choice, answer=work))
+    return Explanation(q.id, letter, "\n\n".join(lines), tuple(notes))
+
+
+def explain_ps(q: Question, solution: PSSolution, distractors: Optional[Mapping[int, str]] = None) -> Explanation:
+    """Explain a PS item; ``distractors`` maps a wrong choice index to the slip that produced it."""
+    result = check(PSItem.from_question(q, solution))
+    if not result.ok:
+        raise ValueError(f"{q.id}: {result.reason}")
+    env = solve_env(solution)
+    assert env is not None and result.value is not None
+    return _render_ps(q, solution, env, result.value, result.matches[0], distractors)
+
+
+def _outcome_line(item: DSItem, i: int, outcome) -> str:
+    subject, question = DS_SUBJECTS[i], item.question
+    verb = "are" if i == 2 else "is"
+    values = outcome.outcomes
+    if Expr(question).is_relation:
+        if outcome.sufficient:
+            return DS_ALWAYS.format(yes_no=fmt(values[0]), question=question, subject=subject, verb=verb)
+        return DS_BOTH_WAYS.format(subject=subject, verb=verb)
+    if outcome.sufficient:
+        return DS_VALUE.format(question=question, value=fmt(values[0]), subject=subject, verb=verb)
+    shown = [fmt(v) for v in values[:3]] + (["others"] if len(values) > 3 else [])
+    return DS_VALUES.format(question=question, values=" or ".join(shown), subject=subject, verb=verb)
+
+
+def explain_ds(q: Question, item: DSItem, verdict: Optional[DSVerdict] = None) -> Explanation:
+    """Explain a DS item statement by statement from its (verified) sufficiency checks."""
+    verdict = verdict or verify(item)
+    if not verdict.ok or verdict.answer is None:
+        raise ValueError(f"{q.id}: {verdict.reason}")
+    if any(c.sufficient is None for c in verdict.checks):
+        raise ValueError(f"{q.id}: statements contradict each other")
+    lines = _topic_line(q)
+    lines.append(DS_GIVEN.format(given=_join(list(item.given))) if item.given else DS_OPENING)
+    for i, outcome in enumerate(verdict.checks):
+        lines.append(DS_HEADERS[i])
+        if i < 2:
+            formal = [item.statements[i]] if isinstance(item.statements[i], str) else list(item.statements[i])
+            text = q.statements[i] if i < len(q.statements) else ""
+            if text:
+                lines.append(text)
+            if formal != [text]:
+                lines += [DS_FORMAL, *formal]
+        lines.append(_outcome_line(item, i, outcome))
+    lines.append(ANSWER_LINE.format(letter=verdict.answer))
+    facts = _join([
+        f"{DS_SUBJECTS[i]} {'are' if i == 2 else 'is'}{'' if c.sufficient else ' not'} sufficient"
+        for i, c in enumerate(verdict.checks)
+    ])
+    notes = tuple("" if letter == verdict.answer else DS_NOTE.format(letter=letter, facts=facts)
+                  for letter in LETTERS)
+    return Explanation(q.id, verdict.answer, "\n\n".join(lines), notes)
+
+
+def _fill(text: str, env: Mapping[str, object]) -> str:
+    return _FIELD.sub(lambda m: str(env[m.group(1)]), text)
+
+
+def fill_walkthrough(walkthrough: PSSolution, env: Mapping[str, object]) -> PSSolution:
+    """A template walkthrough with every ``{param}`` slot replaced from ``env``."""
+    rec = walkthrough.recurrence
+    if rec is not None:
+        rec = replace(
+            rec,
+            init={k: _fill(str(v), env) for k, v in rec.init.items()},
+            step={k: _fill(v, env) for k, v in rec.step.items()},
+            until=_fill(rec.until, env),
+        )
+    return PSSolution(
+        answer=_fill(walkthrough.answer, env),
+        equations=tuple(_fill(e, env) for e in walkthrough.equations),
+        recurrence=rec,
+        variables={k: _fill(v, env) for k, v in walkthrough.variables.items()},
+    )
+
+
+def _exact(v: float) -> Fraction:
+    return Fraction(v).limit_denominator(1_000_000)
+
+
+def explain_batch(batch: Batch) -> list[Explanation]:
+    """Explanations for every row of a verified variant batch.
+
+    Rows already passed ``check_template``, so each one is solved once: linear
+    walkthroughs exactly, recurrences for the whole batch in one
+    ``affine_states`` call at the keyed n and n - 1.
+    """
+    t = batch.template
+    if t.walkthrough is None:
+        raise ValueError(f"template {t.name!r} has no walkthrough")
+    answers = batch.choices[np.arange(len(batch)), batch.keys]
+    states = before = None
+    if t.walkthrough.recurrence is not None:
+        states = batch.recurrence_states(answers)
+        before = batch.recurrence_states(np.maximum(answers - 1, 0))
+    slips = [np.asarray(Expr(d)(**batch.params, ans=answers)) * np.ones(len(batch), dtype=np.int64)
+             for d in t.distractors]
+    unknowns = set(t.walkthrough.variables)
+    out = []
+    for i, q in enumerate(batch.questions()):
+        solution = fill_walkthrough(t.walkthrough, batch.labelled(i))
+        key = int(batch.keys[i])
+        prev = None
+        if states is not None:
+            env: Optional[dict] = {k: _exact(v[i]) for k, v in states.items()}
+            env["n"] = Fraction(int(answers[i]))
+            prev = {k: _exact(v[i]) for k, v in before.items()} if answers[i] > 0 else None
+        else:
+            env = solve_env(solution)
+        value = Expr(solution.answer).exact(env or {})
+        if env is None or value != answers[i]:
+            raise ValueError(f"{q.id}: walkthrough gives {value}, keyed choice is {answers[i]}")
+        row = {k: v for k, v in batch.row(i).items() if k not in unknowns}
+        distractors: dict[int, str] = {}
+        for j, choice in enumerate(batch.choices[i].tolist()):
+            hit = next((d for d, vals in zip(t.distractors, slips) if vals[i] == choice), None)
+            if j != key and hit is not None:
+                distractors[j] = substitute(hit, row)
+        out.append(_render_ps(q, solution, env, value, key, distractors, prev))
+    return out
+
+
+def explain_corpus(path: Union[str, Path] = DEFAULT_CORPUS) -> list[Explanation]:
+    """Explanations for every corpus item that has a structured solution on file."""
+    from .solutions import DS_ITEMS, SOLUTIONS
+
+    seen: set[str] = set()
+    out = []
+    for q in iter_questions(path):
+        if q.id in seen:
+            continue
+        seen.add(q.id)
+        if q.kind == "ps" and q.id in SOLUTIONS:
+            out.append(explain_ps(q, SOLUTIONS[q.id]))
+        elif q.kind == "ds" and q.id in DS_ITEMS:
+            out.append(explain_ds(q, DS_ITEMS[q.id]))
+    return out
+
+
+class ExplanationStore:
+    """Rendered explanations by item id; ``get`` adds the note for the chosen answer."""
+
+    __slots__ = ("_items",)
+
+    def __init__(self, explanations: Iterable[Explanation] = ()) -> None:
+        self._items: dict[str, Explanation] = {}
+        self.add_many(explanations)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __contains__(self, item_id: str) -> bool:
+        return item_id in self._items
+
+    def add_many(self, explanations: Iterable[Explanation]) -> None:
+        for e in explanations:
+            self._items[e.id] = e
+
+    def get(self, item_id: str, chosen: Optional[int] = None) -> Optional[str]:
+        e = self._items.get(item_id)
+        return None if e is None else e.for_choice(chosen)
+
+    def __iter__(self) -> Iterator[Explanation]:
+        return iter(self._items.values())
+
+    def save(self, path: Union[str, Path]) -> None:
+        with open(path, "w", encoding="utf-8") as fh:
+            for e in self._items.values():
+                fh.write(json.dumps(e.to_dict(), ensure_ascii=False) + "\n")
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "ExplanationStore":
+        with open(path, encoding="utf-8") as fh:
+            return cls(Explanation.from_dict(json.loads(line)) for line in fh if line.strip())
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Render step-by-step explanations as JSONL.")
+    ap.add_argument("path", nargs="?", default=str(DEFAULT_CORPUS))
+    ap.add_argument("--template", choices=sorted(n for n, t in TEMPLATES.items() if t.walkthrough))
+    ap.add_argument("--count", type=int, default=100)
+    ap.add_argument("--seed", type=int, default=None)
+    args = ap.parse_args(argv)
+    if args.template:
+        explanations = explain_batch(generate(TEMPLATES[args.template], args.count, args.seed))
+    else:
+        explanations = explain_corpus(args.path)
+    for e in explanations:
+        sys.stdout.write(json.dumps(e.to_dict(), ensure_ascii=False) + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,435 @@
+"""Small, safe expression language for declarative checks on corpus items.
+
+Expressions are written the way the corpus writes math (``2x + 5x + 7x = 70``,
+``x^2 – x – 12 = 0``, ``H + 10 = 3(P + 10)``); ``prepare`` rewrites them into
+Python syntax and the AST is whitelisted before compiling. One ``Expr`` can be
+evaluated three ways:
+
+- ``expr(**arrays)``  vectorized over NumPy arrays (sampling),
+- ``expr.exact(env)`` with ``fractions.Fraction`` (exact checks),
+- ``expr.poly()``     as a ``Poly`` for linear / polynomial solving.
+
+Besides ``abs`` and ``sqrt``, the counting functions ``comb(n, r)``,
+``perm(n, r)`` and ``factorial(n)`` come from ``corpus.counting``. Vectorized,
+they return NaN where ``n`` is negative or an argument is not whole, so
+samplers can drop those rows; exact evaluation raises ``ValueError``.
+Exact ``^`` raises ``OverflowError`` rather than build a runaway big integer
+(exponents beyond ``MAX_EXPONENT``; vectorized, such a power is ``inf``); text that does not parse, or uses syntax
+outside the whitelist, raises ``ValueError`` when the ``Expr`` is built.
+
+``solve_linear`` eliminates a system of linear ``Poly`` equations exactly.
+"""
+from __future__ import annotations
+
+import ast
+import math
+import operator
+import re
+from fractions import Fraction
+from functools import reduce
+from typing import Mapping, Optional, Union
+
+import numpy as np
+
+from . import counting
+
+Number = Union[Fraction, float]
+
+FUNCTIONS = frozenset({"abs", "sqrt", "comb", "perm", "factorial"})
+MAX_EXPONENT = 64
+_MAX_POW_BITS = 1 << 16
+
+_SYMBOLS = str.maketrans({
+    "–": "-", "—": "-", "−": "-", "×": "*", "·": "*", "÷": "/",
+    "≤": "<=", "≥": ">=", "≠": "!=", "^": "**",
+})
+_SINGLE_EQ = re.compile(r"(?<![<>=!])=(?!=)")
+_KEYWORD = r"(?!(?:and|or|not)\b)"
+_DIGIT_BEFORE = re.compile(rf"(\d)\s*(?={_KEYWORD}[A-Za-z_(])")
+_CLOSE_BEFORE = re.compile(rf"\)\s*(?={_KEYWORD}[\w(])")
+_NAME_PAREN = re.compile(r"\b([A-Za-z_]\w*)\s*\(")
+_CALLABLE = FUNCTIONS | {"and", "or", "not"}
+
+_ALLOWED = (
+    ast.Expression, ast.BinOp, ast.UnaryOp, ast.Compare, ast.BoolOp, ast.Call, ast.Name,
+    ast.Constant, ast.Load, ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Pow, ast.Mod,
+    ast.USub, ast.UAdd, ast.Not, ast.And, ast.Or, ast.Eq, ast.NotEq, ast.Lt, ast.LtE,
+    ast.Gt, ast.GtE,
+)
+
+
+def prepare(text: str) -> str:
+    """Rewrite corpus-style math into Python expression syntax."""
+    s = text.translate(_SYMBOLS)
+    s = _SINGLE_EQ.sub("==", s)
+    s = _DIGIT_BEFORE.sub(r"\1*", s)
+    s = _CLOSE_BEFORE.sub(")*", s)
+    return _NAME_PAREN.sub(lambda m: m.group(0) if m.group(1) in _CALLABLE else f"{m.group(1)}*(", s)
+
+
+def _validate(tree: ast.AST, text: str) -> None:
+    for node in ast.walk(tree):
+        if not isinstance(node, _ALLOWED):
+            raise ValueError(f"unsupported syntax in {text!r}: {type(node).__name__}")
+        if isinstance(node, ast.Constant) and not isinstance(node.value, (int, float)):
+            raise ValueError(f"unsupported constant in {text!r}: {node.value!r}")
+        if isinstance(node, ast.Call):
+            if not (isinstance(node.func, ast.Name) and node.func.id in FUNCTIONS) or node.keywords:
+                raise ValueError(f"unsupported call in {text!r}")
+
+
+def _call(name: str, args: list[ast.expr]) -> ast.Call:
+    return ast.Call(func=ast.Name(id=name, ctx=ast.Load()), args=args, keywords=[])
+
+
+class _Rewrite(ast.NodeTransformer):
+    """Turn comparisons and boolean ops into calls so they work on arrays and with tolerance."""
+
+    def __init__(self, exact: bool) -> None:
+        self.exact = exact
+
+    def visit_Constant(self, node: ast.Constant) -> ast.AST:
+        if self.exact and not isinstance(node.value, bool):
+            return _call("_num", [ast.Constant(value=str(node.value))])
+        return node
+
+    def visit_Compare(self, node: ast.Compare) -> ast.AST:
+        self.generic_visit(node)
+        parts: list[ast.expr] = []
+        left = node.left
+        for op, right in zip(node.ops, node.comparators):
+            if isinstance(op, ast.Eq):
+                parts.append(_call("_eq", [left, right]))
+            elif isinstance(op, ast.NotEq):
+                parts.append(_call("_ne", [left, right]))
+            else:
+                parts.append(ast.Compare(left=left, ops=[op], comparators=[right]))
+            left = right
+        return parts[0] if len(parts) == 1 else _call("_and", parts)
+
+    def visit_BoolOp(self, node: ast.BoolOp) -> ast.AST:
+        self.generic_visit(node)
+        return _call("_and" if isinstance(node.op, ast.And) else "_or", node.values)
+
+    def visit_UnaryOp(self, node: ast.UnaryOp) -> ast.AST:
+        self.generic_visit(node)
+        return _call("_not", [node.operand]) if isinstance(node.op, ast.Not) else node
+
+    def visit_BinOp(self, node: ast.BinOp) -> ast.AST:
+        self.generic_visit(node)
+        return _call("_pow", [node.left, node.right]) if isinstance(node.op, ast.Pow) else node
+
+
+def _close(a: Number, b: Number) -> bool:
+    if isinstance(a, (int, Fraction)) and isinstance(b, (int, Fraction)):
+        return a == b
+    return math.isclose(a, b, rel_tol=1e-9, abs_tol=1e-9)
+
+
+def _exact_sqrt(v: Number) -> Number:
+    if isinstance(v, (int, Fraction)) and v >= 0:
+        v = Fraction(v)
+        n, d = math.isqrt(v.numerator), math.isqrt(v.denominator)
+        if n * n == v.numerator and d * d == v.denominator:
+            return Fraction(n, d)
+    return math.sqrt(v)
+
+
+def _too_big(a, b) -> bool:
+    """Would the exact power ``a ** b`` be a runaway big integer?"""
+    if abs(b) > MAX_EXPONENT:
+        return True
+    a = Fraction(a)
+    return max(a.numerator.bit_length(), a.denominator.bit_length()) * abs(b) > _MAX_POW_BITS
+
+
+def _exact_pow(a: Number, b: Number) -> Number:
+    if isinstance(a, (int, Fraction)) and isinstance(b, (int, Fraction)) and _too_big(a, b):
+        raise OverflowError(f"power ^{b} is too large to evaluate exactly")
+    return a ** b
+
+
+def _vector_pow(a, b):
+    # Constants are Python ints here: a huge power becomes inf instead of a big-int computation.
+    if isinstance(a, int) and isinstance(b, int) and _too_big(a, b):
+        return np.power(np.float64(a), b)
+    return a ** b
+
+
+def _whole(v: Number) -> int:
+    if isinstance(v, float):
+        if not v.is_integer():
+            raise ValueError(f"counting arguments must be integers, got {v}")
+        return int(v)
+    v = Fraction(v)
+    if v.denominator != 1:
+        raise ValueError(f"counting arguments must be integers, got {v}")
+    return v.numerator
+
+
+def _masked(fn):
+    """Vector counting function: NaN, not an error, for negative ``n`` or fractional arguments.
+
+    Samplers evaluate every drawn row before filtering, so out-of-domain rows
+    must come back as values the filter drops.
+    """
+    def call(*args):
+        args = np.broadcast_arrays(*(np.asarray(a) for a in args))
+        ok = np.ones(args[0].shape, dtype=bool)
+        for a in args:
+            if a.dtype != object and not np.issubdtype(a.dtype, np.integer):
+                with np.errstate(invalid="ignore"):
+                    ok &= np.isfinite(a) & (np.mod(a, 1) == 0)
+        with np.errstate(invalid="ignore"):
+            ok &= args[0] >= 0
+        if ok.all():
+            return fn(*args)
+        safe = [np.where(ok, a, 0) for a in args]
+        return np.where(ok, np.asarray(fn(*safe)).astype(np.float64), np.nan)
+    return call
+
+
+_VECTOR_NS = {
+    "__builtins__": {},
+    "_and": lambda *a: reduce(np.logical_and, a),
+    "_or": lambda *a: reduce(np.logical_or, a),
+    "_not": np.logical_not,
+    "_eq": lambda a, b: np.isclose(a, b, rtol=1e-9, atol=1e-9),
+    "_ne": lambda a, b: ~np.isclose(a, b, rtol=1e-9, atol=1e-9),
+    "abs": np.abs,
+    "sqrt": np.sqrt,
+    "_pow": _vector_pow,
+    "comb": _masked(counting.comb),
+    "perm": _masked(counting.perm),
+    "factorial": _masked(counting.factorials),
+}
+_EXACT_NS = {
+    "__builtins__": {},
+    "_num": Fraction,
+    "_and": lambda *a: all(a),
+    "_or": lambda *a: any(a),
+    "_not": operator.not_,
+    "_eq": _close,
+    "_ne": lambda a, b: not _close(a, b),
+    "abs": abs,
+    "sqrt": _exact_sqrt,
+    "_pow": _exact_pow,
+    "comb": lambda n, r: Fraction(counting.comb(_whole(n), _whole(r))),
+    "perm": lambda n, r: Fraction(counting.perm(_whole(n), _whole(r))),
+    "factorial": lambda n: Fraction(counting.factorial(_whole(n))),
+}
+
+
+class Poly:
+    """Sparse multivariate polynomial with Fraction coefficients."""
+
+    __slots__ = ("terms",)
+
+    def __init__(self, terms: Optional[Mapping[tuple, Fraction]] = None) -> None:
+        self.terms = {m: Fraction(c) for m, c in (terms or {}).items() if c}
+
+    @classmethod
+    def const(cls, c: Union[int, Fraction]) -> "Poly":
+        return cls({(): Fraction(c)})
+
+    @classmethod
+    def var(cls, name: str) -> "Poly":
+        return cls({((name, 1),): Fraction(1)})
+
+    def __add__(self, other: "Poly") -> "Poly":
+        out = dict(self.terms)
+        for m, c in other.terms.items():
+            out[m] = out.get(m, 0) + c
+        return Poly(out)
+
+    def __neg__(self) -> "Poly":
+        return Poly({m: -c for m, c in self.terms.items()})
+
+    def __sub__(self, other: "Poly") -> "Poly":
+        return self + (-other)
+
+    def __mul__(self, other: "Poly") -> "Poly":
+        out: dict[tuple, Fraction] = {}
+        for m1, c1 in self.terms.items():
+            for m2, c2 in other.terms.items():
+                powers = dict(m1)
+                for name, e in m2:
+                    powers[name] = powers.get(name, 0) + e
+                m = tuple(sorted(powers.items()))
+                out[m] = out.get(m, 0) + c1 * c2
+        return Poly(out)
+
+    def __pow__(self, n: int) -> "Poly":
+        out = Poly.const(1)
+        for _ in range(n):
+            out = out * self
+        return out
+
+    def __repr__(self) -> str:
+        return f"Poly({self.terms!r})"
+
+    @property
+    def degree(self) -> int:
+        return max((sum(e for _, e in m) for m in self.terms), default=0)
+
+    @property
+    def names(self) -> set[str]:
+        return {name for m in self.terms for name, _ in m}
+
+    @property
+    def is_const(self) -> bool:
+        return not self.names
+
+    @property
+    def const_value(self) -> Fraction:
+        return self.terms.get((), Fraction(0))
+
+    def coeff(self, name: str) -> Fraction:
+        """Coefficient of the linear term ``name``."""
+        return self.terms.get(((name, 1),), Fraction(0))
+
+    def subs(self, mapping: Mapping[str, "Poly"]) -> "Poly":
+        out = Poly()
+        for m, c in self.terms.items():
+            term = Poly.const(c)
+            for name, e in m:
+                term = term * (mapping[name] ** e if name in mapping else Poly({((name, e),): 1}))
+            out = out + term
+        return out
+
+    def univariate(self, name: str) -> list[Fraction]:
+        """Coefficients in ``name``, highest power first (poly must only use ``name``)."""
+        coeffs = [Fraction(0)] * (self.degree + 1)
+        for m, c in self.terms.items():
+            coeffs[self.degree - (m[0][1] if m else 0)] += c
+        return coeffs
+
+    def evaluate(self, env: Mapping[str, object], exact: bool = True):
+        total = 0
+        for m, c in self.terms.items():
+            term = c if exact else float(c)
+            for name, e in m:
+                term = term * env[name] ** e
+            total = total + term
+        return total
+
+
+def _to_poly(node: ast.AST) -> Optional[Poly]:
+    if isinstance(node, ast.Constant) and not isinstance(node.value, bool):
+        return Poly.const(Fraction(str(node.value)))
+    if isinstance(node, ast.Name) and node.id not in FUNCTIONS:
+        return Poly.var(node.id)
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.USub, ast.UAdd)):
+        p = _to_poly(node.operand)
+        return None if p is None else (-p if isinstance(node.op, ast.USub) else p)
+    if not isinstance(node, ast.BinOp):
+        return None
+    left, right = _to_poly(node.left), _to_poly(node.right)
+    if left is None or right is None:
+        return None
+    if isinstance(node.op, ast.Add):
+        return left + right
+    if isinstance(node.op, ast.Sub):
+        return left - right
+    if isinstance(node.op, ast.Mult):
+        return left * right
+    if isinstance(node.op, ast.Div) and right.is_const and right.const_value:
+        return left * Poly.const(1 / right.const_value)
+    if isinstance(node.op, ast.Pow) and right.is_const:
+        n = right.const_value
+        if n.denominator == 1 and 0 <= n <= MAX_EXPONENT:
+            return left ** int(n)
+    return None
+
+
+class Expr:
+    """A parsed, validated expression or relation."""
+
+    __slots__ = ("text", "names", "is_relation", "_tree", "_vec", "_exact")
+
+    def __init__(self, text: str) -> None:
+        self.text = text
+        try:
+            tree = ast.parse(prepare(text), mode="eval")
+        except SyntaxError as exc:
+            raise ValueError(f"cannot parse {text!r}: {exc.msg}") from None
+        _validate(tree, text)
+        self._tree = tree
+        body = tree.body
+        self.is_relation = isinstance(body, (ast.Compare, ast.BoolOp)) or (
+            isinstance(body, ast.UnaryOp) and isinstance(body.op, ast.Not)
+        )
+        self.names = frozenset(
+            n.id for n in ast.walk(tree) if isinstance(n, ast.Name) and n.id not in FUNCTIONS
+        )
+        self._vec = self._compile(exact=False)
+        self._exact = self._compile(exact=True)
+
+    def _compile(self, exact: bool):
+        tree = ast.parse(prepare(self.text), mode="eval")
+        tree = ast.fix_missing_locations(_Rewrite(exact).visit(tree))
+        return compile(tree, f"<expr {self.text}>", "eval")
+
+    def __repr__(self) -> str:
+        return f"Expr({self.text!r})"
+
+    def __call__(self, **env):
+        """Vectorized evaluation; ``env`` maps names to scalars or NumPy arrays."""
+        return eval(self._vec, _VECTOR_NS, env)
+
+    def exact(self, env: Mapping[str, Number]):
+        """Exact evaluation with Fractions (falls back to floats for irrational results)."""
+        return eval(self._exact, _EXACT_NS, dict(env))
+
+    def poly(self) -> Optional[Poly]:
+        """The expression as a polynomial, or ``None`` when it is not one."""
+        return None if self.is_relation else _to_poly(self._tree.body)
+
+    def equation(self) -> Optional[Poly]:
+        """``lhs - rhs`` for a polynomial equation ``lhs = rhs``; otherwise ``None``."""
+        body = self._tree.body
+        if not (isinstance(body, ast.Compare) and len(body.ops) == 1 and isinstance(body.ops[0], ast.Eq)):
+            return None
+        left, right = _to_poly(body.left), _to_poly(body.comparators[0])
+        return None if left is None or right is None else left - right
+
+    def constants(self) -> list[Fraction]:
+        return [
+            Fraction(str(n.value)) for n in ast.walk(self._tree)
+            if isinstance(n, ast.Constant) and not isinstance(n.value, bool)
+        ]
+
+
+def solve_linear(equations: list[Poly], names: list[str]) -> Optional[dict[str, Poly]]:
+    """Gauss-Jordan over Fractions for ``poly == 0`` equations of degree <= 1.
+
+    Returns each pivot variable as a ``Poly`` in the free variables, or ``None``
+    when the system is inconsistent.
+    """
+    rows = [[eq.coeff(n) for n in names] + [-eq.const_value] for eq in equations]
+    pivots: list[tuple[int, int]] = []
+    r = 0
+    for c in range(len(names)):
+        pivot = next((i for i in range(r, len(rows)) if rows[i][c]), None)
+        if pivot is None:
+            continue
+        rows[r], rows[pivot] = rows[pivot], rows[r]
+        lead = rows[r][c]
+        rows[r] = [x / lead for x in rows[r]]
+        for i in range(len(rows)):
+            if i != r and rows[i][c]:
+                f = rows[i][c]
+                rows[i] = [a - f * b for a, b in zip(rows[i], rows[r])]
+        pivots.append((r, c))
+        r += 1
+    if any(not any(row[:-1]) and row[-1] for row in rows):
+        return None
+    solved: dict[str, Poly] = {}
+    pivot_cols = {c for _, c in pivots}
+    for row_i, c in pivots:
+        expr = Poly.const(rows[row_i][-1])
+        for j, name in enumerate(names):
+            if j not in pivot_cols and rows[row_i][j]:
+                expr = expr - Poly.const(rows[row_i][j]) * Poly.var(name)
+        solved[names[c]] = expr
+    return solved
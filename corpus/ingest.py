@@ -0,0 +1,297 @@
+"""Incremental re-ingest of GMAT_QUANT_BASE.py.
+
+The corpus is cut into blocks at the headers that ``iter_records`` already
+treats as block boundaries ("Problem Solving Question N", "GMAT Problem
+Solving, Sample Question #N", the DS examples and the topic list). Each block
+is fingerprinted on its prefix-stripped text and remembered in a manifest
+together with its parsed questions and their verdicts. A re-run only parses
+and verifies blocks that were added or changed, re-verifies questions whose
+declarative solution changed, republishes ``questions.jsonl`` from the
+manifest, and appends one journal entry per added / changed / removed block.
+Published questions also carry ``stemTex`` (``corpus.notation``), a
+normalized TeX form of the stem published for consumers that want it.
+
+The journal (``journal.jsonl``) is what downstream caches consume: entries
+carry the question ids to upsert or delete plus the concepts and difficulties
+they touch, which is enough to drop ``queue:*`` lists (lib/cache.ts) and
+cached decks built from those questions (lib/studyhall/deckCache.ts). Entries
+are appended before the manifest is replaced, so a crash replays them
+(at-least-once) rather than losing them.
+
+    python -m corpus.ingest [GMAT_QUANT_BASE.py] --state .corpus-state [--metrics DIR]
+"""
+from __future__ import annotations
+
+import argparse
+import dataclasses
+import hashlib
+import json
+import os
+import sys
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterable, Iterator, Optional, Sequence, Union
+
+from .instrument import NULL, Recorder
+from .notation import normalize_batch
+from .parse import DEFAULT_CORPUS, Question, is_header, iter_records, strip_prefix
+
+MANIFEST_VERSION = 1
+MANIFEST = "manifest.json"
+JOURNAL = "journal.jsonl"
+PUBLISHED = "questions.jsonl"
+
+
+@dataclass(frozen=True, slots=True)
+class Block:
+    key: str  # header text, suffixed with " [n]" for the n-th repeat of a header
+    line: int  # 1-based line of the header (1 for the preamble)
+    lines: tuple[str, ...]
+    fingerprint: str
+
+
+@dataclass(frozen=True, slots=True)
+class IngestResult:
+    added: tuple[str, ...]
+    changed: tuple[str, ...]
+    removed: tuple[str, ...]
+    unchanged: int
+    verified: int  # question ids verified on this run
+    journal: tuple[dict, ...]
+    failures: tuple[dict, ...]  # published checks that are not ok
+
+
+def _fingerprint(lines: Iterable[str]) -> str:
+    h = hashlib.sha1()
+    for raw in lines:
+        h.update(strip_prefix(raw).encode("utf-8"))
+        h.update(b"\n")
+    return h.hexdigest()
+
+
+def split_blocks(lines: Iterable[str]) -> Iterator[Block]:
+    """Cut corpus lines into header-delimited blocks; the text before the first header is key ``""``."""
+    seen: dict[str, int] = {}
+    key, start, buf = "", 1, []
+
+    def close() -> Block:
+        return Block(key, start, tuple(buf), _fingerprint(buf))
+
+    for lineno, raw in enumerate(lines, 1):
+        text = strip_prefix(raw)
+        if is_header(text):
+            if buf:
+                yield close()
+            seen[text] = seen.get(text, 0) + 1
+            key = text if seen[text] == 1 else f"{text} [{seen[text]}]"
+            start, buf = lineno, []
+        buf.append(raw)
+    if buf:
+        yield close()
+
+
+def parse_block(block: Block) -> list[Question]:
+    """Questions in one block, with ``line`` numbers relative to the whole file."""
+    return [
+        dataclasses.replace(rec, line=rec.line + block.line - 1)
+        for rec in iter_records(block.lines)
+        if isinstance(rec, Question)
+    ]
+
+
+def _solution_digest(kind: str, id: str) -> Optional[str]:
+    from .solutions import DS_ITEMS, SOLUTIONS
+
+    sol = SOLUTIONS.get(id) if kind == "ps" else DS_ITEMS.get(id)
+    return None if sol is None else hashlib.sha1(repr(sol).encode("utf-8")).hexdigest()
+
+
+def verify_question(q: Question) -> Optional[dict]:
+    """Verdict for a question with a declarative solution on file; ``None`` otherwise."""
+    from .checker import PSItem, check
+    from .solutions import DS_ITEMS, SOLUTIONS
+    from .sufficiency import verify
+
+    if q.kind == "ps" and q.id in SOLUTIONS:
+        c = check(PSItem.from_question(q, SOLUTIONS[q.id]))
+        answer, reason = c.answer, c.reason
+    elif q.kind == "ds" and q.id in DS_ITEMS:
+        item = DS_ITEMS[q.id]
+        v = verify(dataclasses.replace(item, key=q.answer or item.key))
+        answer, reason = v.answer, v.reason
+    else:
+        return None
+    return {"id": q.id, "kind": q.kind, "answer": answer, "reason": reason,
+            "solution": _solution_digest(q.kind, q.id)}
+
+
+def _parse(block: Block, rec: Recorder) -> list[Question]:
+    with rec.stage("parse") as span:
+        questions = parse_block(block)
+        span.count(len(questions))
+    return questions
+
+
+def _entry(block: Block, questions: list[Question], verdicts: dict[str, Optional[dict]],
+           rec: Recorder = NULL) -> dict:
+    checks = {}
+    with rec.stage("verify") as span:
+        for q in questions:
+            if q.id not in verdicts:
+                verdict = verdicts[q.id] = verify_question(q)
+                if verdict is not None:
+                    span.count()
+                    if verdict["reason"] is not None:
+                        span.reject(verdict["reason"])
+            if verdicts[q.id] is not None:
+                checks[q.id] = verdicts[q.id]
+    with rec.stage("normalize") as span:
+        normalized = normalize_batch(q.stem for q in questions)
+        span.count(len(normalized))
+    return {
+        "key": block.key,
+        "fingerprint": block.fingerprint,
+        "line": block.line,
+        "questions": [{**q.to_dict(), "stemTex": n.tex, "line": q.line} for q, n in zip(questions, normalized)],
+        "checks": checks,
+    }
+
+
+def _write_atomic(path: Path, text: str) -> None:
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_text(text, encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def load_manifest(state: Union[str, Path]) -> dict:
+    path = Path(state) / MANIFEST
+    if not path.exists():
+        return {"version": MANIFEST_VERSION, "seq": 0, "blocks": []}
+    manifest = json.loads(path.read_text(encoding="utf-8"))
+    if manifest.get("version") != MANIFEST_VERSION:
+        raise ValueError(f"unsupported manifest version {manifest.get('version')!r} in {path}")
+    return manifest
+
+
+def _published(blocks: Iterable[dict]) -> dict[str, dict]:
+    """First occurrence of every question id, in corpus order."""
+    out: dict[str, dict] = {}
+    for b in blocks:
+        for q in b["questions"]:
+            out.setdefault(q["id"], q)
+    return out
+
+
+def ingest(path: Union[str, Path] = DEFAULT_CORPUS, state: Union[str, Path] = ".corpus-state",
+           force: bool = False, recorder: Optional[Recorder] = None) -> IngestResult:
+    """Bring ``state`` up to date with the corpus at ``path``, touching only changed blocks.
+
+    ``recorder`` (``corpus.instrument``) gets the parse, verify, normalize and publish stages.
+    """
+    rec = recorder or NULL
+    state = Path(state)
+    state.mkdir(parents=True, exist_ok=True)
+    manifest = load_manifest(state)
+    old = {b["key"]: b for b in manifest["blocks"]}
+
+    with rec.stage("parse"), open(path, encoding="utf-8") as fh:
+        blocks = list(split_blocks(fh))
+
+    # One verification per question id per run, however many blocks repeat it.
+    verdicts: dict[str, Optional[dict]] = {}
+    entries, added, changed, unchanged = [], [], [], 0
+    for block in blocks:
+        prev = old.get(block.key)
+        if not force and prev is not None and prev["fingerprint"] == block.fingerprint:
+            # Same text; only questions whose declarative solution changed need a re-check.
+            stale = [q["id"] for q in prev["questions"]
+                     if prev["checks"].get(q["id"], {}).get("solution") != _solution_digest(q["kind"], q["id"])]
+            questions = _parse(block, rec) if stale else []
+            entry = {**prev, "line": block.line}
+            if stale:
+                entry = {**_entry(block, questions, verdicts, rec), "questions": prev["questions"]}
+            entries.append(entry)
+            unchanged += 1
+            continue
+        entries.append(_entry(block, _parse(block, rec), verdicts, rec))
+        (changed if prev is not None else added).append(block.key)
+    current = {b.key for b in blocks}
+    removed = [k for k in old if k not in current]
+
+    with rec.stage("publish") as span:
+        before = _published(manifest["blocks"])
+        after = _published(entries)
+        by_key = {e["key"]: e for e in entries}
+        seq = manifest["seq"]
+        now = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        journal, announced = [], set()
+        for op, keys in (("added", added), ("changed", changed), ("removed", removed)):
+            for key in keys:
+                old_ids = [q["id"] for q in old[key]["questions"]] if key in old else []
+                new_ids = [q["id"] for q in by_key[key]["questions"]] if key in by_key else []
+                upserted = [i for i in new_ids
+                            if i not in announced and (force or before.get(i) != after.get(i))]
+                deleted = [i for i in old_ids if i not in after and i not in announced]
+                announced.update(upserted, deleted)
+                touched = [after[i] for i in upserted] + [before[i] for i in deleted]
+                seq += 1
+                journal.append({
+                    "seq": seq,
+                    "at": now,
+                    "op": op,
+                    "block": key,
+                    "fingerprint": by_key[key]["fingerprint"] if key in by_key else None,
+                    "upserted": upserted,
+                    "deleted": deleted,
+                    "concepts": sorted({q["concept"] for q in touched if q["concept"]}),
+                    "difficulties": sorted({q["difficulty"] for q in touched}),
+                })
+
+        if journal:
+            with open(state / JOURNAL, "a", encoding="utf-8") as fh:
+                for item in journal:
+                    fh.write(json.dumps(item, ensure_ascii=False) + "\n")
+        if journal or not (state / PUBLISHED).exists():
+            _write_atomic(state / PUBLISHED, "".join(
+                json.dumps({k: v for k, v in q.items() if k != "line"}, ensure_ascii=False) + "\n"
+                for q in after.values()
+            ))
+        _write_atomic(state / MANIFEST, json.dumps(
+            {"version": MANIFEST_VERSION, "corpus": str(path), "seq": seq, "blocks": entries},
+            ensure_ascii=False,
+        ))
+        span.count(len(announced))
+
+    failures = tuple(
+        c for c in {cid: c for e in entries for cid, c in e["checks"].items()}.values()
+        if c["reason"] is not None
+    )
+    return IngestResult(tuple(added), tuple(changed), tuple(removed), unchanged,
+                        sum(v is not None for v in verdicts.values()),
+                        tuple(journal), failures)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Re-ingest only the corpus blocks that changed.")
+    ap.add_argument("path", nargs="?", default=str(DEFAULT_CORPUS))
+    ap.add_argument("--state", default=".corpus-state", help="directory for the manifest, journal and JSONL")
+    ap.add_argument("--force", action="store_true", help="ignore the manifest and rebuild everything")
+    ap.add_argument("--metrics", help="write per-stage metrics.prom / metrics.jsonl (and $CORPUS_PROFILE output) here")
+    args = ap.parse_args(argv)
+    rec = Recorder() if args.metrics else None
+    r = ingest(args.path, args.state, args.force, rec)
+    if rec is not None:
+        rec.write(args.metrics, command="ingest")
+        rec.close()
+    sys.stdout.write(
+        f"added {len(r.added)}\tchanged {len(r.changed)}\tremoved {len(r.removed)}\t"
+        f"unchanged {r.unchanged}\tverified {r.verified}\n"
+    )
+    for c in r.failures:
+        sys.stdout.write(f"{c['id']}\t{c['answer'] or '-'}\t{c['reason']}\n")
+    return 1 if r.failures else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,240 @@
+"""Per-stage timers, counters and rejection reasons for the corpus pipeline.
+
+A ``Recorder`` keeps one ``StageStats`` per stage (``STAGES``: parse,
+normalize, dedup, verify, generate, publish). The pipeline functions accept an
+optional recorder and wrap each stage's work in ``recorder.stage(name)``::
+
+    rec = Recorder()
+    ingest(path, state, recorder=rec)
+    rec.write(".corpus-metrics")   # metrics.prom (replaced) + metrics.jsonl (appended)
+
+A stage span costs two ``perf_counter`` calls; spans wrap blocks and batches,
+not single items, and without a recorder the pipeline uses ``NULL``, whose
+spans do nothing. Rejections are counted under the reason strings the checkers
+already return (``checker.REASON_MULTIPLE``, ``sufficiency.REASON_KEY_WRONG``,
+``sufficiency.REASON_INCONCLUSIVE``, ...).
+
+Profiling is off unless ``CORPUS_PROFILE`` is set when the recorder is built:
+``cprofile`` keeps one ``cProfile.Profile`` per stage (written as
+``<stage>.prof``, readable with ``pstats``), ``tracemalloc`` records each
+stage's peak traced memory, and ``all`` (or ``1``) turns on both. Stages do
+not nest; a span opened inside another is timed but not profiled.
+
+    CORPUS_PROFILE=all python -m corpus.ingest --metrics .corpus-metrics
+"""
+from __future__ import annotations
+
+import cProfile
+import json
+import os
+import tracemalloc
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from time import perf_counter
+from typing import Optional, Union
+
+STAGES = ("parse", "normalize", "dedup", "verify", "generate", "publish")
+ENV_PROFILE = "CORPUS_PROFILE"
+PROMETHEUS = "metrics.prom"
+JSONL = "metrics.jsonl"
+
+_PROFILERS = ("cprofile", "tracemalloc")
+
+
+@dataclass(slots=True)
+class StageStats:
+    calls: int = 0
+    seconds: float = 0.0
+    items: int = 0
+    rejected: dict[str, int] = field(default_factory=dict)
+    peak_bytes: int = 0  # tracemalloc only
+
+    def to_dict(self) -> dict:
+        return {"calls": self.calls, "seconds": round(self.seconds, 6), "items": self.items,
+                "rejected": dict(sorted(self.rejected.items())), "peak_bytes": self.peak_bytes}
+
+
+def profilers(value: Optional[str]) -> frozenset[str]:
+    """Profilers named by a ``CORPUS_PROFILE`` value (``""`` / ``None`` -> none)."""
+    names = {s.strip().lower() for s in (value or "").split(",") if s.strip()}
+    if names & {"1", "all"}:
+        return frozenset(_PROFILERS)
+    unknown = names - set(_PROFILERS) - {"0"}
+    if unknown:
+        raise ValueError(f"unknown {ENV_PROFILE} value(s) {sorted(unknown)}; use {', '.join(_PROFILERS)} or all")
+    return frozenset(names - {"0"})
+
+
+class Span:
+    """One timed pass through a stage; ``count`` / ``reject`` add to that stage."""
+
+    __slots__ = ("_rec", "stats", "_name", "_start", "_outer")
+
+    def __init__(self, rec: "Recorder", name: str, stats: StageStats):
+        self._rec, self._name, self.stats = rec, name, stats
+        self._outer = False
+
+    def __enter__(self) -> "Span":
+        rec = self._rec
+        if rec.profiling and rec._open is None:
+            rec._open, self._outer = self, True
+            if rec.tracemalloc:
+                tracemalloc.reset_peak()
+            if rec.cprofile:
+                rec._profile(self._name).enable()
+        self._start = perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> bool:
+        stats = self.stats
+        stats.seconds += perf_counter() - self._start
+        stats.calls += 1
+        if self._outer:
+            rec = self._rec
+            if rec.cprofile:
+                rec._profiles[self._name].disable()
+            if rec.tracemalloc:
+                stats.peak_bytes = max(stats.peak_bytes, tracemalloc.get_traced_memory()[1])
+            rec._open, self._outer = None, False
+        return False
+
+    def count(self, n: int = 1) -> None:
+        self.stats.items += n
+
+    def reject(self, reason: str, n: int = 1) -> None:
+        if n:
+            self.stats.rejected[reason] = self.stats.rejected.get(reason, 0) + n
+
+
+class Recorder:
+    def __init__(self, profile: Optional[str] = None):
+        """``profile`` overrides ``$CORPUS_PROFILE``; pass ``""`` to disable profiling outright."""
+        chosen = profilers(os.environ.get(ENV_PROFILE) if profile is None else profile)
+        self.cprofile = "cprofile" in chosen
+        self.tracemalloc = "tracemalloc" in chosen
+        self.profiling = bool(chosen)
+        self.stages: dict[str, StageStats] = {}
+        self._profiles: dict[str, cProfile.Profile] = {}
+        self._open: Optional[Span] = None
+        self._started_tracemalloc = False
+        if self.tracemalloc and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+
+    def _stats(self, name: str) -> StageStats:
+        stats = self.stages.get(name)
+        if stats is None:
+            stats = self.stages[name] = StageStats()
+        return stats
+
+    def _profile(self, name: str) -> cProfile.Profile:
+        prof = self._profiles.get(name)
+        if prof is None:
+            prof = self._profiles[name] = cProfile.Profile()
+        return prof
+
+    def stage(self, name: str) -> Span:
+        return Span(self, name, self._stats(name))
+
+    def count(self, stage: str, n: int = 1) -> None:
+        self._stats(stage).items += n
+
+    def reject(self, stage: str, reason: str, n: int = 1) -> None:
+        if n:
+            r = self._stats(stage).rejected
+            r[reason] = r.get(reason, 0) + n
+
+    def close(self) -> None:
+        """Stop tracemalloc if this recorder started it."""
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+    def _ordered(self) -> list[tuple[str, StageStats]]:
+        rank = {s: i for i, s in enumerate(STAGES)}
+        return sorted(self.stages.items(), key=lambda kv: (rank.get(kv[0], len(STAGES)), kv[0]))
+
+    def records(self, **labels) -> list[dict]:
+        """One dict per stage, with ``labels`` (e.g. ``run="nightly"``) merged in."""
+        at = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        return [{"at": at, **labels, "stage": name, **stats.to_dict()} for name, stats in self._ordered()]
+
+    def prometheus(self, **labels) -> str:
+        """Prometheus text exposition format; ``labels`` are added to every sample."""
+        extra = "".join(f',{k}="{_escape(v)}"' for k, v in sorted(labels.items()))
+        stages = self._ordered()
+        lines = []
+
+        def family(metric: str, kind: str, help: str, samples) -> None:
+            rows = [(f'{{stage="{_escape(n)}"{more}{extra}}}', v) for n, more, v in samples]
+            if not rows:
+                return
+            lines.append(f"# HELP {metric} {help}")
+            lines.append(f"# TYPE {metric} {kind}")
+            lines.extend(f"{metric}{lab} {v}" for lab, v in rows)
+
+        family("corpus_stage_seconds_total", "counter", "Wall time spent in each pipeline stage.",
+               [(n, "", repr(round(s.seconds, 6))) for n, s in stages])
+        family("corpus_stage_calls_total", "counter", "Times each stage ran.",
+               [(n, "", s.calls) for n, s in stages])
+        family("corpus_stage_items_total", "counter", "Items each stage handled.",
+               [(n, "", s.items) for n, s in stages])
+        family("corpus_stage_rejected_total", "counter", "Items each stage rejected, by reason.",
+               [(n, f',reason="{_escape(r)}"', c) for n, s in stages for r, c in sorted(s.rejected.items())])
+        if self.tracemalloc:
+            family("corpus_stage_peak_bytes", "gauge", "Peak traced memory while each stage ran.",
+                   [(n, "", s.peak_bytes) for n, s in stages])
+        return "\n".join(lines) + "\n" if lines else ""
+
+    def write(self, directory: Union[str, Path], **labels) -> Path:
+        """Replace ``metrics.prom``, append to ``metrics.jsonl`` and dump ``<stage>.prof`` files."""
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        tmp = directory / (PROMETHEUS + ".tmp")
+        tmp.write_text(self.prometheus(**labels), encoding="utf-8")
+        os.replace(tmp, directory / PROMETHEUS)
+        with open(directory / JSONL, "a", encoding="utf-8") as fh:
+            for rec in self.records(**labels):
+                fh.write(json.dumps(rec, ensure_ascii=False) + "\n")
+        for name, prof in self._profiles.items():
+            prof.dump_stats(directory / f"{name}.prof")
+        return directory
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self) -> "_NullSpan":
+        return self
+
+    def __exit__(self, *exc) -> bool:
+        return False
+
+    def count(self, n: int = 1) -> None:
+        pass
+
+    def reject(self, reason: str, n: int = 1) -> None:
+        pass
+
+
+class NullRecorder:
+    """Drop-in recorder that records nothing; the pipeline's default."""
+
+    _span = _NullSpan()
+
+    def stage(self, name: str) -> _NullSpan:
+        return self._span
+
+    def count(self, stage: str, n: int = 1) -> None:
+        pass
+
+    def reject(self, stage: str, reason: str, n: int = 1) -> None:
+        pass
+
+
+NULL = NullRecorder()
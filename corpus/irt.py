@@ -0,0 +1,319 @@
+"""Item response theory: batch calibration, online ability and max-information selection.
+
+The model is 3PL, ``P(correct) = c + (1 - c) / (1 + exp(-a (theta - b)))``;
+2PL is the same with ``c = 0``.
+
+- ``calibrate`` fits item parameters and user abilities from attempt arrays
+  (user code, item code, correct) by alternating Fisher-scoring steps for
+  abilities and items, with weak normal priors to keep sparse items finite.
+  Every step is a handful of ``np.bincount`` reductions over the attempts,
+  streamed in chunks, so tens of millions of attempts stay a few-minute batch
+  job with bounded memory.
+- ``AbilityTracker`` keeps a Gaussian ability estimate per (user, topic) and
+  per user overall, and folds each new answer in with one scoring step in
+  plain float arithmetic (a few microseconds).
+- ``ItemSelector`` precomputes, per topic group, the ``k`` most informative
+  items at each point of an ability grid; selection walks that short list
+  and skips items the user has already seen.
+
+Attempts come from ``Attempt`` rows (prisma/schema.prisma): ``userId``,
+``questionId``, ``isCorrect``; ``encode_attempts`` turns them into codes.
+"""
+from __future__ import annotations
+
+import json
+import math
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Hashable, Iterable, Mapping, Optional, Sequence, Union
+
+import numpy as np
+
+THETA_RANGE = (-4.0, 4.0)
+A_RANGE = (0.2, 4.0)
+C_MAX = 0.35
+
+_CHUNK = 1 << 22
+
+
+@dataclass(frozen=True, slots=True)
+class ItemParams:
+    a: np.ndarray  # discrimination
+    b: np.ndarray  # difficulty
+    c: np.ndarray  # guessing floor (0 for 2PL)
+
+    def __len__(self) -> int:
+        return len(self.a)
+
+    def prob(self, theta, items=slice(None)) -> np.ndarray:
+        a, b, c = self.a[items], self.b[items], self.c[items]
+        return c + (1 - c) / (1 + np.exp(-a * (np.asarray(theta) - b)))
+
+    def info(self, theta, items=slice(None)) -> np.ndarray:
+        """Fisher information ``a^2 (P - c)^2 (1 - P) / ((1 - c)^2 P)``."""
+        a, c = self.a[items], self.c[items]
+        p = self.prob(theta, items)
+        return a * a * (p - c) ** 2 * (1 - p) / ((1 - c) ** 2 * p)
+
+    def save(self, path: Union[str, Path]) -> None:
+        with open(path, "wb") as fh:
+            np.savez_compressed(fh, a=self.a, b=self.b, c=self.c)
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "ItemParams":
+        with np.load(path) as data:
+            return cls(data["a"], data["b"], data["c"])
+
+
+@dataclass(frozen=True, slots=True)
+class Calibration:
+    params: ItemParams
+    theta: np.ndarray  # per user code
+    loglik: float
+    iterations: int
+
+
+def encode_attempts(records: Iterable[Mapping]) -> tuple[np.ndarray, np.ndarray, np.ndarray, list, list]:
+    """``Attempt``-shaped dicts -> (user codes, item codes, correct, user ids, item ids)."""
+    users: dict = {}
+    items: dict = {}
+    u, i, y = [], [], []
+    for r in records:
+        u.append(users.setdefault(r["userId"], len(users)))
+        i.append(items.setdefault(r["questionId"], len(items)))
+        y.append(bool(r["isCorrect"]))
+    return (np.array(u, dtype=np.int64), np.array(i, dtype=np.int64), np.array(y, dtype=bool),
+            list(users), list(items))
+
+
+def _terms(theta: np.ndarray, a: np.ndarray, b: np.ndarray, c: np.ndarray, y: np.ndarray):
+    """Per-attempt pieces shared by every score: logistic L, P, (y - P) / (P (1 - P))."""
+    z = np.clip(a * (theta - b), -30, 30)
+    L = 1 / (1 + np.exp(-z))
+    p = np.clip(c + (1 - c) * L, 1e-9, 1 - 1e-9)
+    r = (y - p) / (p * (1 - p))
+    return z, L, p, r
+
+
+def _damped(step: np.ndarray, limit: float) -> np.ndarray:
+    # Diagonal scoring ignores the a/b/c coupling; capping the step keeps it from oscillating.
+    return np.clip(step, -limit, limit)
+
+
+def calibrate(users: np.ndarray, items: np.ndarray, correct: np.ndarray,
+              n_users: Optional[int] = None, n_items: Optional[int] = None,
+              model: str = "3pl", guess: float = 0.2, iterations: int = 30, tol: float = 1e-4,
+              init: Optional[ItemParams] = None, chunk: int = _CHUNK) -> Calibration:
+    """Joint maximum-likelihood (MAP with weak priors) fit of item parameters and abilities.
+
+    ``guess`` is the prior mean of ``c`` (1/5 for five-choice items); with
+    ``model="2pl"`` ``c`` is held at 0. ``init`` warm-starts from yesterday's
+    parameters, which usually converges in a few iterations.
+    """
+    if model not in ("2pl", "3pl"):
+        raise ValueError(f"unknown model {model!r}")
+    users = np.asarray(users, dtype=np.int64)
+    items = np.asarray(items, dtype=np.int64)
+    y = np.asarray(correct, dtype=np.float64)
+    n_users = int(users.max()) + 1 if n_users is None else n_users
+    n_items = int(items.max()) + 1 if n_items is None else n_items
+    if init is not None:
+        a, b, c = (np.array(v, dtype=np.float64) for v in (init.a, init.b, init.c))
+    else:
+        a, b = np.ones(n_items), np.zeros(n_items)
+        c = np.full(n_items, guess if model == "3pl" else 0.0)
+    theta = np.zeros(n_users)
+    bounds = [(s, min(s + chunk, len(y))) for s in range(0, len(y), chunk)]
+
+    loglik = -np.inf
+    it = 0
+    for it in range(1, iterations + 1):
+        # Abilities: one Fisher-scoring step with a N(0, 1) prior.
+        g_t, h_t = -theta.copy(), np.ones(n_users)
+        for lo, hi in bounds:
+            u, i = users[lo:hi], items[lo:hi]
+            ai, ci = a[i], c[i]
+            _, L, p, r = _terms(theta[u], ai, b[i], ci, y[lo:hi])
+            dp = (1 - ci) * L * (1 - L) * ai
+            g_t += np.bincount(u, r * dp, n_users)
+            h_t += np.bincount(u, dp * dp / (p * (1 - p)), n_users)
+        theta = np.clip(theta + _damped(g_t / h_t, 1.0), *THETA_RANGE)
+        # Anchor the scale: mean 0, sd 1 over users.
+        mu, sd = theta.mean(), theta.std() or 1.0
+        theta = (theta - mu) / sd
+        a, b = a * sd, (b - mu) / sd
+
+        # Items: diagonal Fisher scoring for a, b (and c) with priors
+        # a ~ N(1, 1), b ~ N(0, 2^2), c ~ N(guess, 0.05^2).
+        g_a, h_a = -(a - 1), np.ones(n_items)
+        g_b, h_b = -b / 4, np.full(n_items, 0.25)
+        g_c, h_c = -(c - guess) / 0.0025, np.full(n_items, 400.0)
+        ll = 0.0
+        for lo, hi in bounds:
+            u, i, yy = users[lo:hi], items[lo:hi], y[lo:hi]
+            ai, bi, ci = a[i], b[i], c[i]
+            th = theta[u]
+            _, L, p, r = _terms(th, ai, bi, ci, yy)
+            ll += float(np.sum(yy * np.log(p) + (1 - yy) * np.log(1 - p)))
+            dz = (1 - ci) * L * (1 - L)
+            j = dz * dz / (p * (1 - p))
+            g_a += np.bincount(i, r * dz * (th - bi), n_items)
+            h_a += np.bincount(i, j * (th - bi) ** 2, n_items)
+            g_b += np.bincount(i, -r * dz * ai, n_items)
+            h_b += np.bincount(i, j * ai * ai, n_items)
+            if model == "3pl":
+                g_c += np.bincount(i, r * (1 - L), n_items)
+                h_c += np.bincount(i, (1 - L) ** 2 / (p * (1 - p)), n_items)
+        a = np.clip(a + _damped(g_a / h_a, 0.5), *A_RANGE)
+        b = np.clip(b + _damped(g_b / h_b, 1.0), *THETA_RANGE)
+        if model == "3pl":
+            c = np.clip(c + _damped(g_c / h_c, 0.05), 0.0, C_MAX)
+        if abs(ll - loglik) <= tol * max(1.0, abs(ll)):
+            loglik = ll
+            break
+        loglik = ll
+    return Calibration(ItemParams(a, b, c), theta, loglik, it)
+
+
+def difficulty_labels(b: np.ndarray, cuts: tuple[float, float] = (-0.5, 0.5)) -> np.ndarray:
+    """Map ``b`` onto the three-level ``difficulty`` of lib/gmatBank.ts."""
+    return np.array(["easy", "medium", "hard"])[np.digitize(b, cuts)]
+
+
+class AbilityTracker:
+    """Online per-(user, topic) ability with one scoring step per answer.
+
+    Each key holds a normal approximation (mean, variance) of ability; an
+    answer adds its Fisher information to the precision and moves the mean by
+    the score over the new precision. Topic ``None`` is the user's overall
+    ability and is updated alongside every topic answer.
+    """
+
+    __slots__ = ("params", "prior_mean", "prior_var", "_index", "_keys", "_theta", "_var", "_count")
+
+    def __init__(self, params: ItemParams, prior_mean: float = 0.0, prior_var: float = 1.0) -> None:
+        self.params = params
+        self.prior_mean = prior_mean
+        self.prior_var = prior_var
+        self._index: dict[tuple[Hashable, Optional[str]], int] = {}
+        self._keys: list[tuple[Hashable, Optional[str]]] = []
+        self._theta: list[float] = []
+        self._var: list[float] = []
+        self._count: list[int] = []
+
+    def _slot(self, key: tuple[Hashable, Optional[str]]) -> int:
+        k = self._index.get(key)
+        if k is None:
+            k = self._index[key] = len(self._keys)
+            self._keys.append(key)
+            self._theta.append(self.prior_mean)
+            self._var.append(self.prior_var)
+            self._count.append(0)
+        return k
+
+    def _step(self, k: int, a: float, b: float, c: float, y: float) -> float:
+        theta = self._theta[k]
+        L = 1 / (1 + math.exp(-max(-30.0, min(30.0, a * (theta - b)))))
+        p = min(max(c + (1 - c) * L, 1e-9), 1 - 1e-9)
+        dp = (1 - c) * L * (1 - L) * a
+        var = 1 / (1 / self._var[k] + dp * dp / (p * (1 - p)))
+        theta = min(max(theta + var * (y - p) * dp / (p * (1 - p)), THETA_RANGE[0]), THETA_RANGE[1])
+        self._theta[k], self._var[k] = theta, var
+        self._count[k] += 1
+        return theta
+
+    def update(self, user: Hashable, item: int, correct: bool, topic: Optional[str] = None) -> float:
+        """Fold one answer in; returns the updated (topic) ability."""
+        p = self.params
+        a, b, c = float(p.a[item]), float(p.b[item]), float(p.c[item])
+        y = 1.0 if correct else 0.0
+        overall = self._step(self._slot((user, None)), a, b, c, y)
+        return self._step(self._slot((user, topic)), a, b, c, y) if topic is not None else overall
+
+    def ability(self, user: Hashable, topic: Optional[str] = None) -> tuple[float, float]:
+        """(mean, standard error); the prior for an unseen key."""
+        k = self._index.get((user, topic))
+        if k is None:
+            return self.prior_mean, math.sqrt(self.prior_var)
+        return self._theta[k], math.sqrt(self._var[k])
+
+    def topics(self, user: Hashable) -> dict[str, tuple[float, float, int]]:
+        """topic -> (mean, standard error, answers) for one user."""
+        return {
+            t: (self._theta[k], math.sqrt(self._var[k]), self._count[k])
+            for (u, t), k in self._index.items() if u == user and t is not None
+        }
+
+    def save(self, path: Union[str, Path]) -> None:
+        with open(path, "wb") as fh:
+            np.savez_compressed(
+                fh, keys=np.array(json.dumps(self._keys)), theta=np.array(self._theta),
+                var=np.array(self._var), count=np.array(self._count, dtype=np.int64),
+                prior=np.array([self.prior_mean, self.prior_var]),
+            )
+
+    @classmethod
+    def load(cls, path: Union[str, Path], params: ItemParams) -> "AbilityTracker":
+        with np.load(path) as data:
+            prior = data["prior"]
+            tracker = cls(params, float(prior[0]), float(prior[1]))
+            tracker._keys = [tuple(k) for k in json.loads(str(data["keys"]))]
+            tracker._index = {k: i for i, k in enumerate(tracker._keys)}
+            tracker._theta = data["theta"].tolist()
+            tracker._var = data["var"].tolist()
+            tracker._count = data["count"].tolist()
+        return tracker
+
+
+class ItemSelector:
+    """Maximum-information next item from a precomputed (group, ability grid) table.
+
+    ``groups`` assigns each item a group code (a topic, say; -1 = never
+    served). For each group and grid point the ``k`` most informative items
+    are stored best-first, so a selection is a grid lookup plus a short scan
+    past already-seen items. If all ``k`` are seen it falls back to scoring the
+    whole group at that ability.
+    """
+
+    __slots__ = ("params", "grid", "k", "_members", "_top", "_lo", "_step")
+
+    def __init__(self, params: ItemParams, groups: Optional[np.ndarray] = None, k: int = 32,
+                 grid: Optional[np.ndarray] = None) -> None:
+        self.params = params
+        self.grid = np.linspace(*THETA_RANGE, 161) if grid is None else np.asarray(grid, dtype=np.float64)
+        self._lo = float(self.grid[0])
+        self._step = float(self.grid[1] - self.grid[0])
+        self.k = k
+        groups = np.zeros(len(params), dtype=np.int64) if groups is None else np.asarray(groups)
+        self._members: dict[int, np.ndarray] = {}
+        self._top: dict[int, np.ndarray] = {}
+        for g in np.unique(groups[groups >= 0]).tolist():
+            ids = np.flatnonzero(groups == g)
+            info = params.info(self.grid[:, None], ids)  # (grid, members)
+            kk = min(k, len(ids))
+            part = np.argpartition(-info, kk - 1, axis=1)[:, :kk]
+            order = np.argsort(-np.take_along_axis(info, part, axis=1), axis=1, kind="stable")
+            self._members[g] = ids
+            self._top[g] = ids[np.take_along_axis(part, order, axis=1)]
+
+    def select(self, theta: float, group: int = 0, exclude: Union[set, frozenset] = frozenset()) -> int:
+        """Most informative item at ``theta`` in ``group`` that is not in ``exclude``; -1 if none."""
+        top = self._top.get(group)
+        if top is None:
+            return -1
+        row = int(round((min(max(theta, THETA_RANGE[0]), THETA_RANGE[1]) - self._lo) / self._step))
+        row = min(max(row, 0), len(self.grid) - 1)
+        for i in top[row].tolist():
+            if i not in exclude:
+                return i
+        ids = self._members[group]
+        ids = ids[~np.isin(ids, np.fromiter(exclude, dtype=np.int64, count=len(exclude)))]
+        if not len(ids):
+            return -1
+        return int(ids[np.argmax(self.params.info(theta, ids))])
+
+    def select_many(self, thetas: Sequence[float], group: int = 0) -> np.ndarray:
+        """Best item per ability with no exclusions (vectorized over the grid lookup)."""
+        top = self._top[group]
+        rows = np.clip(np.rint((np.clip(thetas, *THETA_RANGE) - self._lo) / self._step), 0, len(self.grid) - 1)
+        return top[rows.astype(np.int64), 0]
@@ -0,0 +1,263 @@
+"""Math-notation normalizer for loosely written corpus text.
+
+Python counterpart of lib/math/normalizeLooseTex.ts and lib/math/cleanText.ts
+for the ingest pipeline. One compiled tokenizer splits text into numbers,
+money, variables, operators, relations, powers, ratio colons, parentheses,
+words and punctuation. Runs of math tokens that contain an operator become
+one math span. Each text yields:
+
+- ``tex``: prose untouched, math spans as ``\\( ... \\)`` with canonical
+  operators (en dash -> ``-``, ``×`` -> ``\\times``, ``≤`` -> ``\\leq``,
+  ``3^11`` -> ``3^{11}``, ``√x`` -> ``\\sqrt{x}``) and ``$430`` -> ``\\$430``;
+- ``search``: lowercase ASCII tokens for indexing (``$1,350`` -> ``1350``,
+  ``x^2 – x`` -> ``x^2 - x``), punctuation dropped;
+- ``math``: the math spans in that plain form (``("3^11",)``).
+
+``normalize_batch`` joins all cache misses with a separator and tokenizes
+them in one pass. Results live in a bounded LRU keyed by a BLAKE2 digest of
+the text, so hot stems are never re-tokenized and the cache does not pin the
+original strings.
+"""
+from __future__ import annotations
+
+import hashlib
+import re
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Iterable, Optional
+
+_CONTROL = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+_SEP = "\x00"
+
+_TOKEN = re.compile(
+    r"""
+    (?P<space>\s*)
+    (?:
+    (?P<word>[A-Za-z]+(?:['’][A-Za-z]+)*)
+  | (?P<sep>\x00)
+  | (?P<money>\$\s?\d{1,3}(?:,\d{3})+(?:\.\d+)?|\$\s?\d+(?:\.\d+)?)
+  | (?P<num>\d{1,3}(?:,\d{3})+(?:\.\d+)?(?!\d)|\d+(?:\.\d+)?|\.\d+)
+  | (?P<sqrt>√)
+  | (?P<rel><=|>=|!=|≤|≥|≠|=|<|>)
+  | (?P<pow>\^|\*\*)
+  | (?P<op>[+\-−–—×*·÷/])
+  | (?P<colon>:)
+  | (?P<lp>\()
+  | (?P<rp>\))
+  | (?P<pct>%)
+  | (?P<other>\S)
+    )
+    """,
+    re.VERBOSE,
+)
+
+# Canonical spellings: (TeX, search).
+_OPS = {
+    "+": ("+", "+"), "-": ("-", "-"), "−": ("-", "-"), "–": ("-", "-"), "—": ("-", "-"),
+    "×": ("\\times", "*"), "*": ("\\times", "*"), "·": ("\\cdot", "*"), "÷": ("\\div", "/"), "/": ("/", "/"),
+    "=": ("=", "="), "<": ("<", "<"), ">": (">", ">"), "<=": ("\\leq", "<="), "≤": ("\\leq", "<="),
+    ">=": ("\\geq", ">="), "≥": ("\\geq", ">="), "!=": ("\\neq", "!="), "≠": ("\\neq", "!="),
+    ":": (":", ":"),
+}
+_BINARY = {"op", "rel", "colon"}
+_OPERAND = {"num", "var", "rp", "pct"}
+
+DEFAULT_CACHE_SIZE = 65_536
+
+
+@dataclass(frozen=True, slots=True)
+class Normalized:
+    tex: str
+    search: str
+    math: tuple[str, ...]
+
+
+def _tokens(text: str) -> list[tuple[str, str, bool]]:
+    """(kind, text, preceded by whitespace); single letters and ``x2``-style names are ``var``."""
+    out: list[tuple[str, str, bool]] = []
+    for m in _TOKEN.finditer(text):
+        kind = m.lastgroup
+        value, space = m.group(kind), m.start(kind) > m.start()
+        if value == "sqrt":
+            kind = "sqrt"
+        elif kind == "word" and (len(value) == 1 or (out and out[-1][0] == "num" and not space and len(value) <= 2)):
+            kind = "var"
+        out.append((kind, value, space))
+    return out
+
+
+def _is_math_run(run: list[tuple[str, str, bool]]) -> bool:
+    kinds = [k for k, _, _ in run]
+    if "pow" in kinds or "rel" in kinds or "sqrt" in kinds:
+        return True
+    # Operators and ratio colons only count between operands ("2x : 5x", "3 + 4").
+    return any(
+        k in ("op", "colon") and 0 < i < len(kinds) - 1 and kinds[i - 1] in _OPERAND
+        and kinds[i + 1] in _OPERAND | {"lp", "var", "num", "sqrt"}
+        for i, k in enumerate(kinds)
+    )
+
+
+def _render(run: list[tuple[str, str, bool]], tex: bool) -> str:
+    """Canonical text of one math run."""
+    parts: list[str] = []
+    prev: Optional[str] = None
+    i = 0
+    while i < len(run):
+        kind, value, space = run[i]
+        if kind == "pow" or kind == "sqrt":
+            # Gather the operand: one token, or a balanced parenthesized group.
+            j, depth = i + 1, 0
+            while j < len(run):
+                depth += run[j][0] == "lp"
+                depth -= run[j][0] == "rp"
+                j += 1
+                if depth <= 0:
+                    break
+            inner = run[i + 1:j]
+            if inner and inner[0][0] == "lp" and inner[-1][0] == "rp" and len(inner) > 2:
+                inner = inner[1:-1]
+            body = _render(inner, tex)
+            if kind == "pow":
+                parts.append(f"^{{{body}}}" if tex else f"^{body if len(inner) == 1 else f'({body})'}")
+            else:
+                parts.append(f"\\sqrt{{{body}}}" if tex else f"sqrt({body})")
+            prev, i = "rp", j
+            continue
+        if kind in _BINARY:
+            canon = _OPS[value][0 if tex else 1]
+            unary = kind == "op" and canon in ("-", "+") and (prev is None or prev in _BINARY | {"lp"})
+            parts.append(canon if unary else f" {canon} ")
+        elif kind == "num":
+            parts.append((" " if space and prev in _OPERAND else "")
+                         + (value.replace(",", "{,}") if tex else value.replace(",", "")))
+        elif kind == "pct":
+            parts.append("\\%" if tex else "%")
+        else:
+            text = value if tex else value.lower()
+            parts.append((" " if space and prev in _OPERAND else "") + text)
+        prev = kind
+        i += 1
+    return "".join(parts).strip()
+
+
+def _normalize_tokens(tokens: list[tuple[str, str, bool]]) -> Normalized:
+    tex: list[str] = []
+    search: list[str] = []
+    math: list[str] = []
+    run: list[tuple[str, str, bool]] = []
+
+    def flush() -> None:
+        if not run:
+            return
+        if _is_math_run(run):
+            lead = " " if run[0][2] else ""
+            tex.append(f"{lead}\\({_render(run, True)}\\)")
+            plain = _render(run, False)
+            search.append(plain)
+            math.append(plain)
+        else:
+            for kind, value, space in run:
+                tex.append((" " if space else "") + value)
+                if kind in ("num", "var"):
+                    search.append(value.replace(",", "").lower())
+                elif kind == "pct" and search:
+                    search[-1] += "%"
+        run.clear()
+
+    for tok in tokens:
+        kind, value, space = tok
+        mathy = kind in ("num", "var", "op", "rel", "pow", "colon", "lp", "rp", "sqrt", "pct")
+        if mathy and not (kind == "colon" and not run):
+            run.append(tok)
+            continue
+        flush()
+        if kind == "money":
+            amount = value.replace("$", "").strip()
+            tex.append((" " if space else "") + "\\$" + amount)
+            search.append(amount.replace(",", ""))
+        elif kind == "word":
+            tex.append((" " if space else "") + value)
+            search.append(value.lower().replace("’", "'"))
+        elif kind == "colon":
+            tex.append(value)
+        else:
+            tex.append((" " if space else "") + value)
+    flush()
+    return Normalized("".join(tex).strip(), " ".join(search), tuple(math))
+
+
+def content_key(text: str) -> bytes:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+
+class Normalizer:
+    """Bounded LRU of ``Normalized`` results keyed by a digest of the input text."""
+
+    __slots__ = ("maxsize", "hits", "misses", "_cache")
+
+    def __init__(self, maxsize: int = DEFAULT_CACHE_SIZE) -> None:
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._cache: OrderedDict[bytes, Normalized] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    def _get(self, key: bytes) -> Optional[Normalized]:
+        hit = self._cache.get(key)
+        if hit is not None:
+            self._cache.move_to_end(key)
+            self.hits += 1
+        return hit
+
+    def _put(self, key: bytes, value: Normalized) -> None:
+        self._cache[key] = value
+        self.misses += 1
+        if len(self._cache) > self.maxsize:
+            self._cache.popitem(last=False)
+
+    def __call__(self, text: str) -> Normalized:
+        key = content_key(text)
+        hit = self._get(key)
+        if hit is None:
+            hit = _normalize_tokens(_tokens(_CONTROL.sub(" ", text)))
+            self._put(key, hit)
+        return hit
+
+    def batch(self, texts: Iterable[str]) -> list[Normalized]:
+        """Normalize many texts; misses are tokenized together in a single pass."""
+        texts = list(texts)
+        keys = [content_key(t) for t in texts]
+        out: list[Optional[Normalized]] = [self._get(k) for k in keys]
+        todo: dict[bytes, int] = {}
+        for i, k in enumerate(keys):
+            if out[i] is None and k not in todo:
+                todo[k] = i
+        if todo:
+            joined = _SEP.join(_CONTROL.sub(" ", texts[i]) for i in todo.values())
+            segment: list[tuple[str, str, bool]] = []
+            results = []
+            for tok in _tokens(joined) + [("sep", _SEP, False)]:
+                if tok[0] == "sep":
+                    results.append(_normalize_tokens(segment))
+                    segment = []
+                else:
+                    segment.append(tok)
+            fresh = dict(zip(todo, results))
+            for k, r in fresh.items():
+                self._put(k, r)
+            out = [o if o is not None else fresh[k] for o, k in zip(out, keys)]
+        return out  # type: ignore[return-value]
+
+
+_default = Normalizer()
+
+
+def normalize(text: str) -> Normalized:
+    return _default(text)
+
+
+def normalize_batch(texts: Iterable[str]) -> list[Normalized]:
+    return _default.batch(texts)
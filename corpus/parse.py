@@ -0,0 +1,285 @@
+"""Single-pass parser for GMAT_QUANT_BASE.py.
+
+The corpus is prose behind ``# `` / ``# # `` comment prefixes. ``iter_records``
+walks it line by line with a small state machine and yields ``TopicList`` and
+``Question`` records as soon as each block closes, so memory stays flat no
+matter how large the file grows. ``Question.to_dict`` emits the
+``GmatQuestion`` shape from lib/gmatBank.ts.
+
+    python -m corpus.parse [GMAT_QUANT_BASE.py] > questions.jsonl
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import re
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Iterator, Optional, Union
+
+from .topics import canonical_topic, concept_for
+
+DEFAULT_CORPUS = Path(__file__).resolve().parent.parent / "GMAT_QUANT_BASE.py"
+
+LETTERS = "ABCDE"
+
+# Same wording as DS_STANDARD_CHOICES in lib/gmatBank.ts.
+DS_STANDARD_CHOICES: tuple[str, ...] = (
+    "Statement (1) ALONE is sufficient, but statement (2) alone is not sufficient.",
+    "Statement (2) ALONE is sufficient, but statement (1) alone is not sufficient.",
+    "BOTH statements TOGETHER are sufficient, but NEITHER statement ALONE is sufficient.",
+    "EACH statement ALONE is sufficient.",
+    "Statements (1) and (2) TOGETHER are NOT sufficient.",
+)
+
+_PREFIX = re.compile(r"^#(?: #)*(?: |$)")
+_PS_HEADER = re.compile(r"^(?:Problem Solving Question \d+|GMAT Problem Solving, Sample Question #\d+)$")
+_DS_HEADER = re.compile(r"^(Value|Yes/No) Data Sufficiency (?:Question )?Example$")
+_TOPICS_INTRO = re.compile(r"^The \d+ major math topics tested on the GMAT are as follows:$")
+_STATEMENT = re.compile(r"^([12])\)\s*(.+)$")
+_DS_CHOICE = re.compile(r"^([A-E]):\s*(.+)$")
+_ANSWER = re.compile(r"^Answer:\s*([A-E])\b")
+_TOPIC_LINE = re.compile(
+    r"major[”\"]? topic (?:tested )?here is (.+?), and the (?:main )?subtopic is (.+?)\.?$"
+)
+
+# Parser states.
+_IDLE, _TOPICS, _STEM, _CHOICES, _AFTER_CHOICES, _STATEMENTS, _DS_CHOICES, _SOLUTION = range(8)
+
+
+@dataclass(frozen=True, slots=True)
+class TopicList:
+    topics: tuple[str, ...]
+    line: int
+
+
+@dataclass(frozen=True, slots=True)
+class Question:
+    id: str
+    kind: str  # "ps" | "ds"
+    stem: str
+    choices: tuple[str, ...]
+    correct_index: Optional[int]
+    explanation: str
+    topic: Optional[str]
+    subtopic: Optional[str]
+    concept: Optional[str]
+    difficulty: str = "medium"
+    statements: tuple[str, ...] = ()
+    ds_type: Optional[str] = None  # "value" | "yes_no"
+    source: str = ""
+    line: int = 0
+
+    @property
+    def answer(self) -> Optional[str]:
+        return None if self.correct_index is None else LETTERS[self.correct_index]
+
+    def to_dict(self) -> dict:
+        """GmatQuestion-shaped dict (camelCase) plus the corpus-only fields."""
+        out: dict = {
+            "id": self.id,
+            "concept": self.concept,
+            "difficulty": self.difficulty,
+            "kind": self.kind,
+            "stem": self.stem,
+            "choices": list(self.choices),
+            "correctIndex": self.correct_index,
+            "explanation": self.explanation,
+            "topic": self.topic,
+            "subtopic": self.subtopic,
+            "source": self.source,
+        }
+        if self.concept:
+            out["badge"] = f"GMAT – Quant ({self.concept})"
+        if self.kind == "ds":
+            out["statements"] = list(self.statements)
+            out["dsType"] = self.ds_type
+        return out
+
+
+Record = Union[TopicList, Question]
+
+
+def strip_prefix(raw: str) -> str:
+    """Drop the ``# `` / ``# # `` comment prefix and surrounding whitespace."""
+    text = raw.rstrip("\r\n")
+    m = _PREFIX.match(text)
+    if m:
+        text = text[m.end():]
+    return text.strip()
+
+
+def is_header(text: str) -> bool:
+    """Does this (prefix-stripped) line open a new block?"""
+    return bool(_PS_HEADER.match(text) or _DS_HEADER.match(text) or _TOPICS_INTRO.match(text))
+
+
+def qid(s: str) -> str:
+    """Python twin of ``qid`` in lib/gmatBank.ts."""
+    return re.sub(r"\W+", "_", s)[:48]
+
+
+def stem_digest(stem: str) -> str:
+    return hashlib.sha1(" ".join(stem.split()).lower().encode("utf-8")).hexdigest()
+
+
+class _Draft:
+    __slots__ = ("kind", "ds_type", "source", "line", "stem", "choices", "statements",
+                 "solution", "topic", "subtopic", "answer")
+
+    def __init__(self, kind: str, source: str, line: int, ds_type: Optional[str] = None) -> None:
+        self.kind = kind
+        self.ds_type = ds_type
+        self.source = source
+        self.line = line
+        self.stem = ""
+        self.choices: list[str] = []
+        self.statements: list[str] = []
+        self.solution: list[str] = []
+        self.topic: Optional[str] = None
+        self.subtopic: Optional[str] = None
+        self.answer: Optional[str] = None
+
+    def build(self) -> Optional[Question]:
+        if not self.stem:
+            return None
+        if self.kind == "ps" and len(self.choices) != 5:
+            return None
+        if self.kind == "ds" and len(self.statements) != 2:
+            return None
+        choices = tuple(self.choices) if len(self.choices) == 5 else DS_STANDARD_CHOICES
+        topic = canonical_topic(self.topic)
+        return Question(
+            id=qid(f"GMAT_corpus_{self.kind}_{stem_digest(self.stem)[:16]}"),
+            kind=self.kind,
+            stem=self.stem,
+            choices=choices,
+            correct_index=LETTERS.index(self.answer) if self.answer else None,
+            explanation="\n".join(self.solution),
+            topic=topic,
+            subtopic=self.subtopic,
+            concept=concept_for(topic, self.kind),
+            statements=tuple(self.statements),
+            ds_type=self.ds_type,
+            source=self.source,
+            line=self.line,
+        )
+
+
+def iter_records(lines: Iterable[str]) -> Iterator[Record]:
+    """Yield records from corpus lines in a single streaming pass."""
+    state = _IDLE
+    draft: Optional[_Draft] = None
+    topics: list[str] = []
+    topics_line = 0
+
+    for lineno, raw in enumerate(lines, 1):
+        text = strip_prefix(raw)
+
+        # Headers close whatever block is open, regardless of state.
+        ds = _DS_HEADER.match(text)
+        if ds or _PS_HEADER.match(text) or _TOPICS_INTRO.match(text):
+            if draft is not None:
+                q = draft.build()
+                if q is not None:
+                    yield q
+                draft = None
+            if ds:
+                ds_type = "value" if ds.group(1) == "Value" else "yes_no"
+                draft = _Draft("ds", text, lineno, ds_type)
+                state = _STEM
+            elif _PS_HEADER.match(text):
+                draft = _Draft("ps", text, lineno)
+                state = _STEM
+            else:
+                topics, topics_line = [], lineno
+                state = _TOPICS
+            continue
+
+        if state == _IDLE:
+            continue
+
+        if state == _TOPICS:
+            if text:
+                topics.append(text)
+            elif topics:
+                yield TopicList(tuple(topics), topics_line)
+                state = _IDLE
+            continue
+
+        assert draft is not None
+        if not text:
+            continue
+
+        if state == _STEM:
+            draft.stem = text
+            state = _STATEMENTS if draft.kind == "ds" else _CHOICES
+        elif text == "Solution:":
+            state = _SOLUTION
+        elif state == _CHOICES:
+            draft.choices.append(text)
+            if len(draft.choices) == 5:
+                state = _AFTER_CHOICES
+        elif state == _AFTER_CHOICES:
+            # Five choices and no solution: the block ended with the prose that follows.
+            q = draft.build()
+            if q is not None:
+                yield q
+            draft, state = None, _IDLE
+        elif state in (_STATEMENTS, _DS_CHOICES):
+            st = _STATEMENT.match(text)
+            ch = _DS_CHOICE.match(text)
+            if st and state == _STATEMENTS:
+                draft.statements.append(st.group(2))
+            elif ch:
+                draft.choices.append(ch.group(2))
+                state = _DS_CHOICES
+            elif not draft.statements:
+                draft.stem = f"{draft.stem} {text}"
+        elif state == _SOLUTION:
+            ans = _ANSWER.match(text)
+            if ans:
+                draft.answer = ans.group(1)
+                q = draft.build()
+                if q is not None:
+                    yield q
+                draft, state = None, _IDLE
+                continue
+            if not draft.solution:
+                m = _TOPIC_LINE.search(text)
+                if m:
+                    draft.topic, draft.subtopic = m.group(1), m.group(2)
+            draft.solution.append(text)
+
+    if state == _TOPICS and topics:
+        yield TopicList(tuple(topics), topics_line)
+    if draft is not None:
+        q = draft.build()
+        if q is not None:
+            yield q
+
+
+def parse_file(path: Union[str, Path] = DEFAULT_CORPUS) -> Iterator[Record]:
+    with open(path, encoding="utf-8") as fh:
+        yield from iter_records(fh)
+
+
+def iter_questions(path: Union[str, Path] = DEFAULT_CORPUS) -> Iterator[Question]:
+    for rec in parse_file(path):
+        if isinstance(rec, Question):
+            yield rec
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Parse the GMAT Quant corpus into JSONL questions.")
+    ap.add_argument("path", nargs="?", default=str(DEFAULT_CORPUS))
+    args = ap.parse_args(argv)
+    for q in iter_questions(args.path):
+        sys.stdout.write(json.dumps(q.to_dict(), ensure_ascii=False) + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,224 @@
+"""Fast-forward solver for "how many years until…" recurrences (Sequences, Rates).
+
+Affine recurrences ``x[n+1] = M x[n] + c`` are advanced with the augmented
+matrix ``[[M, c], [0, 1]]`` raised to the n-th power by squaring, so the state
+after n steps costs O(log n) instead of n. First-crossing questions ("when does
+type A drop below 50% of the fleet") are answered by exponential + binary
+search over n, assuming the condition stays true once reached.
+
+Two flavours:
+
+- ``AffineRecurrence`` is exact (Fractions) for a single item; the checker
+  uses it through ``run_recurrence``.
+- ``affine_states`` / ``first_crossing_batch`` run the same search in lockstep
+  over arrays of parameter sets; the variant generator uses them.
+"""
+from __future__ import annotations
+
+import ast
+import operator
+from dataclasses import dataclass
+from fractions import Fraction
+from typing import Callable, Mapping, Optional, Sequence, Union
+
+import numpy as np
+
+from .expr import Expr, Poly, prepare
+
+_OPS: dict[type, Callable] = {
+    ast.Lt: operator.lt, ast.LtE: operator.le, ast.Gt: operator.gt, ast.GtE: operator.ge,
+}
+_NP_OPS = {operator.lt: np.less, operator.le: np.less_equal,
+           operator.gt: np.greater, operator.ge: np.greater_equal}
+
+Matrix = list[list[Fraction]]
+
+
+@dataclass(frozen=True, slots=True)
+class Recurrence:
+    """State updated once per step until ``until`` holds; ``n`` counts the steps taken."""
+
+    init: Mapping[str, Union[int, str]]
+    step: Mapping[str, str]
+    until: str
+    limit: int = 10_000
+
+
+@dataclass(frozen=True, slots=True)
+class LinearCondition:
+    """``weights · x + bias  op  0`` over the state variables."""
+
+    weights: tuple[Fraction, ...]
+    bias: Fraction
+    op: Callable[[object, object], bool]
+
+    def holds(self, state: Sequence) -> bool:
+        return self.op(sum(w * v for w, v in zip(self.weights, state)) + self.bias, 0)
+
+
+def linear_condition(until: str, names: Sequence[str]) -> Optional[LinearCondition]:
+    """Parse ``lhs op rhs`` with ``lhs - rhs`` linear in ``names``; ``None`` otherwise."""
+    tree = ast.parse(prepare(until), mode="eval").body
+    if not (isinstance(tree, ast.Compare) and len(tree.ops) == 1 and type(tree.ops[0]) in _OPS):
+        return None
+    left = Expr(ast.unparse(tree.left)).poly()
+    right = Expr(ast.unparse(tree.comparators[0])).poly()
+    if left is None or right is None:
+        return None
+    diff = left - right
+    if diff.degree > 1 or not diff.names <= set(names):
+        return None
+    return LinearCondition(tuple(diff.coeff(n) for n in names), diff.const_value, _OPS[type(tree.ops[0])])
+
+
+def _matmul(a: Matrix, b: Matrix) -> Matrix:
+    return [[sum(a[i][k] * b[k][j] for k in range(len(b))) for j in range(len(b[0]))] for i in range(len(a))]
+
+
+def _matpow(m: Matrix, n: int) -> Matrix:
+    size = len(m)
+    result = [[Fraction(int(i == j)) for j in range(size)] for i in range(size)]
+    while n:
+        if n & 1:
+            result = _matmul(result, m)
+        m = _matmul(m, m)
+        n >>= 1
+    return result
+
+
+class AffineRecurrence:
+    """Exact ``x[n+1] = M x[n] + c`` over named state variables."""
+
+    __slots__ = ("names", "_aug")
+
+    def __init__(self, names: Sequence[str], matrix: Sequence[Sequence], offset: Sequence) -> None:
+        k = len(names)
+        self.names = tuple(names)
+        self._aug: Matrix = [
+            [Fraction(v) for v in matrix[i]] + [Fraction(offset[i])] for i in range(k)
+        ] + [[Fraction(0)] * k + [Fraction(1)]]
+
+    @classmethod
+    def from_steps(cls, step: Mapping[str, str]) -> Optional["AffineRecurrence"]:
+        """Build from step expressions such as ``{"A": "A - 3", "B": "B + 4"}``; ``None`` if not affine."""
+        names = list(step)
+        rows, offset = [], []
+        for name in names:
+            p: Optional[Poly] = Expr(step[name]).poly()
+            if p is None or p.degree > 1 or not p.names <= set(names):
+                return None
+            rows.append([p.coeff(n) for n in names])
+            offset.append(p.const_value)
+        return cls(names, rows, offset)
+
+    def state(self, init: Sequence, n: int) -> list[Fraction]:
+        """State after ``n`` steps in O(log n) matrix products."""
+        p = _matpow(self._aug, n)
+        vec = [Fraction(v) for v in init] + [Fraction(1)]
+        return [sum(p[i][j] * vec[j] for j in range(len(vec))) for i in range(len(self.names))]
+
+    def first_crossing(self, init: Sequence, cond: LinearCondition, limit: int) -> Optional[int]:
+        """Smallest ``n <= limit`` where ``cond`` holds, assuming it stays true once reached."""
+        if cond.holds(self.state(init, 0)):
+            return 0
+        hi = 1
+        while not cond.holds(self.state(init, hi)):
+            if hi >= limit:
+                return None
+            hi = min(2 * hi, limit)
+        lo = hi // 2  # cond false at lo, true at hi
+        while hi - lo > 1:
+            mid = (lo + hi) // 2
+            if cond.holds(self.state(init, mid)):
+                hi = mid
+            else:
+                lo = mid
+        return hi
+
+
+def run_recurrence(rec: Recurrence) -> dict[str, Fraction]:
+    """Final state plus ``n`` once ``rec.until`` holds.
+
+    Affine steps with a linear condition are fast-forwarded; anything else is
+    stepped one n at a time.
+    """
+    init = {name: Expr(str(v)).exact({}) for name, v in rec.init.items()}
+    affine = AffineRecurrence.from_steps(rec.step) if set(rec.step) == set(init) else None
+    cond = linear_condition(rec.until, list(rec.step)) if affine is not None else None
+    if affine is not None and cond is not None:
+        start = [init[n] for n in affine.names]
+        n = affine.first_crossing(start, cond, rec.limit)
+        if n is None:
+            raise ValueError(f"recurrence did not reach {rec.until!r} within {rec.limit} steps")
+        return {**dict(zip(affine.names, affine.state(start, n))), "n": Fraction(n)}
+
+    step = {name: Expr(text) for name, text in rec.step.items()}
+    until = Expr(rec.until)
+    state = init
+    for n in range(rec.limit + 1):
+        env = {**state, "n": Fraction(n)}
+        if until.exact(env):
+            return env
+        state = {**state, **{name: e.exact(env) for name, e in step.items()}}
+    raise ValueError(f"recurrence did not reach {rec.until!r} within {rec.limit} steps")
+
+
+def matrix_power_batch(m: np.ndarray, n: np.ndarray) -> np.ndarray:
+    """``m[i] ** n[i]`` for a stack of square matrices, by lockstep squaring."""
+    m = np.array(m, dtype=np.float64)
+    n = np.asarray(n, dtype=np.int64).copy()
+    result = np.broadcast_to(np.eye(m.shape[-1]), m.shape).copy()
+    while n.any():
+        odd = (n & 1).astype(bool)
+        result[odd] = result[odd] @ m[odd]
+        m = m @ m
+        n >>= 1
+    return result
+
+
+def affine_states(m: np.ndarray, c: np.ndarray, x0: np.ndarray, n: np.ndarray) -> np.ndarray:
+    """State after ``n[i]`` steps for each row; ``m`` is (B, k, k) or (k, k), ``c``/``x0`` (B, k)."""
+    x0 = np.atleast_2d(np.asarray(x0, dtype=np.float64))
+    batch, k = x0.shape
+    aug = np.zeros((batch, k + 1, k + 1))
+    aug[:, :k, :k] = m
+    aug[:, :k, k] = c
+    aug[:, k, k] = 1.0
+    p = matrix_power_batch(aug, np.broadcast_to(n, (batch,)))
+    vec = np.concatenate([x0, np.ones((batch, 1))], axis=1)
+    return np.einsum("bij,bj->bi", p, vec)[:, :k]
+
+
+def first_crossing_batch(m: np.ndarray, c: np.ndarray, x0: np.ndarray, weights: Sequence[float],
+                         bias: float, op: Callable = operator.lt, limit: int = 10_000) -> np.ndarray:
+    """Per-row smallest ``n`` with ``weights · x[n] + bias op 0``; -1 when not reached by ``limit``."""
+    x0 = np.atleast_2d(np.asarray(x0, dtype=np.float64))
+    batch = len(x0)
+    w = np.asarray(weights, dtype=np.float64)
+    cmp = _NP_OPS[op]
+
+    def holds(n: np.ndarray) -> np.ndarray:
+        return cmp(affine_states(m, c, x0, n) @ w + bias, 0)
+
+    zero = holds(np.zeros(batch, dtype=np.int64))
+    hi = np.ones(batch, dtype=np.int64)
+    found = zero.copy()
+    while True:
+        pending = ~found & (hi < limit)
+        if not pending.any():
+            break
+        ok = holds(hi)
+        found |= ok
+        hi = np.where(~found & (hi < limit), np.minimum(2 * hi, limit), hi)
+    found |= holds(hi)
+    lo = np.where(zero, 0, hi // 2)
+    hi = np.where(zero, 0, hi)
+    while True:
+        gap = (hi - lo > 1) & found & ~zero
+        if not gap.any():
+            break
+        mid = (lo + hi) // 2
+        ok = holds(mid)
+        hi = np.where(gap & ok, mid, hi)
+        lo = np.where(gap & ~ok, mid, lo)
+    return np.where(found, hi, -1)
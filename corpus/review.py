@@ -0,0 +1,386 @@
+"""Spaced-repetition scheduling for missed questions.
+
+Every (user, question) pair that was missed gets one slot of SM-2 state in
+flat arrays: due time, interval, ease, repetitions and lapses. A miss (re)starts
+the item at ``FIRST_DAYS``; a graded review (0-5) either lapses it or stretches
+the interval by the ease factor. Intervals are scaled by a per-item weight,
+the product of the item's topic and subtopic weights (for example
+``{"topic": {"Geometry": 0.5}}`` brings Geometry back twice as often), and an
+item whose interval reaches ``GRADUATE_DAYS`` is cleared, like
+``MissedQuestion.clearedAt``.
+
+Each user has a min-heap of ``(due, version, slot)`` entries. Rescheduling
+pushes a new entry and bumps the slot's version, so stale entries are skipped
+and dropped lazily. ``due`` walks the heap best-first without popping, so
+``k`` due items cost ``O(k log k)`` however many items the user holds.
+``due_many`` first filters users on a dense array of heap heads, so a nightly
+"what is due now for these 10k users" only walks the heaps of users with
+something due.
+
+Events use the shapes ``corpus.analytics`` reads: a wrong attempt is a miss,
+and a correct attempt on a scheduled item is a review graded by time taken.
+Event times come from ``createdAt`` / ``timestamp`` when present.
+
+    python -m corpus.review schedule.npz events.jsonl --due [--user U] [--limit 20]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import sys
+import time
+from datetime import datetime
+from heapq import heapify, heappop, heappush
+from pathlib import Path
+from typing import Iterable, Mapping, Optional, Sequence, Union
+
+import numpy as np
+
+from .analytics import BUDGET_MS, Taxonomy, _flag, read_events
+from .topics import canonical_topic
+
+DAY = 86_400.0
+FIRST_DAYS = 1.0
+SECOND_DAYS = 6.0
+GRADUATE_DAYS = 120.0
+EASE = 2.5
+MIN_EASE = 1.3
+PASS = 3  # grades below this lapse the item
+
+Weights = Mapping[str, Mapping[str, float]]
+
+_FIELDS = {"user": np.int32, "item": np.int32, "due": np.float64, "interval": np.float32,
+           "ease": np.float32, "reps": np.int16, "lapses": np.int16, "version": np.int64}
+
+
+def _topic_key(topic: str) -> str:
+    return canonical_topic(topic) or topic
+
+
+def _subtopic_key(subtopic: Optional[str]) -> str:
+    return " ".join(subtopic.split()).lower() if subtopic else ""
+
+
+def grade(correct: bool, time_ms: Optional[int] = None) -> int:
+    """SM-2 grade for an attempt: 1 when wrong, 3-5 when right by time against the 2-minute budget."""
+    if not correct:
+        return 1
+    if time_ms is None:
+        return 4
+    return 5 if time_ms <= BUDGET_MS // 2 else 4 if time_ms <= BUDGET_MS else 3
+
+
+def _event_time(e: Mapping, default: float) -> float:
+    at = e.get("createdAt", e.get("timestamp"))
+    if at in (None, ""):
+        return default
+    if isinstance(at, (int, float)):
+        return float(at)
+    return datetime.fromisoformat(str(at).replace("Z", "+00:00")).timestamp()
+
+
+class Scheduler:
+    """SM-2 state per (user, item) slot plus one lazily-cleaned due heap per user."""
+
+    __slots__ = ("weights", "users", "items", "topics", "_state", "_size", "_user_row", "_item_code",
+                 "_slot", "_item_weight", "_heaps", "_live", "_head", "_version")
+
+    def __init__(self, weights: Optional[Weights] = None) -> None:
+        self.weights = {f: dict(weights.get(f, {})) for f in ("topic", "subtopic")} if weights else {}
+        self.users: list[str] = []
+        self.items: list[str] = []
+        self.topics: list[tuple[Optional[str], Optional[str]]] = []
+        self._state = {k: np.zeros(16, dtype=t) for k, t in _FIELDS.items()}
+        self._size = 0
+        self._user_row: dict[str, int] = {}
+        self._item_code: dict[str, int] = {}
+        self._slot: dict[tuple[int, int], int] = {}
+        self._item_weight: list[float] = []
+        self._heaps: list[list[tuple[float, int, int]]] = []
+        self._live: list[int] = []
+        self._head = np.full(16, np.inf)
+        self._version = 0
+
+    def __len__(self) -> int:
+        """Scheduled (not cleared) items across all users."""
+        return sum(self._live)
+
+    # Slots ------------------------------------------------------------------------
+
+    def _user(self, user: str) -> int:
+        r = self._user_row.get(user)
+        if r is None:
+            r = self._user_row[user] = len(self.users)
+            self.users.append(user)
+            self._heaps.append([])
+            self._live.append(0)
+            if r >= len(self._head):
+                self._head = np.concatenate([self._head, np.full(len(self._head), np.inf)])
+        return r
+
+    def item_weight(self, topic: Optional[str], subtopic: Optional[str]) -> float:
+        """Interval multiplier: topic weight times subtopic weight (1 for anything unlisted)."""
+        w = 1.0
+        if topic:
+            table = {_topic_key(k): v for k, v in self.weights.get("topic", {}).items()}
+            w *= table.get(_topic_key(topic), 1.0)
+        if subtopic:
+            table = {_subtopic_key(k): v for k, v in self.weights.get("subtopic", {}).items()}
+            w *= table.get(_subtopic_key(subtopic), 1.0)
+        return w
+
+    def _item(self, item: str, topic: Optional[str], subtopic: Optional[str]) -> int:
+        c = self._item_code.get(item)
+        if c is None:
+            c = self._item_code[item] = len(self.items)
+            self.items.append(item)
+            self.topics.append((_topic_key(topic) if topic else None, subtopic or None))
+            self._item_weight.append(self.item_weight(topic, subtopic))
+        return c
+
+    def _new_slot(self, row: int, code: int) -> int:
+        s = self._size
+        if s >= len(self._state["due"]):
+            self._state = {k: np.concatenate([v, np.zeros_like(v)]) for k, v in self._state.items()}
+        st = self._state
+        st["user"][s], st["item"][s], st["due"][s] = row, code, np.inf
+        st["interval"][s], st["ease"][s], st["reps"][s], st["lapses"][s] = 0, EASE, 0, 0
+        self._slot[(row, code)] = s
+        self._size += 1
+        return s
+
+    def _schedule(self, s: int, due: float) -> None:
+        row = int(self._state["user"][s])
+        if math.isinf(self._state["due"][s]):
+            self._live[row] += 1
+        self._version += 1
+        self._state["due"][s], self._state["version"][s] = due, self._version
+        heappush(self._heaps[row], (due, self._version, s))
+        self._settle(row)
+
+    def _clear(self, s: int) -> None:
+        row = int(self._state["user"][s])
+        if not math.isinf(self._state["due"][s]):
+            self._live[row] -= 1
+        self._state["due"][s] = np.inf
+        self._state["version"][s] = 0
+        self._settle(row)
+
+    def _settle(self, row: int) -> None:
+        """Drop stale heap tops, rebuild when mostly stale, and refresh the user's head."""
+        heap, version = self._heaps[row], self._state["version"]
+        if len(heap) > 2 * self._live[row] + 32:
+            heap[:] = [e for e in heap if version[e[2]] == e[1]]
+            heapify(heap)
+        while heap and version[heap[0][2]] != heap[0][1]:
+            heappop(heap)
+        self._head[row] = heap[0][0] if heap else np.inf
+
+    # Updates ----------------------------------------------------------------------
+
+    def miss(self, user: str, item: str, now: Optional[float] = None,
+             topic: Optional[str] = None, subtopic: Optional[str] = None) -> float:
+        """Record a miss; (re)starts the item's schedule. Returns its next due time."""
+        now = time.time() if now is None else now
+        row, code = self._user(user), self._item(item, topic, subtopic)
+        s = self._slot.get((row, code))
+        if s is None:
+            s = self._new_slot(row, code)
+        else:
+            self._lapse(s)
+        return self._after(s, FIRST_DAYS, now)
+
+    def _lapse(self, s: int) -> None:
+        st = self._state
+        st["ease"][s] = max(MIN_EASE, float(st["ease"][s]) - 0.2)
+        st["reps"][s] = 0
+        st["lapses"][s] += 1
+
+    def _after(self, s: int, days: float, now: float) -> float:
+        st = self._state
+        st["interval"][s] = days
+        due = now + days * self._item_weight[int(st["item"][s])] * DAY
+        self._schedule(s, due)
+        return due
+
+    def review(self, user: str, item: str, quality: int, now: Optional[float] = None) -> Optional[float]:
+        """Apply an SM-2 grade (0-5). Returns the next due time, or ``None`` once the item is cleared.
+
+        Reviews of items that were never missed (or are already cleared) are ignored.
+        """
+        now = time.time() if now is None else now
+        row, code = self._user_row.get(user), self._item_code.get(item)
+        s = self._slot.get((row, code)) if row is not None and code is not None else None
+        if s is None or math.isinf(self._state["due"][s]):
+            return None
+        if not 0 <= quality <= 5:
+            raise ValueError("quality must be between 0 and 5")
+        st = self._state
+        if quality < PASS:
+            self._lapse(s)
+            return self._after(s, FIRST_DAYS, now)
+        ease = float(st["ease"][s])
+        st["ease"][s] = max(MIN_EASE, ease + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02))
+        st["reps"][s] += 1
+        reps = int(st["reps"][s])
+        days = FIRST_DAYS if reps == 1 else SECOND_DAYS if reps == 2 else float(st["interval"][s]) * ease
+        if days >= GRADUATE_DAYS:
+            st["interval"][s] = days
+            self._clear(s)
+            return None
+        return self._after(s, days, now)
+
+    def clear(self, user: str, item: str) -> None:
+        s = self._slot.get((self._user_row.get(user, -1), self._item_code.get(item, -1)))
+        if s is not None:
+            self._clear(s)
+
+    def add(self, events: Iterable[Mapping], user: Optional[str] = None, taxonomy: Optional[Taxonomy] = None,
+            now: Optional[float] = None) -> int:
+        """Fold attempt events in (see the module docstring). Returns events that changed a schedule."""
+        now = time.time() if now is None else now
+        changed = 0
+        for e in events:
+            if e.get("phase") in ("start", "error") or not e.get("questionId"):
+                continue
+            uid = e.get("userId", user)
+            if uid is None:
+                raise ValueError("event has no userId and no default user was given")
+            correct = _flag(e["isCorrect"] if "isCorrect" in e else
+                            e["correct"] if "correct" in e else e.get("status") == "correct")
+            at = _event_time(e, now)
+            qid = str(e["questionId"])
+            if not correct:
+                topic, subtopic = e.get("topic"), e.get("subtopic")
+                if taxonomy is not None and not topic and qid in taxonomy:
+                    topic, subtopic = taxonomy[qid]
+                self.miss(str(uid), qid, at, topic, subtopic)
+                changed += 1
+            else:
+                t = e.get("timeMs")
+                was = self.state(str(uid), qid)
+                self.review(str(uid), qid, grade(True, int(t) if t not in (None, "") else None), at)
+                changed += was is not None and was["due"] is not None
+        return changed
+
+    # Queries ----------------------------------------------------------------------
+
+    def _walk(self, row: int, now: float, limit: int) -> list[str]:
+        heap, version, item = self._heaps[row], self._state["version"], self._state["item"]
+        out: list[str] = []
+        frontier = [(heap[0][0], 0)] if heap else []
+        while frontier and len(out) < limit:
+            due, i = heappop(frontier)
+            if due > now:
+                break
+            _, v, s = heap[i]
+            if version[s] == v:
+                out.append(self.items[item[s]])
+            for c in (2 * i + 1, 2 * i + 2):
+                if c < len(heap):
+                    heappush(frontier, (heap[c][0], c))
+        return out
+
+    def due(self, user: str, now: Optional[float] = None, limit: int = 20) -> list[str]:
+        """Up to ``limit`` of the user's items due at ``now``, most overdue first."""
+        row = self._user_row.get(user)
+        now = time.time() if now is None else now
+        if row is None or self._head[row] > now:
+            return []
+        return self._walk(row, now, limit)
+
+    def due_many(self, users: Optional[Iterable[str]] = None, now: Optional[float] = None,
+                 limit: int = 20) -> dict[str, list[str]]:
+        """``due`` for many users (all by default); users with nothing due are left out."""
+        now = time.time() if now is None else now
+        if users is None:
+            rows = np.arange(len(self.users))
+        else:
+            rows = np.array([r for r in map(self._user_row.get, users) if r is not None], dtype=np.int64)
+        rows = rows[self._head[rows] <= now]
+        return {self.users[r]: self._walk(int(r), now, limit) for r in rows}
+
+    def next_due(self, user: str) -> Optional[float]:
+        row = self._user_row.get(user)
+        return None if row is None or math.isinf(self._head[row]) else float(self._head[row])
+
+    def state(self, user: str, item: str) -> Optional[dict]:
+        """The slot's SM-2 state (``due`` is ``None`` once cleared); ``None`` for pairs never missed."""
+        s = self._slot.get((self._user_row.get(user, -1), self._item_code.get(item, -1)))
+        if s is None:
+            return None
+        st = self._state
+        due = float(st["due"][s])
+        return {"due": None if math.isinf(due) else due, "interval": float(st["interval"][s]),
+                "ease": round(float(st["ease"][s]), 4), "reps": int(st["reps"][s]),
+                "lapses": int(st["lapses"][s]), "weight": self._item_weight[int(st["item"][s])]}
+
+    # Persistence ------------------------------------------------------------------
+
+    def save(self, path: Union[str, Path]) -> None:
+        n = self._size
+        with open(path, "wb") as fh:
+            np.savez_compressed(
+                fh, **{k: v[:n] for k, v in self._state.items() if k != "version"},
+                meta=np.array(json.dumps({"users": self.users, "items": self.items, "topics": self.topics,
+                                          "weights": self.weights})),
+            )
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "Scheduler":
+        with np.load(path) as data:
+            meta = json.loads(str(data["meta"]))
+            sched = cls(meta["weights"])
+            for u in meta["users"]:
+                sched._user(u)
+            for item, (topic, subtopic) in zip(meta["items"], meta["topics"]):
+                sched._item(item, topic, subtopic)
+            n = len(data["due"])
+            cap = max(16, 1 << max(n - 1, 0).bit_length())
+            for k, t in _FIELDS.items():
+                arr = np.zeros(cap, dtype=t)
+                if k != "version":
+                    arr[:n] = data[k]
+                sched._state[k] = arr
+        st, sched._size = sched._state, n
+        live = np.flatnonzero(np.isfinite(st["due"][:n]))
+        st["version"][live] = np.arange(1, len(live) + 1)
+        sched._version = len(live)
+        sched._slot = {(int(u), int(c)): s for s, (u, c) in enumerate(zip(st["user"][:n], st["item"][:n]))}
+        for s in live.tolist():
+            row = int(st["user"][s])
+            sched._heaps[row].append((float(st["due"][s]), int(st["version"][s]), s))
+            sched._live[row] += 1
+        for row, heap in enumerate(sched._heaps):
+            heapify(heap)
+            sched._head[row] = heap[0][0] if heap else np.inf
+        return sched
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Fold attempt events into a review schedule; list what is due.")
+    ap.add_argument("snapshot")
+    ap.add_argument("events", nargs="*", help="JSONL events or dashboard export CSV")
+    ap.add_argument("--user", help="user for events without a userId; with --due, the only user listed")
+    ap.add_argument("--due", action="store_true", help="print {user, due} JSONL for users with items due now")
+    ap.add_argument("--limit", type=int, default=20)
+    ap.add_argument("--weights", help='JSON file like {"topic": {"Geometry": 0.5}, "subtopic": {...}}')
+    args = ap.parse_args(argv)
+    path = Path(args.snapshot)
+    if path.exists():
+        sched = Scheduler.load(path)
+    else:
+        sched = Scheduler(json.loads(Path(args.weights).read_text(encoding="utf-8")) if args.weights else None)
+    for name in args.events:
+        with open(name, encoding="utf-8", newline="") as fh:
+            sched.add(read_events(fh), args.user)
+    sched.save(path)
+    if args.due:
+        for user, items in sched.due_many([args.user] if args.user else None, limit=args.limit).items():
+            sys.stdout.write(json.dumps({"user": user, "due": items}) + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,239 @@
+"""Mock Quant section assembly from the bank's taxonomy index.
+
+The corpus blueprint is 31 questions in 62 minutes, roughly 20 Problem Solving
+and 11 Data Sufficiency, drawn from the 21 major topics. ``Blueprint`` turns
+that into an ordered list of (kind, difficulty) slots: DS is spread evenly
+through the section and difficulty follows a curve.
+
+``SectionAssembler`` precomputes, once per bank, a (kind, topic, difficulty)
+cell code for every item with CSR postings, the per-cell capacity table and
+the per-(kind, difficulty) demand of the blueprint. Assembling a form then
+costs O(len(seen)) to discount a user's history from the capacity table plus
+one topic choice and an expected-O(1) draw per slot. There is no retry loop:
+a slot only picks a topic whose cell still has an unused, unseen item, and
+topics the blueprint requires are placed before the rest are balanced by
+least use. The assembler is read-only after construction, so one instance
+can serve concurrent assemblies.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Iterable, Mapping, Optional
+
+import numpy as np
+
+from .taxonomy import TaxonomyIndex
+
+if TYPE_CHECKING:
+    from .bank import BankReader
+
+DIFFICULTY_ORDER = ("easy", "medium", "hard")
+
+_DRAWS = 8  # random probes into a cell before falling back to filtering it
+
+
+@dataclass(frozen=True, slots=True)
+class Blueprint:
+    questions: int = 31
+    minutes: int = 62
+    kinds: Mapping[str, int] = field(default_factory=lambda: {"ps": 20, "ds": 11})
+    # Share of each difficulty; laid out easy -> hard unless ``curve`` is given.
+    difficulty: Mapping[str, float] = field(
+        default_factory=lambda: {"easy": 0.3, "medium": 0.45, "hard": 0.25}
+    )
+    curve: tuple[str, ...] = ()  # explicit difficulty per position
+    topics: tuple[str, ...] = ()  # each must appear at least once
+
+    def difficulties(self) -> list[str]:
+        if self.curve:
+            if len(self.curve) != self.questions:
+                raise ValueError(f"curve has {len(self.curve)} positions for {self.questions} questions")
+            return list(self.curve)
+        shares = np.array([self.difficulty.get(d, 0.0) for d in DIFFICULTY_ORDER], dtype=np.float64)
+        if shares.sum() <= 0:
+            raise ValueError("difficulty shares must not all be zero")
+        counts = _apportion(shares / shares.sum(), self.questions)
+        return [d for d, c in zip(DIFFICULTY_ORDER, counts) for _ in range(c)]
+
+    def slots(self) -> list[tuple[str, str]]:
+        """(kind, difficulty) per position."""
+        if sum(self.kinds.values()) != self.questions:
+            raise ValueError(f"kinds {dict(self.kinds)} do not add up to {self.questions} questions")
+        # Spread the rarer kinds evenly: position i goes to the kind furthest behind its quota.
+        quota = {k: n / self.questions for k, n in self.kinds.items()}
+        placed = dict.fromkeys(self.kinds, 0)
+        kinds = []
+        for i in range(self.questions):
+            k = max((k for k in self.kinds if placed[k] < self.kinds[k]),
+                    key=lambda k: quota[k] * (i + 1) - placed[k])
+            placed[k] += 1
+            kinds.append(k)
+        return list(zip(kinds, self.difficulties()))
+
+
+def _apportion(shares: np.ndarray, total: int) -> list[int]:
+    """Largest-remainder rounding of ``shares * total``."""
+    raw = shares * total
+    counts = np.floor(raw).astype(int)
+    for i in np.argsort(-(raw - counts), kind="stable")[: total - counts.sum()]:
+        counts[i] += 1
+    return counts.tolist()
+
+
+SECTION = Blueprint()
+
+
+@dataclass(frozen=True, slots=True)
+class Form:
+    ids: np.ndarray  # bank row per position
+    kinds: tuple[str, ...]
+    difficulties: tuple[str, ...]
+    topics: tuple[str, ...]
+    minutes: int
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+
+class SectionAssembler:
+    __slots__ = ("index", "blueprint", "capacity", "_slots", "_demand", "_required",
+                 "_cells", "_order", "_starts", "_kinds", "_topics", "_diffs")
+
+    def __init__(self, index: TaxonomyIndex, blueprint: Blueprint = SECTION) -> None:
+        self.index = index
+        self.blueprint = blueprint
+        self._kinds = index.vocab["kind"]
+        self._topics = index.vocab["topic"]
+        self._diffs = index.vocab["difficulty"]
+        shape = (len(self._kinds), len(self._topics), len(self._diffs))
+        self._cells = np.ravel_multi_index(
+            (index.codes["kind"], index.codes["topic"], index.codes["difficulty"]), shape
+        ).astype(np.int64) if index.size else np.zeros(0, dtype=np.int64)
+        self._order = np.argsort(self._cells, kind="stable").astype(np.uint32)
+        self._starts = np.searchsorted(self._cells[self._order], np.arange(int(np.prod(shape)) + 1))
+        # capacity[kind, topic, difficulty]: items per cell. Topic code "" (untagged) never fills a slot.
+        self.capacity = np.bincount(self._cells, minlength=int(np.prod(shape))).reshape(shape)
+        if "" in self._topics:
+            self.capacity[:, self._topics.index(""), :] = 0
+
+        def code(vocab: list[str], value: str) -> int:
+            return vocab.index(value) if value in vocab else -1
+
+        self._slots = np.array(
+            [(code(self._kinds, k), code(self._diffs, d)) for k, d in blueprint.slots()], dtype=np.int64
+        ).reshape(-1, 2)
+        self._demand = np.zeros((len(self._kinds), len(self._diffs)), dtype=np.int64)
+        missing = sorted({f"{k}/{d}" for k, d in blueprint.slots()
+                          if code(self._kinds, k) < 0 or code(self._diffs, d) < 0})
+        if missing:
+            raise ValueError(f"bank has no items for slots {missing}")
+        np.add.at(self._demand, (self._slots[:, 0], self._slots[:, 1]), 1)
+        unknown = [t for t in blueprint.topics if t not in self._topics]
+        if unknown:
+            raise ValueError(f"bank has no items for required topics {unknown}")
+        self._required = np.array([self._topics.index(t) for t in blueprint.topics], dtype=np.int64)
+
+    @classmethod
+    def from_bank(cls, bank: "BankReader", blueprint: Blueprint = SECTION) -> "SectionAssembler":
+        return cls(TaxonomyIndex.from_bank(bank), blueprint)
+
+    def available(self, seen: Optional[np.ndarray] = None) -> np.ndarray:
+        """Capacity table minus the items in ``seen``."""
+        if seen is None or not len(seen):
+            return self.capacity.copy()
+        seen = np.unique(np.asarray(seen, dtype=np.int64))
+        seen = seen[(seen >= 0) & (seen < len(self._cells))]
+        used = np.bincount(self._cells[seen], minlength=self.capacity.size).reshape(self.capacity.shape)
+        return np.maximum(self.capacity - used, 0)
+
+    def feasible(self, seen: Optional[np.ndarray] = None) -> bool:
+        """Enough unseen items for every (kind, difficulty) and every required topic."""
+        avail = self.available(seen)
+        if (avail.sum(axis=1) < self._demand).any():
+            return False
+        wanted = self._demand > 0
+        return all((avail[:, t, :][wanted] > 0).any() for t in self._required)
+
+    def _draw(self, cell: int, taken: set[int], rng: np.random.Generator) -> int:
+        lo, hi = int(self._starts[cell]), int(self._starts[cell + 1])
+        for _ in range(_DRAWS):
+            i = int(self._order[rng.integers(lo, hi)])
+            if i not in taken:
+                return i
+        pool = self._order[lo:hi]
+        pool = pool[~np.isin(pool, np.fromiter(taken, dtype=np.int64, count=len(taken)))]
+        return int(pool[rng.integers(len(pool))])
+
+    def assemble(self, seen: Optional[Iterable[int]] = None,
+                 rng: Optional[np.random.Generator] = None) -> Form:
+        """One form with no item from ``seen``; raises ``ValueError`` when the bank cannot supply it."""
+        rng = rng or np.random.default_rng()
+        seen_ids = np.fromiter(seen, dtype=np.int64) if seen is not None else np.zeros(0, dtype=np.int64)
+        avail = self.available(seen_ids)
+        if (avail.sum(axis=1) < self._demand).any():
+            raise ValueError("not enough unseen items for the blueprint's kind/difficulty mix")
+        taken = set(seen_ids.tolist())
+        n_topics = len(self._topics)
+        uses = np.zeros(n_topics, dtype=np.int64)
+        uncovered = np.zeros(n_topics, dtype=bool)
+        uncovered[self._required] = True
+        remaining = self._demand.copy()  # open slots per (kind, difficulty)
+        picked_topic = np.full(len(self._slots), -1, dtype=np.int64)
+
+        # Required topics first, each into the slot whose cell has the most slack.
+        for t in rng.permutation(self._required):
+            if not uncovered[t]:
+                continue
+            open_slots = np.flatnonzero(picked_topic < 0)
+            k, d = self._slots[open_slots, 0], self._slots[open_slots, 1]
+            ok = avail[k, t, d] > 0
+            if not ok.any():
+                raise ValueError(f"cannot cover topic {self._topics[t]!r} with the remaining slots")
+            slack = avail[k, :, d].sum(axis=1) - remaining[k, d]
+            s = open_slots[ok][np.argmax(slack[ok] + rng.random(int(ok.sum())))]
+            self._place(s, t, avail, remaining, uses, uncovered, picked_topic)
+
+        # Everything else: least-used topic with stock in the slot's cell, random tie-break.
+        for s in np.flatnonzero(picked_topic < 0):
+            k, d = self._slots[s]
+            stock = avail[k, :, d]
+            if not stock.any():
+                raise ValueError("not enough unseen items for the blueprint's kind/difficulty mix")
+            score = np.where(stock > 0, uses + rng.random(n_topics), np.inf)
+            self._place(s, int(np.argmin(score)), avail, remaining, uses, uncovered, picked_topic)
+
+        ids = np.empty(len(self._slots), dtype=np.int64)
+        shape = self.capacity.shape
+        for s, (k, d) in enumerate(self._slots):
+            cell = int(np.ravel_multi_index((k, picked_topic[s], d), shape))
+            ids[s] = self._draw(cell, taken, rng)
+            taken.add(int(ids[s]))
+        return Form(
+            ids=ids,
+            kinds=tuple(self._kinds[k] for k in self._slots[:, 0]),
+            difficulties=tuple(self._diffs[d] for d in self._slots[:, 1]),
+            topics=tuple(self._topics[t] for t in picked_topic),
+            minutes=self.blueprint.minutes,
+        )
+
+    def _place(self, s: int, t: int, avail: np.ndarray, remaining: np.ndarray, uses: np.ndarray,
+               uncovered: np.ndarray, picked_topic: np.ndarray) -> None:
+        k, d = self._slots[s]
+        avail[k, t, d] -= 1
+        remaining[k, d] -= 1
+        uses[t] += 1
+        uncovered[t] = False
+        picked_topic[s] = t
+
+    def assemble_many(self, n: int, seen: Optional[Iterable[int]] = None,
+                      rng: Optional[np.random.Generator] = None) -> list[Form]:
+        """``n`` pairwise disjoint forms, none touching ``seen``."""
+        rng = rng or np.random.default_rng()
+        excluded = list(seen) if seen is not None else []
+        forms = []
+        for _ in range(n):
+            form = self.assemble(excluded, rng)
+            excluded.extend(form.ids.tolist())
+            forms.append(form)
+        return forms
+
@@ -0,0 +1,374 @@
+"""Asyncio question server: the verified bank in memory, a prefetch queue per session.
+
+``ServedBank.load`` reads a bank file (``corpus.bank``) or parses and
+de-duplicates a corpus, drops questions whose declarative solution check
+fails (``ingest.verify_question``), and pre-encodes every question's JSON
+payload (with ``stemTex``) once. ``QuestionServer.next`` answers from a
+session's prefetch deque. A session is one (user, topic, difficulty).
+
+Sessions are refilled by background workers, always from the bank, never
+from a generator. When a deque drops to ``low_water`` items, the session is
+put on a bounded refill queue, and a worker tops it up to ``depth`` with
+unseen questions drawn from the taxonomy index. A request that finds its deque
+empty waits for that refill, and if the refill queue is full it waits for room
+too: that wait is the backpressure, so load spikes queue up rather than pile
+up work. A low-water prefetch never blocks a hit; when the queue is full it is
+deferred to the session's next request. Sessions idle for ``idle_seconds``
+are dropped.
+
+Served ids are remembered in Redis under the key lib/cache.ts uses,
+``seen:<user>:GMAT:Quant`` with a 21-day TTL, so restarts and other
+processes do not repeat questions. ``MemoryRedis`` stands in for Redis
+locally. Pass ``--redis URL`` to use a real server; that needs the ``redis``
+package. When a session has seen every matching question, its rotation
+restarts in memory; the shared seen set is only ever added to, as in
+lib/cache.ts.
+
+    python -m corpus.serve [bank.bin|GMAT_QUANT_BASE.py] --port 8787 --depth 8
+    curl 'localhost:8787/next?user=u1&topic=Geometry&difficulty=medium'
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional, Sequence, Union
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+
+from .bank import BankReader
+from .dedupe import DedupIndex, unique_questions
+from .notation import normalize_batch
+from .parse import DEFAULT_CORPUS, Question, iter_questions
+from .taxonomy import TaxonomyIndex
+from .topics import canonical_topic
+
+SEEN_TTL_SECONDS = 60 * 60 * 24 * 21  # lib/cache.ts
+DEPTH = 8
+WORKERS = 4
+MAX_PENDING = 1024
+IDLE_SECONDS = 15 * 60
+
+
+def seen_key(user: str) -> str:
+    return f"seen:{user}:GMAT:Quant"
+
+
+class MemoryRedis:
+    """In-process stand-in for the few Redis set commands the server uses (redis-py asyncio names)."""
+
+    def __init__(self) -> None:
+        self._sets: dict[str, set[str]] = {}
+        self._expires: dict[str, float] = {}
+
+    def _live(self, key: str) -> Optional[set[str]]:
+        at = self._expires.get(key)
+        if at is not None and at <= time.monotonic():
+            self._sets.pop(key, None)
+            self._expires.pop(key, None)
+        return self._sets.get(key)
+
+    async def sadd(self, key: str, *members: str) -> int:
+        s = self._live(key)
+        if s is None:
+            s = self._sets[key] = set()
+        before = len(s)
+        s.update(members)
+        return len(s) - before
+
+    async def smembers(self, key: str) -> set[str]:
+        return set(self._live(key) or ())
+
+    async def expire(self, key: str, seconds: int) -> bool:
+        if self._live(key) is None:
+            return False
+        self._expires[key] = time.monotonic() + seconds
+        return True
+
+
+@dataclass(frozen=True)
+class ServedBank:
+    questions: tuple[Question, ...]
+    payloads: tuple[bytes, ...]  # JSON per question, encoded once
+    taxonomy: TaxonomyIndex
+    index: dict[str, int]
+
+    @classmethod
+    def build(cls, questions: Sequence[Question]) -> "ServedBank":
+        questions = tuple(questions)
+        payloads = tuple(
+            json.dumps({**q.to_dict(), "stemTex": n.tex}, ensure_ascii=False).encode("utf-8")
+            for q, n in zip(questions, normalize_batch(q.stem for q in questions))
+        )
+        return cls(questions, payloads, TaxonomyIndex.build(questions), {q.id: i for i, q in enumerate(questions)})
+
+    @classmethod
+    def load(cls, path: Union[str, Path] = DEFAULT_CORPUS) -> "ServedBank":
+        """A bank file (``.bin``) or a corpus; questions failing their solution check are left out."""
+        from .ingest import verify_question
+
+        if Path(path).suffix == ".bin":
+            with BankReader(path) as bank:
+                questions = [bank.question(i) for i in range(len(bank))]
+        else:
+            questions = list(unique_questions(iter_questions(path), DedupIndex()))
+        verdicts = (verify_question(q) for q in questions)
+        return cls.build([q for q, v in zip(questions, verdicts) if v is None or v["reason"] is None])
+
+    def __len__(self) -> int:
+        return len(self.questions)
+
+
+@dataclass(eq=False)
+class Session:
+    user: str
+    topic: Optional[str]
+    difficulty: Optional[str]
+    items: deque = field(default_factory=deque)
+    seen: set = field(default_factory=set)  # bank indices served or queued
+    loaded: bool = False
+    pending: bool = False
+    ready: asyncio.Event = field(default_factory=asyncio.Event)
+    error: Optional[str] = None
+    last_used: float = 0.0
+
+
+class QuestionServer:
+    def __init__(self, bank: ServedBank, redis=None, depth: int = DEPTH, low_water: Optional[int] = None,
+                 workers: int = WORKERS, max_pending: int = MAX_PENDING, idle_seconds: float = IDLE_SECONDS,
+                 seed: Optional[int] = None) -> None:
+        self.bank = bank
+        self.redis = redis if redis is not None else MemoryRedis()
+        self.depth = depth
+        self.low_water = depth // 2 if low_water is None else low_water
+        self.idle_seconds = idle_seconds
+        self.sessions: dict[tuple[str, Optional[str], Optional[str]], Session] = {}
+        self.counters = {"served": 0, "hits": 0, "misses": 0, "refills": 0, "resets": 0, "deferred": 0,
+                         "evicted": 0}
+        self._rng = np.random.default_rng(seed)
+        self._workers = workers
+        self._max_pending = max_pending
+        self._requests: Optional[asyncio.Queue] = None
+        self._tasks: list[asyncio.Task] = []
+
+    async def start(self) -> None:
+        self._requests = asyncio.Queue(self._max_pending)
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self._workers)]
+        self._tasks.append(asyncio.create_task(self._janitor()))
+
+    async def stop(self) -> None:
+        for t in self._tasks:
+            t.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def __aenter__(self) -> "QuestionServer":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.stop()
+
+    async def next(self, user: str, topic: Optional[str] = None, difficulty: Optional[str] = None) -> bytes:
+        """The next question's JSON payload for this session; ``LookupError`` when nothing matches."""
+        topic = (canonical_topic(topic) or topic) if topic else None
+        key = (user, topic, difficulty)
+        session = self.sessions.get(key)
+        if session is None:
+            session = self.sessions[key] = Session(user, topic, difficulty)
+        session.last_used = time.monotonic()
+        if session.items:
+            self.counters["hits"] += 1
+        else:
+            self.counters["misses"] += 1
+            while not session.items:
+                session.ready.clear()
+                await self._request(session)
+                await session.ready.wait()
+                if session.error is not None:
+                    raise LookupError(session.error)
+        i = session.items.popleft()
+        if len(session.items) <= self.low_water:
+            self._request_soon(session)
+        self.counters["served"] += 1
+        return self.bank.payloads[i]
+
+    async def _request(self, session: Session) -> None:
+        if not session.pending:
+            session.pending = True
+            try:
+                await self._requests.put(session)  # blocks while the refill queue is full
+            except asyncio.CancelledError:
+                # Never enqueued: clear the flag and wake any other waiter so it asks again.
+                session.pending = False
+                session.ready.set()
+                raise
+
+    def _request_soon(self, session: Session) -> None:
+        """Low-water prefetch: never blocks a hit; when the queue is full the next call asks again."""
+        if not session.pending:
+            try:
+                self._requests.put_nowait(session)
+            except asyncio.QueueFull:
+                self.counters["deferred"] += 1
+                return
+            session.pending = True
+
+    async def _worker(self) -> None:
+        while True:
+            session = await self._requests.get()
+            try:
+                await self._fill(session)
+            except Exception as exc:  # surface to the waiting request instead of killing the worker
+                session.error = f"refill failed: {exc!r}"
+            finally:
+                session.pending = False
+                session.ready.set()
+                self._requests.task_done()
+
+    async def _fill(self, session: Session) -> None:
+        key = seen_key(session.user)
+        if not session.loaded:
+            stored = await self.redis.smembers(key)
+            session.seen.update(self.bank.index[s] for s in map(_text, stored) if s in self.bank.index)
+            session.loaded = True
+        want = self.depth - len(session.items)
+        if want <= 0:
+            return
+        facets = {f: v for f, v in (("topic", session.topic), ("difficulty", session.difficulty)) if v}
+        picked = self._pick(want, session.seen, facets)
+        if not len(picked) and not session.items:
+            matching = self.bank.taxonomy.query(**facets)
+            if not len(matching):
+                session.error = f"no questions for {facets or 'the bank'}"
+                return
+            # Everything matching has been seen: restart this session's rotation. The
+            # shared Redis set (other topics, the TypeScript routes) is left alone.
+            self.counters["resets"] += 1
+            session.seen.difference_update(matching.tolist())
+            picked = self._pick(want, session.seen, facets)
+        ids = [int(i) for i in picked]
+        session.items.extend(ids)
+        session.seen.update(ids)
+        session.error = None
+        self.counters["refills"] += 1
+        if ids:
+            await self.redis.sadd(key, *(self.bank.questions[i].id for i in ids))
+            await self.redis.expire(key, SEEN_TTL_SECONDS)
+
+    def _pick(self, k: int, seen: set, facets: dict) -> np.ndarray:
+        exclude = np.fromiter(seen, dtype=np.uint32, count=len(seen)) if seen else None
+        return self.bank.taxonomy.sample(k, self._rng, exclude=exclude, **facets)
+
+    def evict_idle(self, now: Optional[float] = None) -> int:
+        now = time.monotonic() if now is None else now
+        stale = [k for k, s in self.sessions.items() if now - s.last_used > self.idle_seconds and not s.pending]
+        for k in stale:
+            del self.sessions[k]
+        self.counters["evicted"] += len(stale)
+        return len(stale)
+
+    async def _janitor(self) -> None:
+        while True:
+            await asyncio.sleep(min(60.0, self.idle_seconds))
+            self.evict_idle()
+
+    def stats(self) -> dict:
+        return {**self.counters, "sessions": len(self.sessions), "bank": len(self.bank),
+                "pending": self._requests.qsize() if self._requests is not None else 0}
+
+
+def _text(value) -> str:
+    return value.decode("utf-8") if isinstance(value, bytes) else value
+
+
+# HTTP -----------------------------------------------------------------------------
+
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed"}
+
+
+async def _respond(writer: asyncio.StreamWriter, status: int, body: bytes, keep_alive: bool) -> None:
+    writer.write(
+        f"HTTP/1.1 {status} {_REASONS[status]}\r\nContent-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\nConnection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+        .encode("ascii") + body
+    )
+    await writer.drain()
+
+
+async def handle(server: QuestionServer, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    """Keep-alive HTTP/1.1 loop: ``GET /next?user=&topic=&difficulty=`` and ``GET /health``."""
+    try:
+        while True:
+            head = await reader.readuntil(b"\r\n\r\n")
+            lines = head.decode("latin-1").split("\r\n")
+            method, target, version = lines[0].split(" ", 2)
+            headers = {k.strip().lower(): v.strip() for k, _, v in (h.partition(":") for h in lines[1:] if h)}
+            keep_alive = headers.get("connection", "").lower() != "close" and version == "HTTP/1.1"
+            url = urlsplit(target)
+            query = {k: v[0] for k, v in parse_qs(url.query).items()}
+            if method != "GET":
+                status, body = 405, b'{"error":"GET only"}'
+            elif url.path == "/health":
+                status, body = 200, json.dumps(server.stats()).encode("utf-8")
+            elif url.path != "/next":
+                status, body = 404, b'{"error":"not found"}'
+            elif not query.get("user"):
+                status, body = 400, b'{"error":"user is required"}'
+            else:
+                try:
+                    status, body = 200, await server.next(query["user"], query.get("topic"), query.get("difficulty"))
+                except LookupError as exc:
+                    status, body = 404, json.dumps({"error": str(exc)}).encode("utf-8")
+            await _respond(writer, status, body, keep_alive)
+            if not keep_alive:
+                break
+    except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+        pass
+    finally:
+        writer.close()
+
+
+async def serve(bank: ServedBank, host: str = "127.0.0.1", port: int = 8787, redis=None, **options) -> None:
+    async with QuestionServer(bank, redis, **options) as server:
+        listener = await asyncio.start_server(lambda r, w: handle(server, r, w), host, port)
+        async with listener:
+            await listener.serve_forever()
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Serve verified bank questions from per-session prefetch queues.")
+    ap.add_argument("path", nargs="?", default=str(DEFAULT_CORPUS), help="bank file (.bin) or corpus")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8787)
+    ap.add_argument("--depth", type=int, default=DEPTH, help="questions prefetched per session")
+    ap.add_argument("--workers", type=int, default=WORKERS, help="background refill tasks")
+    ap.add_argument("--max-pending", type=int, default=MAX_PENDING, help="refill queue bound (backpressure)")
+    ap.add_argument("--redis", help="redis:// URL for the seen sets (default: in-process stand-in)")
+    args = ap.parse_args(argv)
+    redis = None
+    if args.redis:
+        try:
+            from redis.asyncio import Redis
+        except ImportError:
+            sys.stderr.write("--redis needs the redis package: pip install redis\n")
+            return 2
+        redis = Redis.from_url(args.redis)
+    bank = ServedBank.load(args.path)
+    sys.stderr.write(f"serving {len(bank)} questions on http://{args.host}:{args.port}\n")
+    try:
+        asyncio.run(serve(bank, args.host, args.port, redis, depth=args.depth, workers=args.workers,
+                          max_pending=args.max_pending))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,339 @@
+"""BM25 "more questions like this" index over normalized stems and solutions.
+
+Documents are the ``corpus.notation`` search form of the stem, the DS
+statements and the explanation (stem terms count double), plus math-token
+features taken from the math spans: ``#op:+``, ``#pow``, ``#pow:2``,
+``#ineq:gt``, ``#eq``, ``#ratio``, ``#sqrt`` and ``#kind:ds``.
+
+Postings are a term-major sparse matrix (CSR: ``starts`` / ``docs`` / ``tf``)
+cut into blocks of ``BLOCK`` postings. Each block stores its doc range, its
+largest tf and its shortest document, which bound the block's BM25
+contribution for any collection statistics. A query runs MaxScore: terms go in
+order of upper bound, and once the bounds still to come cannot lift a new
+document into the top k, the remaining terms only score existing candidates.
+Blocks whose doc range holds no candidate are skipped without being read
+(block-max pruning).
+
+``add`` appends to a forward (doc-major) matrix. New documents sit in a small
+delta that is scored exhaustively, and they are merged into the blocked
+postings once the delta reaches ``merge_at`` documents. ``save`` / ``load``
+use an uncompressed ``.npz`` so loading is a handful of array reads.
+"""
+from __future__ import annotations
+
+import json
+import re
+from collections import Counter
+from pathlib import Path
+from typing import Iterable, Optional, Sequence, Union
+
+import numpy as np
+
+from .notation import normalize_batch
+from .parse import Question
+
+BLOCK = 64
+K1 = 1.2
+B = 0.75
+K3 = 8.0
+MAX_QUERY_TERMS = 32
+
+_STOP = frozenset(
+    "a an and are as at be by for from has have how if in is it its of on or that the then this "
+    "to was were what which will with we so can".split()
+)
+_TERM = re.compile(r"[a-z0-9]+(?:\.[0-9]+)?")
+_POW = re.compile(r"\^\(?([a-z0-9.]+)")
+_INEQ = {"<": "#ineq:lt", "<=": "#ineq:lt", ">": "#ineq:gt", ">=": "#ineq:gt", "!=": "#ineq:ne"}
+_OPS = {"+": "#op:+", "-": "#op:-", "*": "#op:*", "/": "#op:/"}
+
+
+def math_features(spans: Iterable[str]) -> list[str]:
+    out: list[str] = []
+    for span in spans:
+        for tok in span.split():
+            if tok in _OPS:
+                out.append(_OPS[tok])
+            elif tok in _INEQ:
+                out.append(_INEQ[tok])
+                out.append("#ineq:strict" if len(tok) == 1 else "#ineq:loose")
+            elif tok == "=":
+                out.append("#eq")
+            elif tok == ":":
+                out.append("#ratio")
+        for exp in _POW.findall(span):
+            out += ["#pow", f"#pow:{exp if exp[0].isdigit() else 'var'}"]
+        if "sqrt(" in span:
+            out.append("#sqrt")
+    return out
+
+
+def _words(search: str) -> list[str]:
+    return [w for w in _TERM.findall(search) if w not in _STOP]
+
+
+def analyze(questions: Sequence[Question]) -> list[Counter]:
+    """Term frequencies per question (stem and statements weigh 2, explanation 1)."""
+    heads = normalize_batch(" ".join((q.stem, *q.statements)) for q in questions)
+    bodies = normalize_batch(q.explanation for q in questions)
+    out = []
+    for q, h, e in zip(questions, heads, bodies):
+        tf: Counter = Counter()
+        for term in _words(h.search) + math_features(h.math):
+            tf[term] += 2
+        for term in _words(e.search) + math_features(e.math):
+            tf[term] += 1
+        tf[f"#kind:{q.kind}"] += 1
+        if q.ds_type:
+            tf[f"#ds:{q.ds_type}"] += 1
+        out.append(tf)
+    return out
+
+
+def _ranges(starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    """Concatenation of ``arange(s, e)`` for each pair, without a Python loop."""
+    lengths = ends - starts
+    total = int(lengths.sum())
+    if not total:
+        return np.zeros(0, dtype=np.int64)
+    offsets = np.repeat(starts - np.concatenate([[0], np.cumsum(lengths)[:-1]]), lengths)
+    return np.arange(total, dtype=np.int64) + offsets
+
+
+class _Postings:
+    """Term-major blocked postings for docs ``[0, n_docs)``."""
+
+    __slots__ = ("starts", "docs", "tf", "block_starts", "block_first", "block_last",
+                 "block_maxtf", "block_minlen", "term_maxtf", "term_minlen")
+
+    def __init__(self, terms: np.ndarray, docs: np.ndarray, tf: np.ndarray, n_terms: int,
+                 doc_len: np.ndarray) -> None:
+        order = np.lexsort((docs, terms))
+        terms, self.docs, self.tf = terms[order], docs[order].astype(np.int32), tf[order].astype(np.float32)
+        self.starts = np.searchsorted(terms, np.arange(n_terms + 1)).astype(np.int64)
+        counts = np.diff(self.starts)
+        n_blocks = (counts + BLOCK - 1) // BLOCK
+        self.block_starts = np.concatenate([[0], np.cumsum(n_blocks)]).astype(np.int64)
+        # Posting offset where each block begins.
+        first = _ranges(np.zeros(n_terms, dtype=np.int64), n_blocks) * BLOCK \
+            + np.repeat(self.starts[:-1], n_blocks)
+        last = np.minimum(first + BLOCK, np.repeat(self.starts[1:], n_blocks))
+        if len(first):
+            self.block_first = self.docs[first]
+            self.block_last = self.docs[last - 1]
+            self.block_maxtf = np.maximum.reduceat(self.tf, first)
+            self.block_minlen = np.minimum.reduceat(doc_len[self.docs], first)
+        else:
+            self.block_first = self.block_last = np.zeros(0, dtype=np.int32)
+            self.block_maxtf = self.block_minlen = np.zeros(0, dtype=np.float32)
+        has = n_blocks > 0
+        self.term_maxtf = np.zeros(n_terms, dtype=np.float32)
+        self.term_minlen = np.zeros(n_terms, dtype=np.float32)
+        self.term_maxtf[has] = np.maximum.reduceat(self.block_maxtf, self.block_starts[:-1][has])
+        self.term_minlen[has] = np.minimum.reduceat(self.block_minlen, self.block_starts[:-1][has])
+
+
+class SimilarityIndex:
+    __slots__ = ("ids", "vocab", "df", "doc_len", "fwd_starts", "fwd_terms", "fwd_tf",
+                 "merge_at", "_index", "_main", "_n_main", "_delta")
+
+    def __init__(self, merge_at: int = 4096) -> None:
+        self.ids: list[str] = []
+        self.vocab: dict[str, int] = {}
+        self.df = np.zeros(0, dtype=np.int64)
+        self.doc_len = np.zeros(0, dtype=np.float32)
+        self.fwd_starts = np.zeros(1, dtype=np.int64)
+        self.fwd_terms = np.zeros(0, dtype=np.int32)
+        self.fwd_tf = np.zeros(0, dtype=np.float32)
+        self.merge_at = merge_at
+        self._index: dict[str, int] = {}
+        self._main: Optional[_Postings] = None
+        self._n_main = 0
+        self._delta: Optional[_Postings] = None
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @classmethod
+    def build(cls, questions: Iterable[Question], merge_at: int = 4096) -> "SimilarityIndex":
+        index = cls(merge_at)
+        index.add_many(questions)
+        index.merge()
+        return index
+
+    def add_many(self, questions: Iterable[Question]) -> int:
+        """Append questions (ids already present are skipped); returns how many were added."""
+        fresh = [q for q in questions if q.id not in self._index]
+        fresh = list({q.id: q for q in fresh}.values())
+        if not fresh:
+            return 0
+        terms, tfs, lens, starts = [], [], [], [int(self.fwd_starts[-1])]
+        for q, tf in zip(fresh, analyze(fresh)):
+            self._index[q.id] = len(self.ids)
+            self.ids.append(q.id)
+            for term, count in tf.items():
+                tid = self.vocab.setdefault(term, len(self.vocab))
+                terms.append(tid)
+                tfs.append(count)
+            lens.append(sum(tf.values()))
+            starts.append(starts[-1] + len(tf))
+        new_terms = np.array(terms, dtype=np.int32)
+        self.df = np.concatenate([self.df, np.zeros(len(self.vocab) - len(self.df), dtype=np.int64)])
+        np.add.at(self.df, new_terms, 1)
+        self.doc_len = np.concatenate([self.doc_len, np.array(lens, dtype=np.float32)])
+        self.fwd_starts = np.concatenate([self.fwd_starts, np.array(starts[1:], dtype=np.int64)])
+        self.fwd_terms = np.concatenate([self.fwd_terms, new_terms])
+        self.fwd_tf = np.concatenate([self.fwd_tf, np.array(tfs, dtype=np.float32)])
+        self._delta = None
+        if len(self.ids) - self._n_main >= self.merge_at:
+            self.merge()
+        return len(fresh)
+
+    def add(self, question: Question) -> bool:
+        return self.add_many([question]) == 1
+
+    def _postings(self, lo: int, hi: int) -> _Postings:
+        a, b = int(self.fwd_starts[lo]), int(self.fwd_starts[hi])
+        docs = np.repeat(np.arange(lo, hi, dtype=np.int32), np.diff(self.fwd_starts[lo:hi + 1]))
+        return _Postings(self.fwd_terms[a:b], docs, self.fwd_tf[a:b], len(self.vocab), self.doc_len)
+
+    def merge(self) -> None:
+        """Fold the delta into the blocked postings."""
+        self._main = self._postings(0, len(self.ids))
+        self._n_main = len(self.ids)
+        self._delta = None
+
+    def _query_terms(self, tf: dict[int, float]) -> tuple[np.ndarray, np.ndarray]:
+        tids = np.fromiter(tf, dtype=np.int64, count=len(tf))
+        qtf = np.fromiter(tf.values(), dtype=np.float64, count=len(tf))
+        n = len(self.ids)
+        idf = np.log1p((n - self.df[tids] + 0.5) / (self.df[tids] + 0.5))
+        w = idf * (K3 + 1) * qtf / (K3 + qtf)
+        keep = np.argsort(-w, kind="stable")[:MAX_QUERY_TERMS]
+        return tids[keep], w[keep]
+
+    def _score(self, p: _Postings, idx: np.ndarray, w: float, avgdl: float) -> tuple[np.ndarray, np.ndarray]:
+        docs, tf = p.docs[idx], p.tf[idx]
+        norm = K1 * (1 - B + B * self.doc_len[docs] / avgdl)
+        return docs, w * tf * (K1 + 1) / (tf + norm)
+
+    def _bound(self, maxtf: np.ndarray, minlen: np.ndarray, w: np.ndarray, avgdl: float) -> np.ndarray:
+        return w * maxtf * (K1 + 1) / (maxtf + K1 * (1 - B + B * minlen / avgdl))
+
+    def top(self, tf: dict[int, float], k: int = 10, exclude: Sequence[int] = ()) -> list[tuple[int, float]]:
+        """Top-k (row, score) for a term-id -> frequency query."""
+        if not tf or not self.ids:
+            return []
+        tids, w = self._query_terms(tf)
+        avgdl = float(self.doc_len.mean())
+        n = len(self.ids)
+        scores = np.zeros(n, dtype=np.float64)
+        excluded = np.asarray(exclude, dtype=np.int64)
+        kk = k + len(excluded)
+
+        main = self._main
+        if main is not None:
+            known = tids < len(main.term_maxtf)
+            mt, mw = tids[known], w[known]
+            ub = self._bound(main.term_maxtf[mt], main.term_minlen[mt], mw, avgdl)
+            order = np.argsort(-ub, kind="stable")
+            mt, mw, ub = mt[order], mw[order], ub[order]
+            rest = np.concatenate([np.cumsum(ub[::-1])[::-1], [0.0]])  # bound of terms i.. onwards
+            theta = 0.0
+            i = 0
+            # Essential terms: any document may still enter the top k.
+            while i < len(mt) and rest[i] >= theta:
+                t = mt[i]
+                docs, s = self._score(main, np.arange(main.starts[t], main.starts[t + 1]), mw[i], avgdl)
+                scores[docs] += s
+                i += 1
+                # The k-th best among the docs just touched is a lower bound on the k-th overall.
+                if len(docs) > kk:
+                    touched = scores[docs]
+                    theta = max(theta, float(np.partition(touched, len(docs) - kk)[len(docs) - kk]))
+            # Non-essential terms only refine candidates. A block is read only if some
+            # candidate inside its doc range could still reach theta with the block's bound.
+            cand = np.flatnonzero((scores > 0) & (scores + rest[i] >= theta)) if i < len(mt) else None
+            while cand is not None and i < len(mt) and len(cand):
+                t = mt[i]
+                b0, b1 = main.block_starts[t], main.block_starts[t + 1]
+                first, last = main.block_first[b0:b1], main.block_last[b0:b1]
+                bound = self._bound(main.block_maxtf[b0:b1], main.block_minlen[b0:b1], mw[i], avgdl)
+                blk = np.minimum(np.searchsorted(last, cand), b1 - b0 - 1)
+                inside = first[blk] <= cand
+                reach = inside & (scores[cand] + bound[blk] + rest[i + 1] >= theta)
+                if reach.any():
+                    live = np.unique(blk[reach])
+                    lo = main.starts[t] + live * BLOCK
+                    hi = np.minimum(lo + BLOCK, main.starts[t + 1])
+                    docs, s = self._score(main, _ranges(lo, hi), mw[i], avgdl)
+                    pos = np.minimum(np.searchsorted(cand, docs), len(cand) - 1)
+                    hit = cand[pos] == docs
+                    scores[docs[hit]] += s[hit]
+                i += 1
+                cand = cand[scores[cand] + rest[i] >= theta]
+
+        if self._n_main < n:
+            if self._delta is None:
+                self._delta = self._postings(self._n_main, n)
+            d = self._delta
+            for t, wt in zip(tids.tolist(), w.tolist()):
+                if t < len(d.starts) - 1:
+                    docs, s = self._score(d, np.arange(d.starts[t], d.starts[t + 1]), wt, avgdl)
+                    scores[docs] += s
+
+        if len(excluded):
+            scores[excluded[(excluded >= 0) & (excluded < n)]] = 0
+        k = min(k, int((scores > 0).sum()))
+        if not k:
+            return []
+        best = np.argpartition(-scores, k - 1)[:k]
+        best = best[np.argsort(-scores[best], kind="stable")]
+        return [(int(r), float(scores[r])) for r in best]
+
+    def similar(self, id: str, k: int = 10) -> list[tuple[str, float]]:
+        """Nearest neighbours of an indexed question (itself excluded)."""
+        row = self._index.get(id)
+        if row is None:
+            raise KeyError(id)
+        a, b = int(self.fwd_starts[row]), int(self.fwd_starts[row + 1])
+        tf = dict(zip(self.fwd_terms[a:b].tolist(), self.fwd_tf[a:b].tolist()))
+        return [(self.ids[r], s) for r, s in self.top(tf, k, exclude=[row])]
+
+    def like(self, question: Question, k: int = 10) -> list[tuple[str, float]]:
+        """Neighbours of a question that need not be in the index."""
+        (tf,) = analyze([question])
+        query = {self.vocab[t]: float(c) for t, c in tf.items() if t in self.vocab}
+        exclude = [self._index[question.id]] if question.id in self._index else []
+        return [(self.ids[r], s) for r, s in self.top(query, k, exclude)]
+
+    def save(self, path: Union[str, Path]) -> None:
+        """Forward matrix plus the blocked postings, so ``load`` does not rebuild them."""
+        main = {f"postings_{k}": getattr(self._main, k) for k in _Postings.__slots__} if self._main else {}
+        with open(path, "wb") as fh:
+            np.savez(
+                fh, meta=np.array(json.dumps({"ids": self.ids, "vocab": list(self.vocab),
+                                              "merge_at": self.merge_at, "n_main": self._n_main})),
+                df=self.df, doc_len=self.doc_len, fwd_starts=self.fwd_starts,
+                fwd_terms=self.fwd_terms, fwd_tf=self.fwd_tf, **main,
+            )
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "SimilarityIndex":
+        with np.load(path) as data:
+            meta = json.loads(str(data["meta"]))
+            index = cls(meta["merge_at"])
+            index.ids = meta["ids"]
+            index.vocab = {t: i for i, t in enumerate(meta["vocab"])}
+            index._index = {id: i for i, id in enumerate(index.ids)}
+            index.df = data["df"]
+            index.doc_len = data["doc_len"]
+            index.fwd_starts = data["fwd_starts"]
+            index.fwd_terms = data["fwd_terms"]
+            index.fwd_tf = data["fwd_tf"]
+            if meta["n_main"]:
+                main = index._main = _Postings.__new__(_Postings)
+                for k in _Postings.__slots__:
+                    setattr(main, k, data[f"postings_{k}"])
+                index._n_main = meta["n_main"]
+        return index
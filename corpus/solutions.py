@@ -0,0 +1,50 @@
+"""Declarative solutions for the worked items in GMAT_QUANT_BASE.py, keyed by question id.
+
+Ids come from ``corpus.parse`` (a digest of the stem), so they survive edits
+elsewhere in the corpus.
+"""
+from __future__ import annotations
+
+from .checker import PSSolution
+from .recurrence import Recurrence
+from .sufficiency import DSItem
+
+SOLUTIONS: dict[str, PSSolution] = {
+    # What is the units digit of 3^11?
+    "GMAT_corpus_ps_4ed4d7b058af841f": PSSolution(answer="3^11 % 10"),
+    # Harold is 30 years older than Paloma ... how old will Harold be in 3 years?
+    "GMAT_corpus_ps_8bec4289c70c98b2": PSSolution(
+        answer="H + 3",
+        equations=("H = P + 30", "H + 10 = 3(P + 10)"),
+        variables={"H": "Harold’s age today", "P": "Paloma’s age today"},
+    ),
+    # Manuscript typing: $5 per page typed, $3 per page per revision.
+    "GMAT_corpus_ps_99ce9b6f663190ba": PSSolution(answer="100 * 5 + 40 * 3 + 10 * 3 * 2"),
+    # Airline fleet: retire 3 type A and add 4 type B per year until A < 50% of the fleet.
+    "GMAT_corpus_ps_09d0ece84c0f2265": PSSolution(
+        answer="n",
+        recurrence=Recurrence(
+            init={"A": 60, "B": 0},
+            step={"A": "A - 3", "B": "B + 4"},
+            until="A < 0.5(A + B)",
+        ),
+        variables={"A": "the number of type A planes", "B": "the number of type B planes",
+                   "n": "the number of years"},
+    ),
+}
+
+DS_ITEMS: dict[str, DSItem] = {
+    "GMAT_corpus_ds_f1115d0d547cf765": DSItem(
+        question="2x",
+        statements=("2x + 5x + 7x = 70", "5x = 7x – 10"),
+        variables={"x": "positive"},
+        key="D",
+        id="GMAT_corpus_ds_f1115d0d547cf765",
+    ),
+    "GMAT_corpus_ds_1d414e91fe1e1e27": DSItem(
+        question="x^2 > x",
+        statements=("x > 0", "x > 1"),
+        key="B",
+        id="GMAT_corpus_ds_1d414e91fe1e1e27",
+    ),
+}
@@ -0,0 +1,318 @@
+"""Data Sufficiency auto-verifier.
+
+A ``DSItem`` is the question (a value expression such as ``2x`` or a yes/no
+predicate such as ``x^2 > x``), optional constraints from the stem, and the two
+statements. ``verify`` decides sufficiency for statement (1), (2) and both
+together and maps that onto the A–E key:
+
+1. Exact: linear equalities are eliminated with Fractions; when the remaining
+   freedom is zero or a single variable pinned by a polynomial equation, the
+   candidate points are enumerated and checked exactly.
+2. Sampling: otherwise the free variables are sampled in one vectorized batch
+   (proper fractions, negatives, integers, boundary values from the constants
+   in the item, random magnitudes). Two different outcomes prove
+   insufficiency; one outcome is taken as sufficient.
+
+An item whose text does not parse gets ``REASON_UNPARSEABLE`` instead of
+raising, and an exact power too large to evaluate leaves its check
+inconclusive, so one bad item never aborts a batch. ``verify_many`` spreads
+items across a process pool.
+"""
+from __future__ import annotations
+
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from fractions import Fraction
+from typing import Iterable, Mapping, Optional, Sequence, Union
+
+import numpy as np
+
+from .expr import Expr, Poly, solve_linear
+
+ANSWERS = "ABCDE"
+DOMAINS = frozenset({
+    "real", "integer", "positive", "negative", "nonnegative", "nonzero",
+    "positive_integer", "nonnegative_integer",
+})
+
+REASON_INCONCLUSIVE = "DS sampling inconclusive"
+REASON_UNPARSEABLE = "DS item does not parse"
+REASON_KEY_WRONG = "keyed answer wrong"
+
+_SPECIAL = (0, 1, -1, 2, -2, 0.5, -0.5, 1 / 3, -1 / 3, 2 / 3, -2 / 3, 1.5, -1.5, 3, -3,
+            10, -10, 100, -100, 1e-3, -1e-3, 1e3, -1e3)
+
+Statement = Union[str, Sequence[str]]
+
+
+@dataclass(frozen=True, slots=True)
+class DSItem:
+    question: str
+    statements: tuple[Statement, Statement]
+    variables: Mapping[str, str] = field(default_factory=dict)  # name -> domain; default "real"
+    given: tuple[str, ...] = ()
+    key: Optional[str] = None
+    id: str = ""
+
+
+@dataclass(frozen=True, slots=True)
+class Sufficiency:
+    sufficient: Optional[bool]  # None = inconclusive
+    method: str  # "exact" | "sampled"
+    outcomes: tuple = ()
+
+
+@dataclass(frozen=True, slots=True)
+class DSVerdict:
+    id: str
+    answer: Optional[str]
+    key: Optional[str]
+    checks: tuple[Sufficiency, ...]
+    reason: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.reason is None
+
+
+def _as_list(statement: Statement) -> list[str]:
+    return [statement] if isinstance(statement, str) else list(statement)
+
+
+def _in_domain_exact(v, domain: str) -> bool:
+    if isinstance(v, float) and domain not in ("real", "positive", "negative", "nonnegative", "nonzero"):
+        return abs(v - round(v)) < 1e-9 and _in_domain_exact(Fraction(round(v)), domain)
+    integral = not isinstance(v, float) and Fraction(v).denominator == 1
+    return {
+        "real": True,
+        "integer": integral,
+        "positive": v > 0,
+        "negative": v < 0,
+        "nonnegative": v >= 0,
+        "nonzero": v != 0,
+        "positive_integer": integral and v > 0,
+        "nonnegative_integer": integral and v >= 0,
+    }[domain]
+
+
+def _domain_mask(v: np.ndarray, domain: str) -> np.ndarray:
+    finite = np.isfinite(v)
+    integral = np.isclose(v, np.round(v), rtol=0, atol=1e-9)
+    return finite & {
+        "real": True,
+        "integer": integral,
+        "positive": v > 0,
+        "negative": v < 0,
+        "nonnegative": v >= 0,
+        "nonzero": v != 0,
+        "positive_integer": integral & (v > 0),
+        "nonnegative_integer": integral & (v >= 0),
+    }[domain]
+
+
+def _real_roots(poly: Poly, name: str) -> list:
+    coeffs = poly.univariate(name)
+    roots = []
+    for z in np.roots([float(c) for c in coeffs]):
+        # Repeated roots come back with a small imaginary part; keep them if they check out.
+        if abs(z.imag) > 1e-6:
+            continue
+        guess = Fraction(float(z.real)).limit_denominator(10**6)
+        if poly.evaluate({name: guess}) == 0:
+            roots.append(guess)
+        elif abs(z.imag) < 1e-12:
+            roots.append(float(z.real))
+    return sorted(set(roots), key=float)
+
+
+class _Check:
+    """Sufficiency of one constraint set for one item."""
+
+    def __init__(self, item: DSItem, constraints: list[str], samples: int, rng: np.random.Generator):
+        self.question = Expr(item.question)
+        self.exprs = [Expr(c) for c in constraints]
+        names = set(self.question.names).union(*(e.names for e in self.exprs), item.variables)
+        self.names = sorted(names)
+        self.domains = {n: item.variables.get(n, "real") for n in self.names}
+        unknown = set(self.domains.values()) - DOMAINS
+        if unknown:
+            raise ValueError(f"unknown variable domains: {sorted(unknown)}")
+        self.samples = samples
+        self.rng = rng
+
+    def _outcome(self, value):
+        if self.question.is_relation:
+            return bool(value)
+        return value if not isinstance(value, float) else round(value, 9)
+
+    def run(self) -> Sufficiency:
+        linear, nonlinear = [], []
+        for e in self.exprs:
+            eq = e.equation()
+            if eq is not None:
+                (linear if eq.degree <= 1 else nonlinear).append(eq)
+        solved = solve_linear(linear, self.names)
+        if solved is None:
+            return Sufficiency(None, "exact")
+        free = [n for n in self.names if n not in solved]
+        remaining = [p.subs(solved) for p in nonlinear]
+        if any(p.is_const and p.const_value for p in remaining):
+            return Sufficiency(None, "exact")
+        remaining = [p for p in remaining if not p.is_const]
+
+        target = self.question.poly()
+        if free and target is not None and not remaining and target.subs(solved).is_const:
+            # The answer is fixed, but only sufficient if some point satisfies everything else.
+            if not self._feasible(solved, free):
+                return Sufficiency(None, "exact")
+            return Sufficiency(True, "exact", (target.subs(solved).const_value,))
+
+        if not free:
+            return self._points(solved, [{}])
+        if len(free) == 1 and remaining:
+            (v,) = free
+            roots = _real_roots(remaining[0], v)
+            return self._points(solved, [{v: r} for r in roots])
+        return self._sample(solved, free)
+
+    def _feasible(self, solved: dict[str, Poly], free: list[str]) -> bool:
+        """Solved values lie in their domains and the constraints still admit a point."""
+        fixed = {n: p.evaluate({}) for n, p in solved.items() if p.is_const}
+        if not all(_in_domain_exact(v, self.domains[n]) for n, v in fixed.items()):
+            return False
+        if not self._holds(fixed, [e for e in self.exprs if set(e.names) <= fixed.keys()]):
+            return False
+        return self._sample(solved, free).sufficient is not None
+
+    @staticmethod
+    def _holds(env: dict, exprs: list[Expr]) -> bool:
+        """Exact check of ``exprs`` at ``env``; outside a function's domain (``sqrt(-1)``, ``comb(2.5, 1)``) fails."""
+        try:
+            return all(e.exact(env) for e in exprs)
+        except ValueError:
+            return False
+
+    def _points(self, solved: dict[str, Poly], points: list[dict]) -> Sufficiency:
+        outcomes = set()
+        for point in points:
+            env = dict(point)
+            for name, p in solved.items():
+                env[name] = p.evaluate(point)
+            if not all(_in_domain_exact(env[n], self.domains[n]) for n in self.names if n in env):
+                continue
+            if not self._holds(env, self.exprs):
+                continue
+            try:
+                outcomes.add(self._outcome(self.question.exact(env)))
+            except ValueError:
+                continue
+        if not outcomes:
+            return Sufficiency(None, "exact")
+        return Sufficiency(len(outcomes) == 1, "exact", tuple(sorted(outcomes, key=float)))
+
+    def _candidates(self, domain: str, n: int) -> np.ndarray:
+        consts = {float(c) for e in (self.question, *self.exprs) for c in e.constants()}
+        special = list(_SPECIAL)
+        for c in consts:
+            special += [c, -c, c + 1, c - 1, c + 1e-6, c - 1e-6, c + 0.5, c - 0.5, c / 2, 2 * c]
+        k = n // 3
+        signs = self.rng.choice([-1.0, 1.0], size=k)
+        vals = np.concatenate([
+            np.array(special, dtype=np.float64),
+            self.rng.uniform(-100, 100, k),
+            signs * 10 ** self.rng.uniform(-3, 4, k),
+            self.rng.integers(-50, 51, n - 2 * k).astype(np.float64),
+        ])
+        if "integer" in domain:
+            vals = np.round(vals)
+        return np.unique(vals[_domain_mask(vals, domain)])
+
+    def _sample(self, solved: dict[str, Poly], free: list[str]) -> Sufficiency:
+        pools = [self._candidates(self.domains[v], self.samples) for v in free]
+        if any(len(p) == 0 for p in pools):
+            return Sufficiency(None, "sampled")
+        if len(free) == 1:
+            cols = [pools[0]]
+        else:
+            grid = [p[:: max(1, len(p) // 12)] for p in pools]
+            combos = np.array(list(itertools.islice(itertools.product(*grid), 4096)), dtype=np.float64)
+            cols = [
+                np.concatenate([combos[:, i], self.rng.choice(p, self.samples)])
+                for i, p in enumerate(pools)
+            ]
+        env = dict(zip(free, cols))
+        for name, p in solved.items():
+            env[name] = p.evaluate(env, exact=False) * np.ones_like(cols[0])
+        mask = np.ones(len(cols[0]), dtype=bool)
+        with np.errstate(all="ignore"):
+            for n in self.names:
+                mask &= _domain_mask(np.asarray(env[n], dtype=np.float64), self.domains[n])
+            for e in self.exprs:
+                mask &= np.asarray(e(**env), dtype=bool)
+            values = np.asarray(self.question(**env) * np.ones_like(cols[0]))
+        if self.question.is_relation:
+            seen = np.unique(values[mask].astype(bool))
+            outcomes = tuple(bool(v) for v in seen)
+        else:
+            values = values[mask]
+            values = values[np.isfinite(values)]
+            outcomes = tuple(np.unique(np.round(values, 9)).tolist()[:8])
+        if not outcomes:
+            return Sufficiency(None, "sampled")
+        return Sufficiency(len(outcomes) == 1, "sampled", outcomes)
+
+
+def check(item: DSItem, constraints: Iterable[str], samples: int = 4096, seed: int = 0) -> Sufficiency:
+    """Is ``item.question`` settled by ``constraints`` (plus the stem's ``given``)?"""
+    rng = np.random.default_rng(seed)
+    c = _Check(item, [*item.given, *constraints], samples, rng)
+    try:
+        return c.run()
+    except OverflowError:  # an exact power past ``expr.MAX_EXPONENT``
+        return Sufficiency(None, "exact")
+
+
+def verify(item: DSItem, samples: int = 4096, seed: int = 0) -> DSVerdict:
+    s1_text, s2_text = (_as_list(s) for s in item.statements)
+    try:
+        answer, checks = _decide(item, s1_text, s2_text, samples, seed)
+    except ValueError:  # text that does not parse or is outside the whitelist
+        return DSVerdict(item.id, None, item.key, (), REASON_UNPARSEABLE)
+    reason = None
+    if answer is None:
+        reason = REASON_INCONCLUSIVE
+    elif item.key is not None and item.key != answer:
+        reason = REASON_KEY_WRONG
+    return DSVerdict(item.id, answer, item.key, checks, reason)
+
+
+def _decide(item: DSItem, s1_text: list[str], s2_text: list[str], samples: int,
+            seed: int) -> tuple[Optional[str], tuple[Sufficiency, ...]]:
+    s1 = check(item, s1_text, samples, seed)
+    s2 = check(item, s2_text, samples, seed)
+    checks: tuple[Sufficiency, ...] = (s1, s2)
+    answer: Optional[str] = None
+    if s1.sufficient is not None and s2.sufficient is not None:
+        if s1.sufficient and s2.sufficient:
+            answer = "D"
+        elif s1.sufficient:
+            answer = "A"
+        elif s2.sufficient:
+            answer = "B"
+        else:
+            both = check(item, s1_text + s2_text, samples, seed)
+            checks = (s1, s2, both)
+            if both.sufficient is not None:
+                answer = "C" if both.sufficient else "E"
+    return answer, checks
+
+
+def verify_many(items: Iterable[DSItem], processes: Optional[int] = None,
+                samples: int = 4096, chunksize: int = 8) -> list[DSVerdict]:
+    """Verify a batch; ``processes=1`` runs in-process (useful in tests and notebooks)."""
+    items = list(items)
+    if processes == 1 or len(items) <= 1:
+        return [verify(item, samples) for item in items]
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        return list(pool.map(verify, items, itertools.repeat(samples), chunksize=chunksize))
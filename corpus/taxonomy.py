@@ -0,0 +1,164 @@
+"""Inverted taxonomy index: (topic, subtopic, kind, difficulty, concept) -> question ids.
+
+Question ids here are integer positions (the order of the bank / input). Each
+facet keeps one int32 code per question plus a CSR posting layout, so every
+posting list is a sorted ``uint32`` slice. Queries union values within a
+facet and intersect across facets starting from the rarest one; ``sample``
+draws weighted items without replacement (Efraimidis–Spirakis keys) from a
+query result without rescanning the bank.
+"""
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterable, Mapping, Optional, Sequence, Union
+
+import numpy as np
+
+from .parse import Question
+
+if TYPE_CHECKING:
+    from .bank import BankReader
+
+FACETS = ("topic", "subtopic", "kind", "difficulty", "concept")
+
+FacetValue = Union[str, None, Sequence[Optional[str]]]
+
+
+def _key(facet: str, value: Optional[str]) -> str:
+    if value is None:
+        return ""
+    return " ".join(value.split()).lower() if facet == "subtopic" else value
+
+
+class TaxonomyIndex:
+    __slots__ = ("size", "codes", "vocab", "_lookup", "_order", "_starts")
+
+    def __init__(self, codes: Mapping[str, np.ndarray], vocab: Mapping[str, list[str]]) -> None:
+        self.codes = {f: np.asarray(codes[f], dtype=np.int32) for f in FACETS}
+        self.vocab = {f: list(vocab[f]) for f in FACETS}
+        self.size = len(self.codes[FACETS[0]])
+        self._lookup = {f: {v: i for i, v in enumerate(self.vocab[f])} for f in FACETS}
+        self._order: dict[str, np.ndarray] = {}
+        self._starts: dict[str, np.ndarray] = {}
+        for f in FACETS:
+            order = np.argsort(self.codes[f], kind="stable").astype(np.uint32)
+            self._order[f] = order
+            self._starts[f] = np.searchsorted(
+                self.codes[f][order], np.arange(len(self.vocab[f]) + 1)
+            ).astype(np.int64)
+
+    @classmethod
+    def build(cls, questions: Iterable[Question]) -> "TaxonomyIndex":
+        codes: dict[str, list[int]] = {f: [] for f in FACETS}
+        vocab: dict[str, list[str]] = {f: [] for f in FACETS}
+        lookup: dict[str, dict[str, int]] = {f: {} for f in FACETS}
+        for q in questions:
+            for f in FACETS:
+                k = _key(f, getattr(q, f))
+                code = lookup[f].get(k)
+                if code is None:
+                    code = lookup[f][k] = len(vocab[f])
+                    vocab[f].append(k)
+                codes[f].append(code)
+        return cls({f: np.array(codes[f], dtype=np.int32) for f in FACETS}, vocab)
+
+    @classmethod
+    def from_bank(cls, bank: "BankReader") -> "TaxonomyIndex":
+        """Index a bank file in bank order, so ids are ``BankReader`` row indices."""
+        return cls.build(bank.question(i) for i in range(len(bank)))
+
+    def __len__(self) -> int:
+        return self.size
+
+    def values(self, facet: str) -> list[str]:
+        return [v for v in self.vocab[facet] if v]
+
+    def _slice(self, facet: str, code: int) -> np.ndarray:
+        starts = self._starts[facet]
+        return self._order[facet][starts[code]:starts[code + 1]]
+
+    def postings(self, facet: str, value: Optional[str]) -> np.ndarray:
+        """Sorted ids with ``facet == value`` (a view; empty when unknown)."""
+        code = self._lookup[facet].get(_key(facet, value))
+        if code is None:
+            return np.zeros(0, dtype=np.uint32)
+        return self._slice(facet, code)
+
+    def _codes(self, facet: str, value: FacetValue) -> list[int]:
+        values = [value] if value is None or isinstance(value, str) else list(value)
+        codes = (self._lookup[facet].get(_key(facet, v)) for v in values)
+        return [c for c in codes if c is not None]
+
+    def _count(self, facet: str, codes: list[int]) -> int:
+        starts = self._starts[facet]
+        return int(sum(starts[c + 1] - starts[c] for c in codes))
+
+    def query(self, exclude: Optional[np.ndarray] = None, **facets: FacetValue) -> np.ndarray:
+        """Sorted ids matching every given facet (a list of values means any of them).
+
+        The rarest facet's postings seed the result; the other facets filter it
+        through a per-facet lookup table on the code arrays, so the cost tracks
+        the smallest posting list rather than the bank size.
+        """
+        unknown = set(facets) - set(FACETS)
+        if unknown:
+            raise ValueError(f"unknown facets: {sorted(unknown)}")
+        if facets:
+            wanted = {f: self._codes(f, v) for f, v in facets.items()}
+            seed = min(wanted, key=lambda f: self._count(f, wanted[f]))
+            parts = [self._slice(seed, c) for c in wanted[seed]]
+            ids = np.sort(np.concatenate(parts)) if parts else np.zeros(0, dtype=np.uint32)
+            for f, codes in wanted.items():
+                if f == seed or not len(ids):
+                    continue
+                table = np.zeros(len(self.vocab[f]), dtype=bool)
+                table[codes] = True
+                ids = ids[table[self.codes[f][ids]]]
+        else:
+            ids = np.arange(self.size, dtype=np.uint32)
+        if exclude is not None and len(exclude):
+            ids = ids[~np.isin(ids, exclude)]
+        return ids
+
+    def union(self, *id_lists: np.ndarray) -> np.ndarray:
+        return np.unique(np.concatenate(id_lists)) if id_lists else np.zeros(0, dtype=np.uint32)
+
+    def weights_for(self, ids: np.ndarray, weights: Mapping[str, Mapping[str, float]]) -> np.ndarray:
+        """Per-id weight: product over facets of the weight of the id's value (default 1)."""
+        w = np.ones(len(ids))
+        for facet, table in weights.items():
+            vec = np.ones(len(self.vocab[facet]))
+            for value, weight in table.items():
+                code = self._lookup[facet].get(_key(facet, value))
+                if code is not None:
+                    vec[code] = weight
+            w *= vec[self.codes[facet][ids]]
+        return w
+
+    def sample(self, k: int, rng: Optional[np.random.Generator] = None,
+               weights: Optional[Mapping[str, Mapping[str, float]]] = None,
+               exclude: Optional[np.ndarray] = None, **facets: FacetValue) -> np.ndarray:
+        """Up to ``k`` distinct ids from ``query(**facets)``, drawn proportionally to ``weights``."""
+        rng = rng or np.random.default_rng()
+        ids = self.query(exclude=exclude, **facets)
+        w = self.weights_for(ids, weights) if weights else np.ones(len(ids))
+        positive = w > 0
+        ids, w = ids[positive], w[positive]
+        if len(ids) <= k:
+            return rng.permutation(ids)
+        keys = rng.exponential(size=len(ids)) / w
+        top = np.argpartition(keys, k)[:k]
+        return ids[top[np.argsort(keys[top])]]
+
+    def save(self, path: Union[str, Path]) -> None:
+        with open(path, "wb") as fh:
+            np.savez_compressed(
+                fh, vocab=np.array(json.dumps(self.vocab)), **{f"codes_{f}": self.codes[f] for f in FACETS}
+            )
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "TaxonomyIndex":
+        with np.load(path) as data:
+            vocab = json.loads(str(data["vocab"]))
+            return cls({f: data[f"codes_{f}"] for f in FACETS}, vocab)
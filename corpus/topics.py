@@ -0,0 +1,102 @@
+"""Corpus topic list and its mapping onto the ``GmatConcept`` buckets in lib/gmatBank.ts."""
+from __future__ import annotations
+
+from typing import Optional
+
+# The 21 major topics, in the order the corpus lists them.
+MAJOR_TOPICS: tuple[str, ...] = (
+    "Basic Arithmetic",
+    "Linear and Quadratic Equations",
+    "Number Properties",
+    "Roots",
+    "Exponents",
+    "Inequalities",
+    "Absolute Values",
+    "General Word Problems",
+    "Rates",
+    "Work Problems",
+    "Unit Conversions",
+    "Ratios",
+    "Percents",
+    "Statistics",
+    "Overlapping Sets",
+    "Combinations and Permutations",
+    "Probability",
+    "Geometry",
+    "Coordinate Geometry",
+    "Sequences",
+    "Functions",
+)
+
+# Mirrors GMAT_QUANT_CATEGORIES in lib/gmatBank.ts.
+GMAT_CONCEPTS: tuple[str, ...] = (
+    "Number Properties & Arithmetic",
+    "Algebraic Equations & Inequalities",
+    "Exponentials & Functions",
+    "Word Problems & Rates",
+    "Counting & Probability",
+    "Data Analysis & Sets",
+    "Geometry & Coordinate Geometry",
+    "Data Sufficiency — Algebra & Number",
+    "Data Sufficiency — Geometry & Measurement",
+    "Data Sufficiency — Applications",
+)
+
+PS_CONCEPT_BY_TOPIC: dict[str, str] = {
+    "Basic Arithmetic": "Number Properties & Arithmetic",
+    "Linear and Quadratic Equations": "Algebraic Equations & Inequalities",
+    "Number Properties": "Number Properties & Arithmetic",
+    "Roots": "Exponentials & Functions",
+    "Exponents": "Exponentials & Functions",
+    "Inequalities": "Algebraic Equations & Inequalities",
+    "Absolute Values": "Algebraic Equations & Inequalities",
+    "General Word Problems": "Word Problems & Rates",
+    "Rates": "Word Problems & Rates",
+    "Work Problems": "Word Problems & Rates",
+    "Unit Conversions": "Word Problems & Rates",
+    "Ratios": "Word Problems & Rates",
+    "Percents": "Word Problems & Rates",
+    "Statistics": "Data Analysis & Sets",
+    "Overlapping Sets": "Data Analysis & Sets",
+    "Combinations and Permutations": "Counting & Probability",
+    "Probability": "Counting & Probability",
+    "Geometry": "Geometry & Coordinate Geometry",
+    "Coordinate Geometry": "Geometry & Coordinate Geometry",
+    "Sequences": "Exponentials & Functions",
+    "Functions": "Exponentials & Functions",
+}
+
+_DS_GEOMETRY = {"Geometry", "Coordinate Geometry", "Unit Conversions"}
+_DS_APPLICATIONS = {
+    "General Word Problems",
+    "Rates",
+    "Work Problems",
+    "Ratios",
+    "Percents",
+    "Statistics",
+    "Overlapping Sets",
+    "Combinations and Permutations",
+    "Probability",
+}
+
+_TOPIC_BY_KEY = {t.lower(): t for t in MAJOR_TOPICS}
+
+
+def canonical_topic(text: Optional[str]) -> Optional[str]:
+    """Map a loosely written topic ("number properties") to its MAJOR_TOPICS title."""
+    if not text:
+        return None
+    return _TOPIC_BY_KEY.get(" ".join(text.split()).lower())
+
+
+def concept_for(topic: Optional[str], kind: str) -> Optional[str]:
+    """GmatConcept bucket for a canonical topic; ``None`` when the topic is unknown."""
+    if topic not in PS_CONCEPT_BY_TOPIC:
+        return None
+    if kind != "ds":
+        return PS_CONCEPT_BY_TOPIC[topic]
+    if topic in _DS_GEOMETRY:
+        return "Data Sufficiency — Geometry & Measurement"
+    if topic in _DS_APPLICATIONS:
+        return "Data Sufficiency — Applications"
+    return "Data Sufficiency — Algebra & Number"
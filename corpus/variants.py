@@ -0,0 +1,354 @@
+"""Parametric PS variant generator built from the corpus's worked examples.
+
+A ``Template`` is the corpus stem with its numbers lifted into integer
+parameters, plus declarative expressions for derived values, the answer,
+degeneracy constraints and common-error distractors. ``generate`` samples a
+whole batch of parameter sets at once, rejects degenerate or non-integer cases,
+builds five distinct choices per row, and keeps only rows that
+``checker.check_template`` confirms have exactly one matching, keyed choice.
+Recurrence templates (the fleet) get their answers from
+``recurrence.first_crossing_batch`` and are cross-checked against a closed form.
+
+    python -m corpus.variants age 1000 > age.jsonl
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from dataclasses import dataclass, field
+from typing import Iterator, Mapping, Optional, Sequence
+
+import numpy as np
+
+from .checker import REASON_KEY_WRONG, REASON_MULTIPLE, REASON_NO_MATCH, PSSolution, TemplateCheck, check_template
+from .expr import Expr
+from .instrument import NULL, Recorder
+from .parse import Question, qid, stem_digest
+from .recurrence import Recurrence, affine_states, first_crossing_batch, linear_condition
+from .topics import concept_for
+
+NAMES = ("Harold", "Paloma", "Nancy", "Diane", "Jill", "Marcus", "Liz", "Omar", "Priya", "Tomas",
+         "Grace", "Kenji", "Amara", "Felix", "Sofia", "Ravi")
+ITEMS = ("stamps", "coins", "books", "marbles", "postcards", "stickers")
+
+
+@dataclass(frozen=True, slots=True)
+class RecurrenceSpec:
+    """``x[n+1] = scale * x[n] + delta`` per state variable, all given as parameter expressions."""
+
+    init: Mapping[str, str]
+    delta: Mapping[str, str]
+    until: str  # linear in the state variables
+    scale: Mapping[str, str] = field(default_factory=dict)  # default "1"
+
+
+@dataclass(frozen=True, slots=True)
+class Template:
+    name: str
+    topic: str
+    subtopic: str
+    stem: str
+    params: Mapping[str, tuple[int, int]]  # inclusive ranges
+    answer: str
+    distractors: tuple[str, ...]
+    derived: Mapping[str, str] = field(default_factory=dict)
+    constraints: tuple[str, ...] = ()
+    labels: Mapping[str, tuple[str, tuple[str, ...]]] = field(default_factory=dict)
+    choice_format: str = "{}"
+    difficulty: str = "medium"
+    # When set, answers come from the recurrence solver and ``answer`` (a closed
+    # form) only cross-checks them in ``check_template``.
+    recurrence: Optional[RecurrenceSpec] = None
+    # Worked solution with ``{param}`` slots, filled per row by ``corpus.explain``.
+    walkthrough: Optional[PSSolution] = None
+
+
+TEMPLATES: dict[str, Template] = {
+    t.name: t
+    for t in (
+        Template(
+            name="age",
+            topic="General Word Problems",
+            subtopic="age problems",
+            stem=(
+                "{older} is {d} years older than {younger}. If in {t} years {older} will be "
+                "{k} times as old as {younger}, how old will {older} be in {s} years?"
+            ),
+            params={"d": (10, 45), "t": (2, 15), "k": (2, 5), "s": (1, 10), "i1": (0, 15), "i2": (0, 15)},
+            derived={"P": "(d + t - k*t) // (k - 1)", "H": "P + d"},
+            constraints=("(d + t - k*t) % (k - 1) == 0", "P >= 1", "i1 != i2", "s != t"),
+            answer="H + s",
+            distractors=("H", "P + s", "H + t", "H - s", "P + t", "H + s + 10"),
+            labels={"older": ("i1", NAMES), "younger": ("i2", NAMES)},
+            walkthrough=PSSolution(
+                answer="H + {s}",
+                equations=("H = P + {d}", "H + {t} = {k}(P + {t})"),
+                variables={"H": "{older}’s age today", "P": "{younger}’s age today"},
+            ),
+        ),
+        Template(
+            name="pricing",
+            topic="General Word Problems",
+            subtopic="per-unit pricing",
+            stem=(
+                "Rates for having a manuscript typed at a certain typing service are ${f} per page "
+                "for the first time a page is typed and ${r} per page each time a page is revised. "
+                "If a certain manuscript has {n} pages, of which {a} were revised only once, {b} were "
+                "revised twice, and the rest required no revisions, what was the total cost of "
+                "having the manuscript typed?"
+            ),
+            params={"f": (3, 12), "r": (1, 8), "n": (40, 300), "a": (5, 120), "b": (2, 60)},
+            constraints=("r < f", "a + b < n", "b < a"),
+            answer="n*f + a*r + 2*b*r",
+            distractors=(
+                "n*f + (a + b)*r", "n*f + a*r", "n*f + (a + 2*b)*f", "(n - a - b)*f + a*r + 2*b*r",
+                "n*f + 2*(a + b)*r",
+            ),
+            choice_format="${:,}",
+            difficulty="easy",
+            walkthrough=PSSolution(answer="{n} * {f} + {a} * {r} + 2 * {b} * {r}"),
+        ),
+        Template(
+            name="fleet",
+            topic="Sequences",
+            subtopic="linear recurrences",
+            stem=(
+                "A certain airline’s fleet consisted of {a} type A planes at the beginning of {y}. "
+                "At the end of each year, starting with {y}, the airline retired {r} of the type A "
+                "planes and acquired {g} new type B planes. How many years did it take before the "
+                "number of type A planes left in the airline’s fleet was less than 50 percent of "
+                "the fleet?"
+            ),
+            params={"a": (30, 120), "r": (2, 6), "g": (2, 8), "y": (1975, 2015)},
+            constraints=("a - r*(a // (r + g) + 1) > 0",),
+            recurrence=RecurrenceSpec(
+                init={"A": "a", "B": "0"},
+                delta={"A": "-r", "B": "g"},
+                until="A < 0.5(A + B)",
+            ),
+            # A < (A + B) / 2  <=>  a - r*n < g*n
+            answer="a // (r + g) + 1",
+            distractors=("a // (r + g)", "a // (r + g) + 2", "a // (2*r) + 1", "a // g + 1", "a // r"),
+            walkthrough=PSSolution(
+                answer="n",
+                recurrence=Recurrence(
+                    init={"A": "{a}", "B": "0"},
+                    step={"A": "A - {r}", "B": "B + {g}"},
+                    until="A < 0.5(A + B)",
+                ),
+                variables={"A": "the number of type A planes", "B": "the number of type B planes",
+                           "n": "the number of years"},
+            ),
+        ),
+        Template(
+            name="ratio_total",
+            topic="Ratios",
+            subtopic="ratio with a total",
+            stem=(
+                "The ratio of the number of {item} owned by {n1} to the number of {item} owned by "
+                "{n2} to the number of {item} owned by {n3} is {p} to {q} to {w}. If {n1}, {n2}, and "
+                "{n3} own {T} {item} in total, how many {item} does {n1} own?"
+            ),
+            params={"p": (1, 9), "q": (1, 9), "w": (1, 9), "x": (2, 20),
+                    "i1": (0, 15), "i2": (0, 15), "i3": (0, 15), "it": (0, 5)},
+            derived={"T": "(p + q + w) * x"},
+            constraints=("p != q", "q != w", "p != w", "i1 != i2", "i2 != i3", "i1 != i3"),
+            answer="p * x",
+            distractors=("q * x", "w * x", "x", "T - p * x", "(p + q) * x"),
+            labels={"n1": ("i1", NAMES), "n2": ("i2", NAMES), "n3": ("i3", NAMES), "item": ("it", ITEMS)},
+            difficulty="easy",
+            walkthrough=PSSolution(
+                answer="{p}x",
+                equations=("{p}x + {q}x + {w}x = {T}",),
+                variables={"x": "the multiplier in {n1} : {n2} : {n3} = {p}x : {q}x : {w}x"},
+            ),
+        ),
+    )
+}
+
+
+@dataclass(slots=True)
+class Batch:
+    """Columnar batch of verified variants of one template."""
+
+    template: Template
+    params: dict[str, np.ndarray]
+    choices: np.ndarray  # (n, 5) int64, ascending
+    keys: np.ndarray     # (n,) index of the correct choice
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def row(self, i: int) -> dict[str, int]:
+        return {k: int(v[i]) for k, v in self.params.items()}
+
+    def recurrence_states(self, steps: np.ndarray) -> dict[str, np.ndarray]:
+        """State of the template's recurrence after ``steps[i]`` steps, for every row at once."""
+        spec = self.template.recurrence
+        if spec is None:
+            raise ValueError(f"template {self.template.name!r} has no recurrence")
+        names, m, c, x0 = _recurrence_arrays(spec, self.params, len(self))
+        states = affine_states(m, c, x0, np.asarray(steps, dtype=np.int64))
+        return {n: states[:, i] for i, n in enumerate(names)}
+
+    def labelled(self, i: int) -> dict[str, object]:
+        """``row(i)`` plus the template's text labels (names, items)."""
+        env: dict[str, object] = dict(self.row(i))
+        for label, (param, values) in self.template.labels.items():
+            env[label] = values[env[param]]
+        return env
+
+    def questions(self) -> Iterator[Question]:
+        t = self.template
+        for i in range(len(self)):
+            stem = t.stem.format(**self.labelled(i))
+            yield Question(
+                id=qid(f"GMAT_gen_{t.name}_{stem_digest(stem)[:16]}"),
+                kind="ps",
+                stem=stem,
+                choices=tuple(t.choice_format.format(int(c)) for c in self.choices[i]),
+                correct_index=int(self.keys[i]),
+                explanation="",
+                topic=t.topic,
+                subtopic=t.subtopic,
+                concept=concept_for(t.topic, "ps"),
+                difficulty=t.difficulty,
+                source=f"variant:{t.name}",
+            )
+
+
+def _pick_choices(ans: np.ndarray, cands: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """First four distinct positive candidates per row that differ from the answer."""
+    k = cands.shape[1]
+    valid = (cands > 0) & (cands != ans[:, None])
+    for j in range(1, k):
+        valid[:, j] &= ~(cands[:, :j] == cands[:, j:j + 1]).any(axis=1)
+    ok = valid.sum(axis=1) >= 4
+    order = np.argsort(~valid, axis=1, kind="stable")[:, :4]
+    picked = np.take_along_axis(cands, order, axis=1)
+    choices = np.sort(np.concatenate([ans[:, None], picked], axis=1), axis=1)
+    keys = np.argmax(choices == ans[:, None], axis=1)
+    return choices, keys, ok
+
+
+def _recurrence_arrays(spec: RecurrenceSpec, env: Mapping[str, np.ndarray], size: int):
+    """``(names, m, c, x0)`` for ``recurrence.affine_states`` over a batch of parameter sets."""
+    names = list(spec.init)
+    ones = np.ones(size)
+
+    def column(text: str) -> np.ndarray:
+        return np.asarray(Expr(text)(**env), dtype=np.float64) * ones
+
+    x0 = np.stack([column(spec.init[n]) for n in names], axis=1)
+    c = np.stack([column(spec.delta.get(n, "0")) for n in names], axis=1)
+    m = np.zeros((size, len(names), len(names)))
+    for i, n in enumerate(names):
+        m[:, i, i] = column(spec.scale.get(n, "1"))
+    return names, m, c, x0
+
+
+def _solve_recurrence(spec: RecurrenceSpec, env: Mapping[str, np.ndarray], size: int) -> np.ndarray:
+    names, m, c, x0 = _recurrence_arrays(spec, env, size)
+    cond = linear_condition(spec.until, names)
+    if cond is None:
+        raise ValueError(f"recurrence condition must be linear: {spec.until!r}")
+    n = first_crossing_batch(m, c, x0, [float(w) for w in cond.weights], float(cond.bias), cond.op)
+    return n.astype(np.int64)
+
+
+def _sample(t: Template, size: int, rng: np.random.Generator):
+    """One vectorized draw: (env, choices, keys, mask of usable rows)."""
+    env = {name: rng.integers(lo, hi + 1, size=size, dtype=np.int64) for name, (lo, hi) in t.params.items()}
+    mask = np.ones(size, dtype=bool)
+    with np.errstate(all="ignore"):
+        for name, text in t.derived.items():
+            env[name] = np.asarray(Expr(text)(**env)) * np.ones(size, dtype=np.int64)
+        for text in t.constraints:
+            mask &= np.asarray(Expr(text)(**env), dtype=bool)
+        if t.recurrence is not None:
+            ans = _solve_recurrence(t.recurrence, env, size)
+        else:
+            ans = np.asarray(Expr(t.answer)(**env)) * np.ones(size, dtype=np.int64)
+        env_ans = {**env, "ans": ans}
+        cands = np.stack(
+            [np.asarray(Expr(d)(**env_ans)) * np.ones(size, dtype=np.int64) for d in t.distractors]
+            + [ans + 1, ans - 1, ans + 2, ans * 2],
+            axis=1,
+        )
+    mask &= ans > 0
+    if not np.issubdtype(cands.dtype, np.integer):
+        cands = np.round(cands).astype(np.int64)
+    choices, keys, ok = _pick_choices(ans.astype(np.int64), cands.astype(np.int64))
+    return env, choices, keys, mask & ok
+
+
+REASON_DEGENERATE = "degenerate parameters"
+REASON_REPEATED = "repeated parameters"
+
+
+def _reject(span, mask: np.ndarray, checked: TemplateCheck) -> None:
+    """Count a sampled round's rejections by reason: degenerate rows first, then checker failures."""
+    count = checked.match_count[mask]
+    span.reject(REASON_DEGENERATE, int(mask.size - count.size))
+    span.reject(REASON_NO_MATCH, int(np.count_nonzero(count == 0)))
+    span.reject(REASON_MULTIPLE, int(np.count_nonzero(count > 1)))
+    span.reject(REASON_KEY_WRONG, int(np.count_nonzero((count == 1) & ~checked.ok[mask])))
+
+
+def generate(template: Template, n: int, seed: Optional[int] = None, max_rounds: int = 20,
+             recorder: Optional[Recorder] = None) -> Batch:
+    """Up to ``n`` verified, de-duplicated variants of ``template``.
+
+    ``recorder`` (``corpus.instrument``) gets one "generate" span per sampled round.
+    """
+    rec = recorder or NULL
+    rng = np.random.default_rng(seed)
+    names = list(template.params)
+    kept_params: list[dict[str, np.ndarray]] = []
+    kept_choices, kept_keys = [], []
+    seen: set[bytes] = set()
+    total = 0
+    for _ in range(max_rounds):
+        if total >= n:
+            break
+        with rec.stage("generate") as span:
+            env, choices, keys, mask = _sample(template, max(64, 2 * (n - total)), rng)
+            checked = check_template(template.answer, env, choices, keys)
+            if recorder is not None:
+                _reject(span, mask, checked)
+            rows = np.flatnonzero(mask & checked.ok)
+            params = np.stack([env[k][rows] for k in names], axis=1)
+            _, first = np.unique(params, axis=0, return_index=True)
+            unseen = [i for i in sorted(first) if params[i].tobytes() not in seen]
+            span.reject(REASON_REPEATED, len(rows) - len(unseen))
+            fresh = unseen[: n - total]
+            seen.update(params[i].tobytes() for i in fresh)
+            rows = rows[fresh]
+            kept_params.append({k: v[rows] for k, v in env.items()})
+            kept_choices.append(choices[rows])
+            kept_keys.append(keys[rows])
+            total += len(rows)
+            span.count(len(rows))
+    keys_all = list(kept_params[0]) if kept_params else names
+    return Batch(
+        template,
+        {k: np.concatenate([p[k] for p in kept_params]) for k in keys_all} if kept_params else {},
+        np.concatenate(kept_choices) if kept_choices else np.zeros((0, 5), np.int64),
+        np.concatenate(kept_keys) if kept_keys else np.zeros(0, np.int64),
+    )
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Generate verified PS variants as JSONL.")
+    ap.add_argument("template", choices=sorted(TEMPLATES))
+    ap.add_argument("count", type=int)
+    ap.add_argument("--seed", type=int, default=None)
+    args = ap.parse_args(argv)
+    for q in generate(TEMPLATES[args.template], args.count, args.seed).questions():
+        sys.stdout.write(json.dumps(q.to_dict(), ensure_ascii=False) + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,71 @@
+import io
+
+import numpy as np
+
+from corpus.analytics import BUDGET_MS, TOPIC_SLOTS, StrengthsStore, read_events
+
+
+def test_attempt_rows_fold_into_topic_and_subtopic_slots(tmp_path):
+    store = StrengthsStore()
+    events = [
+        {"userId": "u1", "questionId": f"r{i}", "isCorrect": i < 5, "timeMs": 60_000, "userAnswer": "A",
+         "topic": "ratios", "subtopic": "Ratio with a total"}
+        for i in range(6)
+    ] + [
+        {"userId": "u1", "questionId": f"g{i}", "isCorrect": i < 1, "timeMs": 10_000 if i else 150_000,
+         "userAnswer": "" if i == 5 else "B", "topic": "Geometry"}
+        for i in range(6)
+    ]
+    assert store.add(events, chunk=5) == 12
+    s = store.summary("u1")
+    assert BUDGET_MS == 120_000 and s["budgetSeconds"] == 120
+    assert s["topics"]["Ratios"]["accuracy"] == 5 / 6 and s["topics"]["Ratios"]["avgSeconds"] == 60
+    assert s["subtopics"]["ratio with a total"]["attempts"] == 6
+    geo = s["topics"]["Geometry"]
+    assert (geo["rushed"], geo["skipped"], geo["overBudgetRate"]) == (5, 1, 1 / 6)
+    assert (s["strengths"], s["weaknesses"]) == (["Ratios"], ["Geometry"])
+
+    store.save(tmp_path / "snap.npy")
+    loaded = StrengthsStore.load(tmp_path / "snap.npy")
+    assert isinstance(loaded.counts, np.memmap) and (loaded.row("u1") == store.row("u1")).all()
+    loaded.add([{"userId": "u1", "isCorrect": True, "topic": "Ratios"}])
+    assert loaded.summary("u1")["topics"]["Ratios"]["attempts"] == 7
+    assert (store.row("u2") == 0).all()
+
+
+def test_log_events_and_export_csv_shapes():
+    store = StrengthsStore()
+    log = [
+        {"questionId": "q1", "status": "correct", "phase": "start"},
+        {"questionId": "q1", "status": "correct", "phase": "success"},
+        {"questionId": "q2", "status": "incorrect", "phase": "error", "error": "offline"},
+    ]
+    store.add(log, user="u1", taxonomy={"q1": ("Probability", None), "q2": ("Probability", None)})
+    prob = store.summary("u1")["topics"]["Probability"]
+    assert (prob["attempts"], prob["accuracy"], prob["submitErrors"]) == (1, 1.0, 1)
+
+    csv_text = (
+        '"timestamp","exam","section","topic","concept","difficulty","correct","answer","user_answer"\n'
+        '"2024-01-01T00:00:00.000Z","GMAT","quant","Probability","","600","false","B","C"\n'
+    )
+    store.add(read_events(io.StringIO(csv_text)), user="u1")
+    prob = store.summary("u1")["topics"]["Probability"]
+    assert (prob["attempts"], prob["accuracy"], prob["avgSeconds"]) == (2, 0.5, None)
+
+
+def test_subtopic_slots_grow_past_the_initial_table(tmp_path):
+    store = StrengthsStore.from_taxonomy({"q0": ("Ratios", "Sub 0"), "q1": ("Ratios", None)})
+    assert store.subtopics == ["sub 0"] and store.slots == TOPIC_SLOTS + 1
+    events = [{"userId": "u1", "isCorrect": True, "topic": "Ratios", "subtopic": f"Sub {i}"} for i in range(100)]
+    store.add(events)
+    store.add([{"userId": "u1", "isCorrect": False, "topic": "Ratios", "subtopic": "Sub 99"}])
+    s = store.summary("u1")
+    assert len(s["subtopics"]) == 100 and "other" not in s["subtopics"]
+    assert s["subtopics"]["sub 99"]["attempts"] == 2
+
+    store.save(tmp_path / "snap.npy")
+    assert np.load(tmp_path / "snap.npy").shape[1] == TOPIC_SLOTS + 100
+    loaded = StrengthsStore.load(tmp_path / "snap.npy")
+    loaded.add([{"userId": "u1", "isCorrect": True, "topic": "Ratios", "subtopic": "Sub 100"}])
+    assert loaded.summary("u1")["subtopics"]["sub 100"]["attempts"] == 1
+    assert StrengthsStore.load(tmp_path / "snap.npy").summary("u1") == s  # copy-on-write: file untouched
@@ -0,0 +1,25 @@
+from corpus.bank import BankReader, build
+from corpus.parse import DEFAULT_CORPUS, iter_questions
+
+
+def test_bank_round_trips_through_mmap(tmp_path):
+    path = tmp_path / "bank.bin"
+    assert build(DEFAULT_CORPUS, path) == 6
+
+    originals = {}
+    for q in iter_questions():
+        originals.setdefault(q.id, q)
+    with BankReader(path) as bank:
+        assert len(bank) == 6
+        for i in range(len(bank)):
+            q = bank.question(i)
+            assert q == originals[q.id]
+            assert bank.index_of(q.id) == i
+        assert bank.get("missing") is None
+
+        units = bank.get(next(iter(originals)))
+        assert units.answer == "D"
+        nums = bank.bucket("Number Properties & Arithmetic", "medium")
+        assert [bank.question(int(i)).id for i in nums] == [units.id]
+        # Sample questions have no concept yet and land in the unassigned bucket.
+        assert len(bank.bucket(None, "medium")) == 2
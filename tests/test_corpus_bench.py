@@ -0,0 +1,26 @@
+from corpus.bench import bench_scale, compare, synthetic_lines
+from corpus.parse import Question, iter_records
+
+
+def test_synthetic_corpus_scales_block_copies_deterministically():
+    counts = [sum(isinstance(r, Question) for r in iter_records(synthetic_lines(s))) for s in (1, 5)]
+    assert counts == [8, 40]
+    assert list(synthetic_lines(3, seed=7)) == list(synthetic_lines(3, seed=7))
+
+
+def test_bench_scale_reports_every_stage(tmp_path):
+    r = bench_scale(3, tmp_path, verify_limit=5)
+    assert r["questions"] == 24 and sum(r["dedup_kinds"].values()) == 24
+    assert r["dedup_kinds"]["exact"] >= 2  # the fixture repeats two blocks itself
+    assert 0 < r["verified"] <= 5 and r["verify_failures"] == 0
+    assert r["parse_questions_per_s"] > 0 and r["peak_rss_mb"] > 0
+
+
+def test_compare_flags_only_regressions_past_tolerance():
+    base = {"scales": {"10": {"parse_mb_per_s": 10.0, "peak_rss_mb": 50.0}},
+            "generate": {"age": {"generate_items_per_s": 1000.0}}}
+    now = {"scales": {"10": {"parse_mb_per_s": 8.0, "peak_rss_mb": 70.0}},
+           "generate": {"age": {"generate_items_per_s": 500.0}, "new": {"generate_items_per_s": 1.0}}}
+    problems = compare(now, base, tolerance=0.3)
+    assert [p.split(":")[0] for p in problems] == ["generate.age.generate_items_per_s", "scales.10.peak_rss_mb"]
+    assert compare(base, base) == []
@@ -0,0 +1,47 @@
+import numpy as np
+
+from corpus.checker import (
+    REASON_MULTIPLE,
+    PSItem,
+    PSSolution,
+    check,
+    check_corpus,
+    check_template,
+    parse_choice,
+)
+from corpus.sufficiency import REASON_KEY_WRONG
+
+
+def test_corpus_items_check_out_and_flag_the_power_typo():
+    results = {c.id: c for c in check_corpus()}
+    assert [c.answer for c in results.values()] == ["D", "A", "D", "D"]
+    assert all(c.ok for c in results.values())
+    units = results["GMAT_corpus_ps_4ed4d7b058af841f"]
+    assert units.warnings == ("explanation mentions 4^12", "explanation mentions 4^11")
+
+
+def test_parse_choice_handles_currency_and_fractions():
+    assert parse_choice("$1,350") == 1350
+    assert parse_choice("3/4") * 4 == 3
+    assert parse_choice("–2") == -2
+    assert parse_choice("x < 3") is None
+
+
+def test_wrong_key_and_duplicate_choices_are_flagged():
+    ages = PSSolution("H + 3", ("H = P + 30", "H + 10 = 3(P + 10)"))
+    assert check(PSItem("a", ("38", "33", "28", "24", "18"), ages, key=1)).reason == REASON_KEY_WRONG
+    assert check(PSItem("b", ("38", "38", "28", "24", "18"), ages)).reason == REASON_MULTIPLE
+
+
+def test_template_check_is_vectorized():
+    first = np.array([5, 4])
+    revise = np.array([3, 2])
+    choices = np.array([[430, 620, 650, 680, 770], [400, 490, 500, 520, 600]])
+    result = check_template(
+        "100 * first + 40 * revise + 10 * 2 * revise",
+        {"first": first, "revise": revise},
+        choices,
+        keys=np.array([3, 0]),
+    )
+    assert result.values.tolist() == [680, 520]
+    assert result.ok.tolist() == [True, False]
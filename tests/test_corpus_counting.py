@@ -0,0 +1,63 @@
+import math
+from fractions import Fraction
+
+import numpy as np
+import pytest
+
+from corpus import counting
+from corpus.checker import PSSolution, solve
+from corpus.expr import Expr
+
+
+def test_tables_match_math_comb_and_fall_back_to_exact_ints():
+    n = np.arange(0, 80).repeat(5)
+    r = np.tile(np.array([-1, 0, 3, 33, 90]), 80)
+    got = counting.comb(n, r)
+    assert [int(v) for v in got] == [math.comb(a, b) if 0 <= b else 0 for a, b in zip(n.tolist(), r.tolist())]
+    assert counting.comb(np.array([66, 10]), 33).dtype == np.int64
+    assert counting.perm(np.array([10, 25]), 3).tolist() == [720, 13800]
+    assert counting.factorials(np.array([0, 5, 21])).tolist() == [1, 120, math.factorial(21)]
+    assert counting.binomial_row(4) == (1, 4, 6, 4, 1)
+    assert counting.multinomial(1, 4, 4, 2) == 34650 and counting.circular(5) == 24
+
+
+def test_inclusion_exclusion_for_two_and_three_sets():
+    assert counting.solve_venn2(total=50, a=30, b=25, neither=5).item() == 10
+    assert counting.solve_venn2(total=[50, 60], a=30, both=[10, 12], neither=5).tolist() == [25, 37]
+    assert counting.venn2_valid([50, 50], 30, 25, [10, 40], 5).tolist() == [True, False]
+    assert counting.union3(20, 25, 30, 8, 7, 6, 3).item() == 57
+    assert counting.union3_exactly(20, 25, 30, 12, 3).item() == 57
+    assert counting.venn3_regions(20, 25, 30, 8, 7, 6, 3)["a_only"].item() == 8
+    with pytest.raises(ValueError):
+        counting.solve_venn2(total=50, a=30)
+
+
+def test_rational_probability_scalar_and_batched():
+    assert counting.hypergeom(10, 4, 3, 1) == Fraction(1, 2)
+    assert counting.at_least_one(10, 4, 3) == Fraction(5, 6)
+    assert counting.binomial_pmf(3, 2, "1/2") == Fraction(3, 8)
+    num, den = counting.hypergeom_batch(np.array([10, 12]), 4, 3, 1)
+    assert [Fraction(a, b) for a, b in zip(num, den)] == [counting.hypergeom(10, 4, 3, 1), counting.hypergeom(12, 4, 3, 1)]
+
+
+def test_counting_functions_in_expressions():
+    assert solve(PSSolution(answer="comb(n, 2) / comb(10, 2)", equations=("n = 10 - 6",))) == Fraction(2, 15)
+    assert Expr("perm(n, 2) + factorial(3)")(n=np.array([5, 6])).tolist() == [26, 36]
+    with pytest.raises(ValueError):
+        Expr("comb(n, 2)").exact({"n": Fraction(5, 2)})
+
+
+def test_hypergeom_batch_stays_exact_past_int64():
+    num, den = counting.hypergeom_batch(np.array([120, 100]), 60, 60, 30)
+    got = [Fraction(int(a), int(b)) for a, b in zip(num, den)]
+    assert got == [counting.hypergeom(120, 60, 60, 30), counting.hypergeom(100, 60, 60, 30)]
+    assert got[1] == Fraction(63355465127180512, 8687426853505466745)
+
+
+def test_vector_counting_masks_out_of_domain_rows():
+    from corpus.sufficiency import DSItem, verify
+
+    vals = Expr("comb(n, 2)")(n=np.array([-3.0, 2.5, 5.0]))
+    assert np.isnan(vals[:2]).all() and vals[2] == 10
+    assert np.isnan(Expr("factorial(n)")(n=np.array([-1]))).all()
+    assert verify(DSItem("comb(n, 2) = 10", ("n > 3", "n < 6"), {"n": "integer"})).answer == "E"
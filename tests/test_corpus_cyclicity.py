@@ -0,0 +1,20 @@
+import numpy as np
+
+from corpus.cyclicity import cycle, last_digits, pow_mod, units_digit
+
+
+def test_units_digit_matches_corpus_cycle():
+    assert cycle(3) == (3, 9, 7, 1)
+    assert int(units_digit(3, 11)) == 7
+    assert units_digit([3, 7, 0, 10], [4, 0, 0, 5]).tolist() == [1, 1, 1, 0]
+
+
+def test_batched_powers_agree_with_builtin_pow():
+    rng = np.random.default_rng(7)
+    a = rng.integers(0, 10**6, 500)
+    b = rng.integers(0, 10**12, 500)
+    expected_mod = [pow(int(x), int(y), 9973) for x, y in zip(a, b)]
+    expected_last3 = [pow(int(x), int(y), 1000) for x, y in zip(a, b)]
+    assert pow_mod(a, b, 9973).tolist() == expected_mod
+    assert last_digits(a, b, 3).tolist() == expected_last3
+    assert units_digit(a, b).tolist() == [pow(int(x), int(y), 10) for x, y in zip(a, b)]
@@ -0,0 +1,34 @@
+from corpus.dedupe import DedupIndex, normalize_stem, unique_questions
+from corpus.parse import iter_questions
+
+
+def test_normalize_stem_folds_dashes_currency_and_spacing():
+    assert normalize_stem("Is  x^2 – x  > 0?") == "is x^2 - x > 0"
+    assert normalize_stem("It costs 1,350 dollars.") == normalize_stem("It costs $ 1350")
+
+
+def test_corpus_repeats_are_dropped_and_index_round_trips(tmp_path):
+    index = DedupIndex()
+    questions = list(iter_questions())
+    unique = list(unique_questions(questions, index))
+    assert len(questions) == 8
+    assert len(unique) == 6
+
+    path = tmp_path / "dedup.npz"
+    index.save(path)
+    reloaded = DedupIndex.load(path)
+    assert len(reloaded) == 6
+    assert reloaded.check(questions[0].stem).status == "exact"
+
+
+def test_near_duplicate_is_caught_by_lsh():
+    index = DedupIndex()
+    stem = (
+        "Harold is 30 years older than Paloma. If in 10 years Harold will be 3 times "
+        "as old as Paloma, how old will Harold be in 3 years?"
+    )
+    index.add("orig", stem)
+    result = index.add("copy", stem.replace("how old will Harold", "how old would Harold"))
+    assert result.status == "near"
+    assert result.match_id == "orig"
+    assert index.add("other", "What is the units digit of 7^23?").status == "new"
@@ -0,0 +1,48 @@
+import pytest
+
+from corpus.checker import PSSolution
+from corpus.explain import ExplanationStore, explain_batch, explain_corpus, explain_ps, substitute
+from corpus.parse import iter_questions
+from corpus.variants import TEMPLATES, generate
+
+
+def test_corpus_explanations_follow_the_worked_example_pattern():
+    by_id = {e.id: e for e in explain_corpus()}
+    harold = by_id["GMAT_corpus_ps_8bec4289c70c98b2"]
+    assert harold.text.startswith("The major topic tested here is general word problems, and the subtopic is age problems.")
+    assert "H = Harold’s age today" in harold.text and "Solving, we have H = 35 and P = 5." in harold.text
+    assert harold.text.endswith("Thus, H + 3 = 35 + 3 = 38.\n\nAnswer: A")
+    fleet = by_id["GMAT_corpus_ps_09d0ece84c0f2265"].text
+    assert "After 8 years, A = 36 and B = 32" in fleet and "After 9 years, A = 33 and B = 36" in fleet
+    ds = by_id["GMAT_corpus_ds_1d414e91fe1e1e27"]
+    assert "so statement one is not sufficient" in ds.text and ds.answer == "B"
+    assert by_id["GMAT_corpus_ds_f1115d0d547cf765"].text.count("This gives 2x = 10") == 2
+
+
+def test_unverified_solution_is_not_rendered():
+    q = next(q for q in iter_questions() if q.id == "GMAT_corpus_ps_8bec4289c70c98b2")
+    with pytest.raises(ValueError):
+        explain_ps(q, PSSolution(answer="H + 4", equations=("H = P + 30", "H + 10 = 3(P + 10)")))
+
+
+def test_batch_names_the_slip_behind_each_distractor():
+    assert substitute("3P + k", {"P": 5, "k": -2}) == "3(5) + (-2)"
+    for name in TEMPLATES:
+        batch = generate(TEMPLATES[name], 50, seed=4)
+        explanations = explain_batch(batch)
+        assert len(explanations) == 50
+        for e, key in zip(explanations, batch.keys):
+            assert e.text.endswith(f"Answer: {'ABCDE'[key]}") and e.notes[key] == ""
+    age = explain_batch(generate(TEMPLATES["age"], 20, seed=1))
+    assert any("comes from H rather than H + " in n for e in age for n in e.notes)
+
+
+def test_store_serves_each_choice_after_a_round_trip(tmp_path):
+    store = ExplanationStore(explain_corpus())
+    store.save(tmp_path / "explanations.jsonl")
+    loaded = ExplanationStore.load(tmp_path / "explanations.jsonl")
+    assert len(loaded) == len(store) == 6
+    qid = "GMAT_corpus_ps_8bec4289c70c98b2"
+    assert loaded.get(qid, 0) == loaded.get(qid)
+    assert loaded.get(qid, 2).endswith("Choice C (28) is not H + 3 = 35 + 3 = 38.")
+    assert loaded.get("missing") is None
@@ -0,0 +1,49 @@
+import json
+
+from corpus.ingest import ingest, split_blocks
+from corpus.parse import DEFAULT_CORPUS, iter_questions
+
+
+def _copy(tmp_path):
+    path = tmp_path / "corpus.py"
+    path.write_text(DEFAULT_CORPUS.read_text(encoding="utf-8"), encoding="utf-8")
+    return path
+
+
+def test_blocks_parse_to_the_same_questions_as_the_whole_file():
+    from corpus.ingest import parse_block
+
+    with open(DEFAULT_CORPUS, encoding="utf-8") as fh:
+        blocks = list(split_blocks(fh))
+    assert "GMAT Problem Solving, Sample Question #1 [2]" in [b.key for b in blocks]
+    assert [q for b in blocks for q in parse_block(b)] == list(iter_questions())
+
+
+def test_rerun_only_touches_changed_blocks(tmp_path):
+    path, state = _copy(tmp_path), tmp_path / "state"
+    first = ingest(path, state)
+    assert first.verified == 6 and not first.failures
+    assert ingest(path, state).verified == 0
+
+    text = path.read_text(encoding="utf-8")
+    path.write_text(text.replace("30 years older than Paloma", "31 years older than Paloma"), encoding="utf-8")
+    r = ingest(path, state)
+    assert r.changed == ("Problem Solving Question 2",) and r.verified == 0
+    (entry,) = r.journal
+    assert entry["deleted"] == ["GMAT_corpus_ps_8bec4289c70c98b2"]
+    assert len(entry["upserted"]) == 1 and entry["concepts"] == ["Word Problems & Rates"]
+
+    published = [json.loads(line)["id"] for line in (state / "questions.jsonl").open()]
+    assert entry["upserted"][0] in published and entry["deleted"][0] not in published
+    seqs = [json.loads(line)["seq"] for line in (state / "journal.jsonl").open()]
+    assert seqs == list(range(1, len(seqs) + 1))
+
+
+def test_removing_a_repeated_block_keeps_its_questions_published(tmp_path):
+    path, state = _copy(tmp_path), tmp_path / "state"
+    ingest(path, state)
+    lines = path.read_text(encoding="utf-8").splitlines(keepends=True)
+    path.write_text("".join(lines[:495]), encoding="utf-8")
+    r = ingest(path, state)
+    assert "GMAT Problem Solving, Sample Question #2 [2]" in r.removed
+    assert all(not e["deleted"] for e in r.journal)
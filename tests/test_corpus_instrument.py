@@ -0,0 +1,97 @@
+import json
+import pstats
+import tracemalloc
+
+import pytest
+
+from corpus.checker import REASON_MULTIPLE
+from corpus.dedupe import DedupIndex, unique_questions
+from corpus.ingest import ingest, main
+from corpus.instrument import NULL, Recorder, profilers
+from corpus.parse import DEFAULT_CORPUS, iter_questions
+from corpus.variants import REASON_DEGENERATE, TEMPLATES, generate
+
+
+def test_profilers_parse_the_environment_switch():
+    assert profilers(None) == profilers("") == profilers("0") == frozenset()
+    assert profilers("all") == profilers("1") == {"cprofile", "tracemalloc"}
+    assert profilers(" cProfile ") == {"cprofile"}
+    with pytest.raises(ValueError):
+        profilers("perf")
+
+
+def test_spans_time_count_and_reject():
+    rec = Recorder(profile="")
+    for _ in range(3):
+        with rec.stage("verify") as span:
+            span.count(2)
+            span.reject(REASON_MULTIPLE)
+    rec.reject("verify", "keyed answer wrong", 0)
+    stats = rec.stages["verify"]
+    assert (stats.calls, stats.items, stats.rejected) == (3, 6, {REASON_MULTIPLE: 3})
+    assert stats.seconds > 0
+    with NULL.stage("verify") as span:
+        span.count()
+        span.reject(REASON_MULTIPLE)
+
+
+def test_ingest_reports_every_stage(tmp_path):
+    rec = Recorder(profile="")
+    r = ingest(DEFAULT_CORPUS, tmp_path / "state", recorder=rec)
+    assert list(rec.stages) == ["parse", "verify", "normalize", "publish"]
+    assert rec.stages["parse"].items == len(list(iter_questions()))
+    assert rec.stages["verify"].items == r.verified == 6
+    assert rec.stages["publish"].items == len({u for e in r.journal for u in e["upserted"]})
+
+    text = rec.prometheus(run="test")
+    assert "# TYPE corpus_stage_seconds_total counter" in text
+    assert 'corpus_stage_items_total{stage="verify",run="test"} 6' in text
+    assert "corpus_stage_peak_bytes" not in text
+
+
+def test_dedup_and_generate_count_rejections():
+    rec = Recorder(profile="")
+    questions = list(iter_questions())
+    kept = list(unique_questions(questions + questions[:2], DedupIndex(), rec))
+    assert len(kept) <= len(questions)
+    assert (rec.stages["dedup"].calls, rec.stages["dedup"].items) == (1, len(questions) + 2)
+    assert sum(rec.stages["dedup"].rejected.values()) == len(questions) + 2 - len(kept)
+
+    batch = generate(TEMPLATES["age"], 200, seed=1, recorder=rec)
+    stats = rec.stages["generate"]
+    assert stats.items == len(batch) == 200 and stats.calls >= 1
+    assert stats.rejected.get(REASON_DEGENERATE, 0) > 0
+
+
+def test_prometheus_escapes_labels():
+    rec = Recorder(profile="")
+    rec.reject("verify", 'bad "quote"\\')
+    assert 'reason="bad \\"quote\\"\\\\"' in rec.prometheus()
+
+
+def test_profiles_and_files(tmp_path, monkeypatch):
+    monkeypatch.setenv("CORPUS_PROFILE", "all")
+    was_tracing = tracemalloc.is_tracing()
+    rec = Recorder()
+    with rec.stage("generate"):
+        with rec.stage("verify"):  # nested: timed, not profiled
+            pass
+        generate(TEMPLATES["age"], 50, seed=0)
+    rec.write(tmp_path, run="a")
+    rec.write(tmp_path, run="b")
+    rec.close()
+    assert tracemalloc.is_tracing() == was_tracing
+
+    assert rec.stages["generate"].peak_bytes > 0 and rec.stages["verify"].peak_bytes == 0
+    assert "corpus_stage_peak_bytes" in (tmp_path / "metrics.prom").read_text()
+    lines = [json.loads(x) for x in (tmp_path / "metrics.jsonl").read_text().splitlines()]
+    assert [(x["run"], x["stage"]) for x in lines] == [("a", "verify"), ("a", "generate"),
+                                                      ("b", "verify"), ("b", "generate")]
+    assert pstats.Stats(str(tmp_path / "generate.prof")).total_calls > 0
+    assert not (tmp_path / "verify.prof").exists()
+
+
+def test_cli_writes_metrics(tmp_path, monkeypatch):
+    monkeypatch.delenv("CORPUS_PROFILE", raising=False)
+    assert main([str(DEFAULT_CORPUS), "--state", str(tmp_path / "state"), "--metrics", str(tmp_path / "m")]) == 0
+    assert 'command="ingest"' in (tmp_path / "m" / "metrics.prom").read_text()
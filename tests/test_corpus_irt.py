@@ -0,0 +1,53 @@
+import numpy as np
+
+from corpus.irt import AbilityTracker, ItemParams, ItemSelector, calibrate, encode_attempts
+
+
+def _simulate(n_users=2000, n_items=100, n=120_000, c=0.0, seed=0):
+    rng = np.random.default_rng(seed)
+    theta = rng.normal(size=n_users)
+    params = ItemParams(rng.lognormal(0, 0.25, n_items), rng.normal(size=n_items), np.full(n_items, c))
+    u, i = rng.integers(n_users, size=n), rng.integers(n_items, size=n)
+    return params, theta, u, i, rng.random(n) < params.prob(theta[u], i)
+
+
+def test_calibration_recovers_item_difficulty_and_ability():
+    params, theta, u, i, y = _simulate()
+    cal = calibrate(u, i, y, model="2pl", chunk=50_000)
+    assert np.corrcoef(cal.params.b, params.b)[0, 1] > 0.97
+    assert np.corrcoef(cal.theta, theta)[0, 1] > 0.8
+    assert not cal.params.c.any()
+
+    params3, _, u3, i3, y3 = _simulate(c=0.2, seed=1)
+    cal3 = calibrate(u3, i3, y3, model="3pl")
+    assert np.corrcoef(cal3.params.b, params3.b)[0, 1] > 0.9
+    assert 0.1 < cal3.params.c.mean() < 0.3
+
+
+def test_encode_attempts_uses_attempt_rows():
+    u, i, y, users, items = encode_attempts([
+        {"userId": "u1", "questionId": "q1", "isCorrect": True},
+        {"userId": "u2", "questionId": "q1", "isCorrect": False},
+        {"userId": "u1", "questionId": "q2", "isCorrect": False},
+    ])
+    assert u.tolist() == [0, 1, 0] and i.tolist() == [0, 0, 1] and y.tolist() == [True, False, False]
+    assert (users, items) == (["u1", "u2"], ["q1", "q2"])
+
+
+def test_online_ability_and_max_information_selection():
+    b = np.linspace(-3, 3, 61)
+    params = ItemParams(np.ones(61), b, np.zeros(61))
+    tracker = AbilityTracker(params)
+    for item in (30, 35, 40, 45):
+        tracker.update("u1", item, True, topic="Ratios")
+    mean, se = tracker.ability("u1", "Ratios")
+    assert mean > 0.5 and se < 1
+    assert tracker.ability("u1")[0] == mean and tracker.topics("u1")["Ratios"][2] == 4
+    tracker.update("u1", 0, False, topic="Geometry")
+    assert tracker.ability("u1", "Geometry")[0] < 0
+
+    selector = ItemSelector(params, groups=np.arange(61) % 2, k=4)
+    assert selector.select(1.0, group=0) == 40
+    assert selector.select(1.0, group=0, exclude={40, 38, 42}) in (36, 44)
+    assert selector.select(1.0, group=0, exclude=set(range(0, 61, 2)) - {0}) == 0
+    assert selector.select_many([-3.0, 0.0], group=1).tolist() == [1, 29]
@@ -0,0 +1,25 @@
+from corpus.notation import Normalizer, normalize
+
+
+def test_corpus_notation_to_tex_and_search_form():
+    n = normalize("What is the units digit of 3^11?")
+    assert n.tex == "What is the units digit of \\(3^{11}\\)?"
+    assert (n.search, n.math) == ("what is the units digit of 3^11", ("3^11",))
+    assert normalize("x^2 – x – 12 = 0").tex == "\\(x^{2} - x - 12 = 0\\)"
+    assert normalize("H + 10 = 3(P + 10)").math == ("h + 10 = 3(p + 10)",)
+    assert normalize("is 2x : 5x : 7x").tex == "is \\(2x : 5x : 7x\\)"
+    assert normalize("sqrt(x+1) ≤ 3").tex == "\\(\\sqrt{x + 1} \\leq 3\\)"
+    money = normalize("costs $1,350 in total.")
+    assert (money.tex, money.search) == ("costs \\$1,350 in total.", "costs 1350 in total")
+    prose = normalize("Note: type A planes – mostly")
+    assert prose.math == () and prose.tex == "Note: type A planes – mostly"
+
+
+def test_batch_matches_single_calls_and_cache_is_bounded():
+    texts = ["2^(n+1) × 3", "A < 0.5(A + B)", "2^(n+1) × 3", "25% of 40"]
+    single = [Normalizer()(t) for t in texts]
+    cache = Normalizer(maxsize=2)
+    assert cache.batch(texts) == single
+    assert len(cache) == 2 and cache.misses == 3
+    cache.batch(texts[-1:])
+    assert cache.hits == 1
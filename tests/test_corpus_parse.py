@@ -0,0 +1,44 @@
+from corpus.parse import DS_STANDARD_CHOICES, Question, TopicList, iter_records, parse_file
+from corpus.topics import MAJOR_TOPICS
+
+
+def test_parses_topics_and_questions_from_corpus():
+    records = list(parse_file())
+    topic_lists = [r for r in records if isinstance(r, TopicList)]
+    questions = [r for r in records if isinstance(r, Question)]
+
+    assert topic_lists[0].topics == MAJOR_TOPICS
+    assert [q.kind for q in questions] == ["ps", "ps", "ds", "ds", "ps", "ps", "ps", "ps"]
+
+    units = questions[0]
+    assert units.stem == "What is the units digit of 3^11?"
+    assert units.choices == ("1", "3", "6", "7", "9")
+    assert units.answer == "D"
+    assert units.topic == "Number Properties"
+    assert units.subtopic == "units digit patterns"
+    assert units.concept == "Number Properties & Arithmetic"
+    assert units.explanation.startswith("The “major” topic here is number properties")
+
+    stamps, yes_no = questions[2], questions[3]
+    assert stamps.ds_type == "value" and stamps.answer == "D"
+    assert stamps.concept == "Data Sufficiency — Applications"
+    assert yes_no.statements == ("x > 0", "x > 1")
+    assert yes_no.ds_type == "yes_no" and yes_no.answer == "B"
+
+    # Sample questions carry no solution or key; repeated blocks share an id.
+    assert questions[4].correct_index is None
+    assert questions[4].id == questions[6].id
+
+
+def test_ds_without_listed_choices_uses_standard_choices():
+    lines = [
+        "# Yes/No Data Sufficiency Question Example",
+        "# Is n odd?",
+        "# 1) n + 1 is even",
+        "# 2) n is prime",
+        "# Solution:",
+        "# Answer: A",
+    ]
+    (q,) = iter_records(lines)
+    assert q.choices == DS_STANDARD_CHOICES
+    assert q.to_dict()["correctIndex"] == 0
@@ -0,0 +1,41 @@
+from fractions import Fraction
+
+import numpy as np
+
+from corpus.recurrence import (
+    AffineRecurrence,
+    Recurrence,
+    first_crossing_batch,
+    linear_condition,
+    run_recurrence,
+)
+
+
+def test_corpus_fleet_item_fast_forwards_to_nine_years():
+    rec = Recurrence(init={"A": 60, "B": 0}, step={"A": "A - 3", "B": "B + 4"}, until="A < 0.5(A + B)")
+    final = run_recurrence(rec)
+    assert (final["n"], final["A"], final["B"]) == (9, 33, 36)
+
+
+def test_exact_state_uses_matrix_power():
+    growth = AffineRecurrence.from_steps({"P": "1.1P + 10"})
+    assert growth.state([100], 2) == [Fraction(142)]
+    assert AffineRecurrence.from_steps({"x": "x^2"}) is None
+
+
+def test_batch_crossing_matches_closed_form():
+    rng = np.random.default_rng(5)
+    a = rng.integers(30, 500, 2000)
+    r = rng.integers(1, 9, 2000)
+    g = rng.integers(1, 9, 2000)
+    cond = linear_condition("A < 0.5(A + B)", ["A", "B"])
+    n = first_crossing_batch(
+        np.broadcast_to(np.eye(2), (2000, 2, 2)),
+        np.stack([-r, g], axis=1),
+        np.stack([a, np.zeros_like(a)], axis=1),
+        [float(w) for w in cond.weights],
+        float(cond.bias),
+        cond.op,
+    )
+    assert (n == a // (r + g) + 1).all()
+
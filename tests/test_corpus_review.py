@@ -0,0 +1,80 @@
+import numpy as np
+import pytest
+
+from corpus.review import DAY, GRADUATE_DAYS, Scheduler, grade
+
+T0 = 1_700_000_000.0
+
+
+def test_sm2_intervals_lapses_and_graduation():
+    s = Scheduler()
+    assert s.miss("u1", "q1", T0) == T0 + DAY
+    assert s.due("u1", T0) == [] and s.due("u1", T0 + DAY) == ["q1"]
+
+    now = T0 + DAY
+    assert s.review("u1", "q1", 5, now) == now + DAY
+    assert s.review("u1", "q1", 5, now) == now + 6 * DAY
+    state = s.state("u1", "q1")
+    assert (state["reps"], state["ease"]) == (2, 2.7)
+    assert s.review("u1", "q1", 5, now) == pytest.approx(now + 6 * 2.7 * DAY)  # interval x previous ease
+
+    assert s.review("u1", "q1", 2, now) == now + DAY
+    state = s.state("u1", "q1")
+    assert (state["reps"], state["lapses"], state["interval"]) == (0, 1, 1.0)
+
+    while (due := s.review("u1", "q1", 5, now)) is not None:
+        assert due < now + GRADUATE_DAYS * DAY
+    assert s.state("u1", "q1")["due"] is None and len(s) == 0
+    assert s.due("u1", now + 1000 * DAY) == [] and s.next_due("u1") is None
+    assert s.review("u1", "q1", 5, now) is None and s.review("u1", "never", 5, now) is None
+
+
+def test_topic_and_subtopic_weights_scale_intervals():
+    s = Scheduler({"topic": {"geometry": 0.5}, "subtopic": {"Circles": 0.5}})
+    assert s.miss("u", "g", T0, topic="Geometry") == T0 + 0.5 * DAY
+    assert s.miss("u", "c", T0, topic="Geometry", subtopic=" circles ") == T0 + 0.25 * DAY
+    assert s.miss("u", "r", T0, topic="Ratios") == T0 + DAY
+    assert s.due("u", T0 + 0.6 * DAY) == ["c", "g"]
+
+
+def test_due_walks_in_due_order_and_skips_rescheduled_entries():
+    s = Scheduler()
+    rng = np.random.default_rng(0)
+    offsets = rng.permutation(200)
+    for i, off in enumerate(offsets):
+        s.miss("u", f"q{i}", T0 + off * 60)
+    for i in range(0, 200, 2):
+        s.review("u", f"q{i}", 4, T0 + DAY)  # pushes even items a day out; their old entries go stale
+    now = T0 + DAY + 200 * 60
+    odd = sorted((off, f"q{i}") for i, off in enumerate(offsets) if i % 2)
+    assert s.due("u", now, limit=500) == [q for _, q in odd]
+    assert s.due("u", now, limit=5) == [q for _, q in odd[:5]]
+    assert len(s._heaps[0]) <= 2 * len(s) + 32
+
+
+def test_due_many_and_event_folding(tmp_path):
+    s = Scheduler({"topic": {"Probability": 0.5}})
+    events = [
+        {"userId": "a", "questionId": "q1", "isCorrect": False, "timeMs": 90_000, "createdAt": T0},
+        {"userId": "a", "questionId": "q2", "isCorrect": True, "timeMs": 30_000, "createdAt": T0},
+        {"userId": "b", "questionId": "q1", "status": "incorrect", "phase": "success",
+         "createdAt": "2023-11-14T22:13:20Z"},
+        {"userId": "b", "questionId": "q3", "status": "incorrect", "phase": "start"},
+    ]
+    assert s.add(events, taxonomy={"q1": ("probability", None)}) == 2
+    assert s.state("a", "q2") is None
+    assert s.due_many(now=T0 + 0.5 * DAY) == {"a": ["q1"], "b": ["q1"]}
+    assert s.due_many(["b", "nobody"], now=T0) == {}
+
+    assert s.add([{"userId": "a", "questionId": "q1", "isCorrect": True, "timeMs": 30_000,
+                   "createdAt": T0 + DAY}]) == 1
+    assert s.state("a", "q1")["reps"] == 1
+    assert grade(True, 30_000) == 5 and grade(True, 200_000) == 3 and grade(False) == 1
+
+    s.save(tmp_path / "sched.npz")
+    loaded = Scheduler.load(tmp_path / "sched.npz")
+    for when in (T0, T0 + DAY, T0 + 2 * DAY):
+        assert loaded.due_many(now=when) == s.due_many(now=when)
+    assert loaded.state("a", "q1") == s.state("a", "q1")
+    loaded.miss("c", "q9", T0, topic="Probability")
+    assert loaded.due("c", T0 + 0.5 * DAY) == ["q9"]
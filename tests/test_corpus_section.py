@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+
+from corpus.parse import Question
+from corpus.section import SECTION, Blueprint, SectionAssembler
+from corpus.taxonomy import TaxonomyIndex
+from corpus.topics import MAJOR_TOPICS, concept_for
+
+
+def _bank(per_cell=3):
+    qs = []
+    for t in MAJOR_TOPICS:
+        for kind in ("ps", "ds"):
+            for d in ("easy", "medium", "hard"):
+                for i in range(per_cell):
+                    qs.append(Question(f"{t}_{kind}_{d}_{i}", kind, f"{t} {i}", (), None, "", t, None,
+                                       concept_for(t, kind), d))
+    return qs, TaxonomyIndex.build(qs)
+
+
+def test_blueprint_matches_the_corpus_section():
+    slots = SECTION.slots()
+    kinds = [k for k, _ in slots]
+    assert (len(slots), SECTION.minutes) == (31, 62)
+    assert kinds.count("ps") == 20 and kinds.count("ds") == 11
+    assert max(len(run) for run in "".join(k[0] for k in kinds).split("d")) <= 2
+    assert [d for _, d in slots] == sorted((d for _, d in slots), key=("easy", "medium", "hard").index)
+
+
+def test_form_meets_blueprint_and_skips_seen_items():
+    qs, ix = _bank()
+    assembler = SectionAssembler(ix, Blueprint(topics=MAJOR_TOPICS))
+    seen = np.arange(0, len(qs), 4)
+    form = assembler.assemble(seen, np.random.default_rng(1))
+    assert len(set(form.ids.tolist())) == 31 and not set(form.ids.tolist()) & set(seen.tolist())
+    assert set(form.topics) == set(MAJOR_TOPICS)
+    for i, k, d, t in zip(form.ids, form.kinds, form.difficulties, form.topics):
+        assert (qs[i].kind, qs[i].difficulty, qs[i].topic) == (k, d, t)
+
+
+def test_forms_are_disjoint_until_the_bank_runs_out():
+    _, ix = _bank(per_cell=1)
+    assembler = SectionAssembler(ix)
+    forms = assembler.assemble_many(2, rng=np.random.default_rng(0))
+    ids = np.concatenate([f.ids for f in forms])
+    assert len(np.unique(ids)) == 62
+    assert not assembler.feasible(ids)
+    with pytest.raises(ValueError):
+        assembler.assemble(ids)
@@ -0,0 +1,145 @@
+import asyncio
+import json
+
+import pytest
+
+from corpus.bank import write_bank
+from corpus.parse import iter_questions
+from corpus.serve import MemoryRedis, QuestionServer, ServedBank, handle, seen_key
+
+
+@pytest.fixture(scope="module")
+def bank():
+    return ServedBank.load()
+
+
+def test_bank_loads_verified_questions_once(bank, tmp_path):
+    assert 0 < len(bank) <= len(list(iter_questions()))
+    first = json.loads(bank.payloads[0])
+    assert first["id"] == bank.questions[0].id and "stemTex" in first
+    write_bank(bank.questions, tmp_path / "bank.bin")
+    assert [q.id for q in ServedBank.load(tmp_path / "bank.bin").questions] == [q.id for q in bank.questions]
+
+
+def test_prefetch_serves_from_memory_and_remembers_seen(bank):
+    async def run():
+        redis = MemoryRedis()
+        async with QuestionServer(bank, redis, depth=4, seed=0) as server:
+            ids = [json.loads(await server.next("u1"))["id"] for _ in range(len(bank))]
+            assert sorted(ids) == sorted(q.id for q in bank.questions)  # no repeats within a rotation
+            assert await redis.smembers(seen_key("u1")) == set(ids)
+            stats = server.stats()
+            assert stats["misses"] >= 1 and stats["hits"] >= 1 and stats["served"] == len(bank)
+
+            again = json.loads(await server.next("u1"))["id"]  # everything seen: the rotation restarts
+            assert again in ids and server.counters["resets"] == 1
+            assert await redis.smembers(seen_key("u1")) == set(ids)
+
+        # A fresh process picks the seen set up from Redis.
+        await redis.sadd(seen_key("u2"), *ids[:-1])
+        async with QuestionServer(bank, redis, depth=2, seed=1) as server:
+            assert json.loads(await server.next("u2"))["id"] == ids[-1]
+
+    asyncio.run(run())
+
+
+def test_rotation_reset_keeps_other_topics_seen(bank):
+    inequalities = next(q.id for q in bank.questions if q.topic == "Inequalities")
+
+    async def run():
+        redis = MemoryRedis()
+        await redis.sadd(seen_key("u3"), "served-by-the-typescript-route")
+        async with QuestionServer(bank, redis, depth=2, seed=0) as server:
+            assert json.loads(await server.next("u3", "Inequalities"))["id"] == inequalities
+            for _ in range(3):  # one Number Properties question: every call after the first resets
+                await server.next("u3", "Number Properties")
+            assert server.counters["resets"] >= 1
+            seen = await redis.smembers(seen_key("u3"))
+            assert {inequalities, "served-by-the-typescript-route"} <= seen
+
+    asyncio.run(run())
+
+
+def test_topic_sessions_and_unknown_topics(bank):
+    topic = bank.questions[0].topic
+
+    async def run():
+        async with QuestionServer(bank, depth=3, seed=0) as server:
+            got = json.loads(await server.next("u2", topic.lower()))
+            assert got["topic"] == topic
+            with pytest.raises(LookupError):
+                await server.next("u2", "Astrology")
+            assert len(server.sessions) == 2
+            assert server.evict_idle(now=float("inf")) == 2 and not server.sessions
+
+    asyncio.run(run())
+
+
+def test_backpressure_makes_misses_wait_and_defers_prefetch(bank):
+    async def run():
+        server = QuestionServer(bank, depth=2, workers=0, max_pending=1, seed=0)
+        await server.start()
+        a = asyncio.create_task(server.next("a"))
+        b = asyncio.create_task(server.next("b"))
+        for _ in range(5):
+            await asyncio.sleep(0)
+        # "a" fills the queue; "b" is marked pending but still waiting for room to enqueue.
+        assert server._requests.full() and server.sessions[("b", None, None)].pending
+        assert not a.done() and not b.done()
+
+        worker = asyncio.create_task(server._worker())
+        await asyncio.wait_for(asyncio.gather(a, b), 1)
+        # "a" dropped to its low-water mark while "b" held the only slot, so its prefetch was deferred.
+        assert server.counters["deferred"] >= 1 and server.counters["served"] == 2
+        worker.cancel()
+        await server.stop()
+        await asyncio.gather(worker, return_exceptions=True)
+
+    asyncio.run(run())
+
+
+def test_cancelled_miss_does_not_wedge_its_session(bank):
+    async def run():
+        server = QuestionServer(bank, depth=2, workers=0, max_pending=1, seed=0)
+        await server.start()
+        a = asyncio.create_task(server.next("a"))
+        await asyncio.sleep(0)
+        with pytest.raises(asyncio.TimeoutError):  # the queue is full: "b" is cancelled mid-put
+            await asyncio.wait_for(server.next("b"), 0.05)
+        assert not server.sessions[("b", None, None)].pending
+
+        worker = asyncio.create_task(server._worker())
+        await asyncio.wait_for(a, 1)
+        assert json.loads(await asyncio.wait_for(server.next("b"), 1))["id"] in bank.index
+        worker.cancel()
+        await server.stop()
+        await asyncio.gather(worker, return_exceptions=True)
+
+    asyncio.run(run())
+
+
+def test_http_keep_alive(bank):
+    async def run():
+        async with QuestionServer(bank, depth=2, seed=0) as server:
+            listener = await asyncio.start_server(lambda r, w: handle(server, r, w), "127.0.0.1", 0)
+            port = listener.sockets[0].getsockname()[1]
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+
+            async def get(path, close=False):
+                conn = "Connection: close\r\n" if close else ""
+                writer.write(f"GET {path} HTTP/1.1\r\nHost: x\r\n{conn}\r\n".encode())
+                head = (await reader.readuntil(b"\r\n\r\n")).decode()
+                length = int(head.split("Content-Length: ")[1].split("\r\n")[0])
+                return int(head.split(" ")[1]), json.loads(await reader.readexactly(length))
+
+            status, body = await get("/next?user=u9")
+            assert status == 200 and body["id"] in bank.index
+            assert (await get("/next"))[0] == 400
+            assert (await get("/health"))[1]["served"] == 1
+            assert (await get("/nope", close=True))[0] == 404
+            assert await reader.read() == b""
+            writer.close()
+            listener.close()
+            await listener.wait_closed()
+
+    asyncio.run(run())
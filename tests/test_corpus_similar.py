@@ -0,0 +1,40 @@
+import pytest
+
+from corpus.parse import iter_questions
+from corpus.similar import SimilarityIndex, math_features
+from corpus.variants import TEMPLATES, generate
+
+
+def _questions():
+    return [q for name in ("age", "ratio_total") for q in generate(TEMPLATES[name], 100, seed=5).questions()]
+
+
+def test_math_features_capture_operators_exponents_and_inequality_direction():
+    feats = math_features(["x^2 > x", "y <= 3 + z"])
+    assert {"#pow", "#pow:2", "#ineq:gt", "#ineq:strict", "#ineq:lt", "#ineq:loose", "#op:+"} <= set(feats)
+
+
+def test_neighbours_share_template_and_exclude_self():
+    qs = _questions()
+    ix = SimilarityIndex.build(qs)
+    by_id = {q.id: q for q in qs}
+    for q in qs[::40]:
+        hits = ix.similar(q.id, 5)
+        assert len(hits) == 5 and q.id not in [h for h, _ in hits]
+        assert all(by_id[h].subtopic == q.subtopic for h, _ in hits)
+        assert [s for _, s in hits] == sorted((s for _, s in hits), reverse=True)
+
+
+def test_incremental_add_and_round_trip(tmp_path):
+    qs = _questions()
+    full = SimilarityIndex.build(qs)
+    ix = SimilarityIndex.build(qs[:150], merge_at=1000)
+    assert ix.add_many(qs[150:] + qs[:3]) == 50 and ix._n_main == 150
+    for q in qs[::25]:
+        got, want = ix.similar(q.id, 5), full.similar(q.id, 5)
+        assert [s for _, s in got] == pytest.approx([s for _, s in want])
+    ix.save(tmp_path / "similar.npz")
+    loaded = SimilarityIndex.load(tmp_path / "similar.npz")
+    assert loaded.similar(qs[160].id, 5) == ix.similar(qs[160].id, 5)
+    corpus = list(iter_questions())
+    assert loaded.like(corpus[0], 3) == full.like(corpus[0], 3)
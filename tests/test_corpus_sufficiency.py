@@ -0,0 +1,60 @@
+import time
+
+from corpus.sufficiency import (
+    REASON_INCONCLUSIVE, REASON_KEY_WRONG, REASON_UNPARSEABLE, DSItem, verify, verify_many,
+)
+
+# The worked DS examples from GMAT_QUANT_BASE.py.
+STAMPS = DSItem("2x", ("2x + 5x + 7x = 70", "5x = 7x – 10"), {"x": "positive"}, key="D", id="stamps")
+SQUARE = DSItem("x^2 > x", ("x > 0", "x > 1"), key="B", id="square")
+QUADRATIC = DSItem("x", ("x^2 – x – 12 = 0", "x^2 + 6x + 9 = 0"), key="B", id="quadratic")
+
+
+def test_corpus_examples_get_their_keys():
+    verdicts = verify_many([STAMPS, SQUARE, QUADRATIC], processes=1)
+    assert [v.answer for v in verdicts] == ["D", "B", "B"]
+    assert all(v.ok for v in verdicts)
+    assert [c.method for c in verdicts[0].checks] == ["exact", "exact"]
+    assert verdicts[2].checks[0].outcomes == (-3, 4)
+
+
+def test_together_and_wrong_key():
+    linear = DSItem("x + y", ("x - y = 2", "x + 3y = 10"), key="E")
+    verdict = verify(linear)
+    assert verdict.answer == "C"
+    assert verdict.reason == REASON_KEY_WRONG
+
+    integers = DSItem("x", ("x > 1", "x < 3"), {"x": "integer"})
+    assert verify(integers).answer == "C"
+
+
+def test_process_pool_matches_serial():
+    items = [STAMPS, SQUARE, QUADRATIC] * 3
+    assert [v.answer for v in verify_many(items, processes=2)] == ["D", "B", "B"] * 3
+
+
+def test_solved_values_outside_their_domain_are_not_sufficient():
+    negative = verify(DSItem("x", ("2x = -4", "x = 1"), {"x": "positive"}))
+    fractional = verify(DSItem("x", ("2x = 5", "x = 1"), {"x": "positive_integer"}))
+    for v in (negative, fractional):
+        assert v.answer != "D" and v.checks[0].sufficient is None and v.checks[1].sufficient
+
+    # A free variable does not rescue an impossible solved value or an infeasible constraint.
+    free = verify(DSItem("x", ("x = -2", "x = 3"), {"x": "positive", "y": "positive"}, given=("y > 0",)))
+    assert free.checks[0].sufficient is None and free.checks[1].sufficient
+    stuck = verify(DSItem("x", ("x = 2", "x = 3"), {"y": "positive"}, given=("y < 0",)))
+    assert stuck.answer is None
+
+
+def test_bad_items_do_not_abort_a_batch():
+    absolute = DSItem("x", ("|x| = 3", "x > 0"), id="abs")
+    tower = DSItem("x", ("x = 2^2^40", "x > 0"), id="tower")
+    start = time.perf_counter()
+    ok, bad, huge = verify_many([STAMPS, absolute, tower], processes=1)
+    assert time.perf_counter() - start < 5
+    assert ok.answer == "D" and (bad.answer, bad.reason, bad.checks) == (None, REASON_UNPARSEABLE, ())
+    assert huge.checks[0].sufficient is None and huge.reason == REASON_INCONCLUSIVE
+
+    # Exact points outside a counting function's domain are dropped, not raised.
+    half = verify(DSItem("comb(n, 2)", ("n = 5/2", "n = 5")))
+    assert half.checks[0].sufficient is None and half.checks[1].outcomes == (10,)
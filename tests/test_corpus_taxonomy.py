@@ -0,0 +1,40 @@
+import numpy as np
+
+from corpus.parse import iter_questions
+from corpus.taxonomy import TaxonomyIndex
+from corpus.variants import TEMPLATES, generate
+
+
+def _index():
+    qs = [q for name in ("age", "ratio_total") for q in generate(TEMPLATES[name], 200, seed=3).questions()]
+    return qs, TaxonomyIndex.build(qs)
+
+
+def test_query_intersects_facets_and_unions_values():
+    qs, ix = _index()
+    ratio = ix.query(topic="Ratios", kind="ps")
+    assert all(qs[i].topic == "Ratios" for i in ratio) and len(ratio) == 200
+    both = ix.query(topic=["Ratios", "General Word Problems"], difficulty="medium")
+    assert [qs[i].subtopic for i in both] == ["age problems"] * 200
+    assert len(ix.query(topic="Ratios", difficulty="hard")) == 0
+    assert len(ix.query(topic="Ratios", exclude=ratio[:50])) == 150
+
+
+def test_weighted_sample_respects_filters_weights_and_exclusions():
+    qs, ix = _index()
+    rng = np.random.default_rng(0)
+    seen = ix.query(subtopic="age problems")[:100]
+    picked = ix.sample(20, rng, weights={"topic": {"Ratios": 0}}, exclude=seen)
+    assert len(set(picked.tolist())) == 20
+    assert all(qs[i].topic == "General Word Problems" and i not in seen for i in picked)
+    # Zero weights apply even when the pool is no bigger than k.
+    small = ix.sample(500, rng, weights={"topic": {"Ratios": 0}})
+    assert len(small) == 200 and all(qs[i].topic == "General Word Problems" for i in small)
+
+
+def test_round_trip_and_corpus_facets(tmp_path):
+    ix = TaxonomyIndex.build(iter_questions())
+    ix.save(tmp_path / "taxonomy.npz")
+    loaded = TaxonomyIndex.load(tmp_path / "taxonomy.npz")
+    assert loaded.values("kind") == ["ps", "ds"]
+    np.testing.assert_array_equal(loaded.query(kind="ds"), ix.query(kind="ds"))
@@ -0,0 +1,29 @@
+from corpus.checker import PSItem, PSSolution, check
+from corpus.variants import TEMPLATES, generate
+
+
+def test_every_template_yields_verified_unique_variants():
+    for name, template in TEMPLATES.items():
+        batch = generate(template, 300, seed=3)
+        questions = list(batch.questions())
+        assert len(questions) == 300, name
+        assert len({q.stem for q in questions}) == 300, name
+        assert all(len(set(q.choices)) == 5 for q in questions), name
+
+
+def test_age_variants_agree_with_exact_checker():
+    batch = generate(TEMPLATES["age"], 50, seed=11)
+    for i, q in enumerate(batch.questions()):
+        p = batch.row(i)
+        solution = PSSolution(
+            "H + s",
+            (f"H = P + {p['d']}", f"H + {p['t']} = {p['k']}(P + {p['t']})", f"s = {p['s']}"),
+        )
+        result = check(PSItem.from_question(q, solution))
+        assert result.ok, (q.stem, q.choices, result)
+
+
+def test_pricing_choices_use_corpus_currency_format():
+    q = next(generate(TEMPLATES["pricing"], 1, seed=0).questions())
+    assert all(c.startswith("$") for c in q.choices)
+    assert q.concept == "Word Problems & Rates"